@@ -30,6 +30,8 @@ Fitting and Simulation:
     function you want to simulate or fit.
 - FunctionAmplitude: Fallback for old functions for PyPWA 2.0, don't
     use unless you need.
+- WaveAmplitude: A coherent sum of fixed waves, where only the production
+    amplitudes are fit. Much quicker with the extended log likelihood.
 - monte_carlo_simulation: Function used for rejection sampling.
 - simulate.process_user_function: Processes the user function and returns
     the functions final values and max value.
@@ -44,6 +46,20 @@ Fitting and Simulation:
     a likelihood directly into your NestedFunction.
 - minuit: A wrapper around iminuit to make it easier to use with our
     likelihoods.
+- optimize: Fits with minuit, scipy, or a built in Nelder-Mead, all
+    returning the same FitResult.
+- multi_start: Runs minuit from many starting points at once, ranking
+    the fits by their likelihood.
+- fit_bins: Fits many independent bins at the same time, sharing the
+    available processors between them by the size of each bin.
+- resume_bins: Continues the fits of fit_bins from a checkpoint.
+- chain_bins: Fits bins one after another, starting each bin from the
+    result of its neighbour.
+- WorkerPool: A pool of long-lived processes that likelihoods and the
+    simulation can be loaded into, avoiding the cost of spawning new
+    processes for every likelihood.
+- Cluster: Workers on other machines, started with pyworker, that
+    likelihoods and the simulation can be loaded into like a WorkerPool.
 
 Reading and Writing data:
 -------------------------
@@ -69,6 +85,7 @@ Tools:
 - bin_with_fixed_widths: Supports binning any dataset into a bins with
     a fixed number of events per bin
 - bin_by_range: Supports binning any dataset into a fixed number of bins
+- make_histogram: Histograms any dataset over one or more columns
 - make_lego: Produces a lego plot
 
 Provided Data Types:
@@ -83,15 +100,19 @@ Provided Data Types:
 
 from PyPWA import info as _info
 from PyPWA.libs import simulate
-from PyPWA.libs.binning import bin_by_range, bin_with_fixed_widths, bin_by_list
+from PyPWA.libs.binning import (
+    bin_by_range, bin_with_fixed_widths, bin_by_list, make_histogram
+)
 from PyPWA.libs.file import (
     get_reader, get_writer, read, write, ProjectDatabase, cache, DataType
 )
 from PyPWA.libs.fit import (
     minuit, ChiSquared, LogLikelihood, EmptyLikelihood, NestedFunction,
-    FunctionAmplitude
+    FunctionAmplitude, WaveAmplitude, fit_bins, multi_start, optimize,
+    resume_bins, chain_bins
 )
 from PyPWA.libs.plotting import make_lego
+from PyPWA.libs.process import Cluster, WorkerPool
 from PyPWA.libs.resonance import ResonanceData
 from PyPWA.libs.simulate import monte_carlo_simulation
 from PyPWA.libs.vectors import FourVector, ThreeVector, ParticlePool, Particle
@@ -102,7 +123,9 @@ __all__ = [
     "monte_carlo_simulation", "minuit", "ChiSquared", "LogLikelihood",
     "EmptyLikelihood", "NestedFunction", "FunctionAmplitude", "cache",
     "ResonanceData", "bin_by_range", "bin_with_fixed_widths", "make_lego",
-    "simulate", "DataType"
+    "simulate", "DataType", "WorkerPool", "fit_bins", "Cluster",
+    "WaveAmplitude", "make_histogram", "multi_start", "optimize",
+    "resume_bins", "chain_bins"
 ]
 
 __author__ = _info.AUTHOR
@@ -16,7 +16,7 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
-from typing import Union, List, Optional as Opt
+from typing import Dict, List, Sequence, Tuple, Union, Optional as Opt
 
 import numpy as npy
 import pandas as pd
@@ -348,6 +348,74 @@ def bin_by_list(
     return binneddata
 
 
+def make_histogram(
+        data: Union[npy.ndarray, pd.DataFrame],
+        bins: Dict[str, Union[int, Sequence[float]]],
+        weights: Opt[Union[npy.ndarray, pd.Series]] = None
+) -> Tuple[Union[npy.ndarray, pd.DataFrame], npy.ndarray, List[npy.ndarray]]:
+    """Histograms the data over one or more of its columns
+
+    The histogram is built in a single pass over the data. Each bin is
+    described by the values at its center, so the centers can be passed
+    to an amplitude in place of the events.
+
+    Parameters
+    ----------
+    data : DataFrame or Structured Array
+        The events to histogram.
+    bins : Dict[str, int or Sequence[float]]
+        The columns to histogram over, with either the number of bins to
+        spread between the smallest and largest value of the column, or
+        the edges of every bin.
+    weights : Array-like, optional
+        The weight of each event, such as the quality factor. Defaults to
+        counting each event once.
+
+    Returns
+    -------
+    Tuple[DataFrame or Structured Array, npy.ndarray, List[npy.ndarray]]
+        The center of every bin, with a column for each binned column,
+        the count in each bin, and the edges used for each column.
+
+    Raises
+    ------
+    ValueError
+        If the data doesn't have named columns.
+
+    Examples
+    --------
+    Histogram the monte carlo with the same bins as the data::
+
+        centers, counts, edges = make_histogram(data, {"mass": 100})
+        mc_centers, mc_counts, _ = make_histogram(
+            monte_carlo, dict(zip(["mass"], edges))
+        )
+    """
+    if not isinstance(data, pd.DataFrame) and not data.dtype.names:
+        raise ValueError("Only DataFrames and Structured Arrays have columns!")
+
+    names = list(bins.keys())
+    sample = npy.column_stack([npy.asarray(data[name]) for name in names])
+    counts, edges = npy.histogramdd(
+        sample, [bins[name] for name in names],
+        weights=None if weights is None else npy.asarray(weights)
+    )
+
+    centers = npy.meshgrid(
+        *[(edge[1:] + edge[:-1]) / 2 for edge in edges], indexing="ij"
+    )
+    if isinstance(data, pd.DataFrame):
+        binned = pd.DataFrame({
+            name: center.ravel() for name, center in zip(names, centers)
+        })
+    else:
+        binned = npy.zeros(counts.size, [(name, "f8") for name in names])
+        for name, center in zip(names, centers):
+            binned[name] = center.ravel()
+
+    return binned, counts.ravel(), list(edges)
+
+
 def _mask_binned_data(
         array: Union[npy.ndarray, pd.DataFrame],
         bin_values: Union[pd.Series, npy.ndarray],
@@ -51,10 +51,15 @@ Example
 >>>    directory.root.read()
 >>>     directory.data.read(DataTypes.QFactor)
 >>>     directory.unmanaged.read("unique_name")
+
+ - Fit your data without reading it into memory, each process will read
+   its own range of the events::
+>>> LogLikelihood(amplitude, important, monte_carlo_folder)
 """
 
 from PyPWA import info as _info
 from ._binning import _ManageBins, BinFolder
+from ._common import RowRange
 from ._managed import _ReadData
 from .main import ProjectDatabase, BaseFolder
 
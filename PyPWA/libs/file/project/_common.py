@@ -243,14 +243,106 @@ class StoredData:
         if not len(self.filename):
             self.filename = f"{self.name}.{extension}"
 
-    def iterate_data(self, chunk_size: int = 250000) -> npy.ndarray:
-        for lower in range(0, len(self.data), chunk_size):
-            yield self.data.read(lower, lower + chunk_size)
+    def iterate_data(
+            self, chunk_size: int = 250000, start: int = 0, stop: int = None
+    ) -> npy.ndarray:
+        stop = len(self.data) if stop is None else min(stop, len(self.data))
+        for lower in range(start, stop, chunk_size):
+            yield self.data.read(lower, min(lower + chunk_size, stop))
+
+    @property
+    def row_size(self) -> int:
+        """The number of bytes each event takes once read"""
+        if isinstance(self.data, ParticleLeaf):
+            return sum(leaf.rowsize for leaf in self.data.leaves)
+        return self.data.rowsize
 
     def __len__(self):
         return len(self.data)
 
 
+class RowRange:
+    """A range of events from a folder's root data
+
+    Only the name of the file, the path of the folder, and the range are
+    pickled, so the range can be sent to other processes or machines,
+    which then open the file read-only and read the events themselves.
+
+    Parameters
+    ----------
+    filename : str
+        The HDF5 file the folder is in.
+    pathname : str
+        The path of the folder inside the file.
+    start : int
+        The first event in the range.
+    stop : int
+        The event after the last in the range.
+    root : StoredData, optional
+        The already opened root data, if the range is being read from
+        the process that opened the file.
+    """
+
+    def __init__(
+            self, filename: str, pathname: str, start: int, stop: int,
+            root: StoredData = None
+    ):
+        self.filename = filename
+        self.pathname = pathname
+        self.start = start
+        self.stop = stop
+        self.__root = root
+        self.__file: tables.File = None
+
+    def __repr__(self):
+        return (
+            f"{self.__class__.__name__}({self.filename!r}, "
+            f"{self.pathname!r}, {self.start}, {self.stop})"
+        )
+
+    def __len__(self):
+        return self.stop - self.start
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["_RowRange__root"] = None
+        state["_RowRange__file"] = None
+        return state
+
+    @property
+    def root(self) -> StoredData:
+        """The folder's root data, opening the file if needed"""
+        if self.__root is None:
+            # tables.open_file refuses to open a file read-only that this
+            # process, or the process it was forked from, has open to write
+            self.__file = tables.File(self.filename, "r")
+            node = self.__file.get_node(self.pathname)
+            self.__root = CommonFolder(self.__file, node).root
+        return self.__root
+
+    def close(self):
+        """Closes the file, if it was opened by this range"""
+        if self.__file is not None and self.__file.isopen:
+            self.__file.close()
+            self.__root = self.__file = None
+
+    def iterate_data(self, chunk_size: int = 250000) -> type_to_root:
+        """Reads the events in the range, chunk_size events at a time"""
+        return self.root.iterate_data(chunk_size, self.start, self.stop)
+
+    def split(self, start: int, stop: int) -> RowRange:
+        """A range relative to the start of this range
+
+        The new range opens the file itself when it is first read, so
+        that a forked process never reads through the handle its parent
+        opened.
+        """
+        return RowRange(
+            self.filename, self.pathname, self.start + start,
+            self.start + min(stop, len(self))
+        )
+
+
 """
 Types and Enumerations
 """
@@ -324,6 +416,30 @@ class CommonFolder:
     def is_open(self) -> bool:
         return self._file.isopen
 
+    @property
+    def filename(self) -> str:
+        return self._file.filename
+
+    def rows(self, start: int = 0, stop: int = None) -> RowRange:
+        """A range of the root events that can be sent to other processes
+
+        Parameters
+        ----------
+        start : int, optional
+            The first event, defaults to the first event.
+        stop : int, optional
+            The event after the last, defaults to every event.
+
+        Returns
+        -------
+        RowRange
+            The range, which can be read from this or any other process.
+        """
+        stop = len(self) if stop is None else min(stop, len(self))
+        return RowRange(
+            self.filename, self.pathname, start, stop, self._root
+        )
+
     @property
     def folder_name(self) -> str:
         return self._folder._v_name
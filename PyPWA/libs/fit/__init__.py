@@ -29,7 +29,12 @@ __version__ = _info.VERSION
 
 from .likelihoods import (
     ChiSquared, LogLikelihood, EmptyLikelihood,
-    NestedFunction, FunctionAmplitude
+    NestedFunction, FunctionAmplitude, WaveAmplitude
 )
 
-from .minuit import minuit
+from .minuit import minuit, multi_start, StartResult
+from .optimizers import (
+    optimize, FitResult, Optimizer, MinuitOptimizer, ScipyOptimizer,
+    NelderMead
+)
+from .bins import fit_bins, resume_bins, chain_bins
@@ -0,0 +1,553 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Fits several independent bins at the same time.
+================================================
+
+Each bin is given a share of the available processors based on how many
+events it contains. Small bins are fit side by side on a few processors
+each, while large bins are spread across many processors, so that the
+machine stays saturated for the whole set of bins.
+
+The progress of the fits can be saved to a checkpoint, so that a set of
+fits that is stopped can be resumed with resume_bins without fitting the
+finished bins again.
+
+When neighbouring bins have similar minimums, such as mass bins,
+chain_bins instead fits the bins one after another, starting each bin
+from the result of the bin before it.
+"""
+
+import copy
+import dataclasses
+import math
+import os
+import pickle
+import threading
+import time
+from concurrent import futures
+from pathlib import Path
+from typing import Any, Dict, List, Optional as Opt, Tuple, Union
+
+import numpy as npy
+import pandas as pd
+
+from PyPWA import info as _info
+from PyPWA.libs import process
+from . import likelihoods
+from .minuit import minuit, multi_start
+from .optimizers import FitResult, from_minuit
+
+__credits__ = ["Mark Jones"]
+__author__ = _info.AUTHOR
+__version__ = _info.VERSION
+
+
+_bin_data = Union[npy.ndarray, pd.DataFrame]
+_path = Union[str, Path]
+
+
+def fit_bins(
+        amplitude: likelihoods.NestedFunction,
+        data_bins: List[_bin_data],
+        mc_bins: Opt[List[_bin_data]],
+        parameters: List[str],
+        settings: Dict[str, Any],
+        set_up: int = 1,
+        strategy: int = 1,
+        num_of_calls: int = 1000,
+        num_of_processes: int = process.MAX_PROC,
+        events_per_process: int = 50000,
+        likelihood_kwargs: Opt[Dict[str, Any]] = None,
+        checkpoint: Opt[_path] = None,
+        checkpoint_interval: float = 60.
+) -> List[FitResult]:
+    """Fits each bin with the extended log likelihood, concurrently.
+
+    Each bin is allocated one process for every `events_per_process`
+    events it holds, up to `num_of_processes`. Bins are started from
+    largest to smallest, and smaller bins are started whenever enough
+    processors are free, so that several small bins are fit at once while
+    large bins use many processors each.
+
+    Parameters
+    ----------
+    amplitude : NestedFunction
+        The amplitude to fit, it will be copied for every bin.
+    data_bins : List[DataFrame or npy.ndarray]
+        The data for each bin.
+    mc_bins : List[DataFrame or npy.ndarray] or None
+        The monte carlo for each bin, if provided the extended log
+        likelihood will be used.
+    parameters : List[str]
+        The names of the parameters for iminuit to use
+    settings : Dict[str, Any]
+        The settings to be passed to iminuit, used for every bin.
+    set_up : float, optional
+        Set to 1 for log-likelihoods, or .5 for Chi-Squared
+    strategy : int, optional
+        Fitting strategy passed to minuit. Defaults to 1.
+    num_of_calls : int, optional
+        A suggested max number of calls to minuit for each bin.
+    num_of_processes : int, optional
+        The total number of processors that can be used across all the
+        bins, defaults to the number of CPUs.
+    events_per_process : int, optional
+        The number of events a single process should handle before the
+        bin is given another process. Defaults to 50,000.
+    likelihood_kwargs : Dict[str, Any], optional
+        Any extra arguments to pass to every LogLikelihood.
+    checkpoint : str or Path, optional
+        A file to save the progress of the fits to, replacing any
+        checkpoint already there. The best parameters and call count of
+        every running fit are saved every checkpoint_interval seconds,
+        and the result of each bin as soon as it finishes. Use
+        resume_bins to continue from the checkpoint.
+    checkpoint_interval : float, optional
+        The fewest seconds between saving the running fits. Defaults to
+        60.
+
+    Returns
+    -------
+    List[FitResult]
+        The result of each bin, in the same order as data_bins, holding
+        the Minuit object of the fit as its result.
+
+    Raises
+    ------
+    ValueError
+        If the number of monte carlo bins does not match the data bins.
+    """
+    saved = None
+    if checkpoint is not None:
+        saved = _Checkpoint(
+            checkpoint, parameters, len(data_bins), checkpoint_interval
+        )
+
+    fits = _fit_bins(
+        amplitude, data_bins, mc_bins, parameters, settings, set_up,
+        strategy, num_of_calls, num_of_processes, events_per_process,
+        likelihood_kwargs, saved
+    )
+    return [fits[index] for index in range(len(data_bins))]
+
+
+def resume_bins(
+        checkpoint: _path,
+        amplitude: likelihoods.NestedFunction,
+        data_bins: List[_bin_data],
+        mc_bins: Opt[List[_bin_data]],
+        parameters: List[str],
+        settings: Dict[str, Any],
+        set_up: int = 1,
+        strategy: int = 1,
+        num_of_calls: int = 1000,
+        num_of_processes: int = process.MAX_PROC,
+        events_per_process: int = 50000,
+        likelihood_kwargs: Opt[Dict[str, Any]] = None,
+        checkpoint_interval: float = 60.
+) -> List[FitResult]:
+    """Continues the fits saved to a checkpoint by fit_bins.
+
+    Bins that had finished are not fit again, and bins that hadn't are
+    started from the best parameters they had reached, with their call
+    counts carried over. The checkpoint keeps being updated, so it can be
+    resumed again if it is stopped again. The arguments must describe the
+    same bins as the fits that wrote the checkpoint.
+
+    Parameters
+    ----------
+    checkpoint : str or Path
+        The checkpoint written by fit_bins or resume_bins.
+    amplitude, data_bins, mc_bins, parameters, settings, set_up, \
+    strategy, num_of_calls, num_of_processes, events_per_process, \
+    likelihood_kwargs, checkpoint_interval
+        The same as for fit_bins.
+
+    Returns
+    -------
+    List[FitResult]
+        The result of each bin, in the same order as data_bins. Only bins
+        fit by this call hold their Minuit object as their result.
+
+    Raises
+    ------
+    ValueError
+        If the checkpoint doesn't match the bins or parameters.
+    FileNotFoundError
+        If the checkpoint doesn't exist.
+    """
+    saved = _Checkpoint(
+        checkpoint, parameters, len(data_bins), checkpoint_interval, True
+    )
+    fits = _fit_bins(
+        amplitude, data_bins, mc_bins, parameters, settings, set_up,
+        strategy, num_of_calls, num_of_processes, events_per_process,
+        likelihood_kwargs, saved
+    )
+    return [
+        fits.get(index, saved.finished.get(index))
+        for index in range(len(data_bins))
+    ]
+
+
+def _fit_bins(
+        amplitude, data_bins, mc_bins, parameters, settings, set_up,
+        strategy, num_of_calls, num_of_processes, events_per_process,
+        likelihood_kwargs, checkpoint: Opt["_Checkpoint"]
+) -> Dict[int, FitResult]:
+    if mc_bins is not None and len(mc_bins) != len(data_bins):
+        raise ValueError("There must be one monte carlo bin per data bin!")
+
+    mc_bins = mc_bins if mc_bins is not None else [None] * len(data_bins)
+    sizes = [_events_in(d) + _events_in(m) for d, m in zip(data_bins, mc_bins)]
+    allocations = allocate_processes(
+        sizes, num_of_processes, events_per_process
+    )
+
+    def fit(index: int, pool: Opt[process.WorkerPool]) -> FitResult:
+        start = time.perf_counter()
+        bin_settings = copy.deepcopy(settings)
+        with likelihoods.LogLikelihood(
+                copy.deepcopy(amplitude), data_bins[index], mc_bins[index],
+                num_of_processes=allocations[index], pool=pool,
+                **(likelihood_kwargs if likelihood_kwargs else {})
+        ) as likelihood:
+            if checkpoint is None:
+                optimizer = minuit(
+                    parameters, bin_settings, likelihood, set_up, strategy,
+                    num_of_calls
+                )
+                return from_minuit(optimizer, time.perf_counter() - start)
+
+            best, calls = checkpoint.progress(index)
+            bin_settings.update(best)
+            optimizer = minuit(
+                parameters, bin_settings,
+                _Watched(likelihood, index, checkpoint), set_up, strategy,
+                num_of_calls
+            )
+
+        result = from_minuit(optimizer, time.perf_counter() - start)
+        result.calls += calls
+        checkpoint.finish(index, result)
+        return result
+
+    pending = [
+        index for index in range(len(data_bins))
+        if checkpoint is None or index not in checkpoint.finished
+    ]
+    if not pending:
+        return {}
+    if amplitude.USE_MP:
+        with process.WorkerPool(num_of_processes) as pool:
+            return _schedule(fit, allocations, num_of_processes, pool, pending)
+    return _schedule(fit, allocations, num_of_processes, None, pending)
+
+
+def chain_bins(
+        amplitude: likelihoods.NestedFunction,
+        data_bins: List[_bin_data],
+        mc_bins: Opt[List[_bin_data]],
+        parameters: List[str],
+        settings: Dict[str, Any],
+        set_up: int = 1,
+        strategy: int = 1,
+        num_of_calls: int = 1000,
+        num_of_processes: int = process.MAX_PROC,
+        anchor: int = 0,
+        num_of_starts: int = 20,
+        sampling: str = "uniform",
+        seed: Opt[int] = None,
+        likelihood_kwargs: Opt[Dict[str, Any]] = None
+) -> List[FitResult]:
+    """Fits each bin starting from the result of its neighbour.
+
+    The anchor bin is fit first from the settings, then the bins are fit
+    outward from the anchor one at a time. Each bin starts from the
+    values of the bin next to it on the anchor's side, with the errors of
+    that bin as its initial steps. If a fit doesn't converge, the bin is
+    fit again with multi_start from num_of_starts points between the
+    limits, and the best of those fits is kept.
+
+    Parameters
+    ----------
+    amplitude : NestedFunction
+        The amplitude to fit, it will be copied for every bin.
+    data_bins : List[DataFrame or npy.ndarray]
+        The data for each bin, in order, such as by mass.
+    mc_bins : List[DataFrame or npy.ndarray] or None
+        The monte carlo for each bin, if provided the extended log
+        likelihood will be used.
+    parameters : List[str]
+        The names of the parameters for iminuit to use
+    settings : Dict[str, Any]
+        The settings to be passed to iminuit. The values are only used
+        to start the anchor bin, and the limits are also where the
+        starting points of multi_start are drawn.
+    set_up : float, optional
+        Set to 1 for log-likelihoods, or .5 for Chi-Squared
+    strategy : int, optional
+        Fitting strategy passed to minuit. Defaults to 1.
+    num_of_calls : int, optional
+        A suggested max number of calls to minuit for each fit.
+    num_of_processes : int, optional
+        The number of processes each bin is fit with, defaults to the
+        number of CPUs.
+    anchor : int, optional
+        The index of the bin to fit first. Defaults to the first bin, so
+        the bins are fit in order.
+    num_of_starts : int, optional
+        How many starting points to use for a bin that fails to
+        converge. Defaults to 20.
+    sampling : str, optional
+        How multi_start draws the starting points, "uniform" or "latin".
+    seed : int, optional
+        The seed for the starting points of multi_start.
+    likelihood_kwargs : Dict[str, Any], optional
+        Any extra arguments to pass to every LogLikelihood.
+
+    Returns
+    -------
+    List[FitResult]
+        The result of each bin, in the same order as data_bins. Bins fit
+        by multi_start have their StartResults, best first, as their
+        result and count the calls of every start.
+
+    Raises
+    ------
+    ValueError
+        If the number of monte carlo bins does not match the data bins,
+        or the anchor isn't one of the bins.
+    """
+    if mc_bins is not None and len(mc_bins) != len(data_bins):
+        raise ValueError("There must be one monte carlo bin per data bin!")
+    if not 0 <= anchor < len(data_bins):
+        raise ValueError(f"There is no bin {anchor}!")
+
+    mc_bins = mc_bins if mc_bins is not None else [None] * len(data_bins)
+    kwargs = likelihood_kwargs if likelihood_kwargs else {}
+
+    def fit(index: int, start: Dict[str, Any]) -> FitResult:
+        began = time.perf_counter()
+        with likelihoods.LogLikelihood(
+                copy.deepcopy(amplitude), data_bins[index], mc_bins[index],
+                num_of_processes=num_of_processes, **kwargs
+        ) as likelihood:
+            optimizer = minuit(
+                parameters, start, likelihood, set_up, strategy,
+                num_of_calls
+            )
+        result = from_minuit(optimizer, time.perf_counter() - began)
+        if result.valid:
+            return result
+
+        # Each start has its own copy of a single process likelihood
+        with likelihoods.LogLikelihood(
+                copy.deepcopy(amplitude), data_bins[index], mc_bins[index],
+                num_of_processes=0, **kwargs
+        ) as likelihood:
+            starts = multi_start(
+                parameters, copy.deepcopy(settings), likelihood, set_up,
+                num_of_starts, sampling, seed, strategy, num_of_calls,
+                num_of_processes=num_of_processes
+            )
+        best = starts[0]
+        return FitResult(
+            best.values, best.errors, best.fval, best.valid,
+            result.calls + sum(start.calls for start in starts),
+            time.perf_counter() - began, "minuit multi-start",
+            "" if best.valid else "No start converged", starts
+        )
+
+    results = [None] * len(data_bins)
+    results[anchor] = fit(anchor, copy.deepcopy(settings))
+    forward = [(i, i - 1) for i in range(anchor + 1, len(data_bins))]
+    backward = [(i, i + 1) for i in range(anchor - 1, -1, -1)]
+    for index, neighbour in forward + backward:
+        results[index] = fit(index, _warm_start(settings, results[neighbour]))
+    return results
+
+
+def _warm_start(
+        settings: Dict[str, Any], neighbour: FitResult
+) -> Dict[str, Any]:
+    start = copy.deepcopy(settings)
+    start.update(neighbour.values)
+    for name, error in neighbour.errors.items():
+        # Fixed parameters and failed errors keep the original steps
+        if error > 0 and math.isfinite(error):
+            start[f"error_{name}"] = error
+    return start
+
+
+def allocate_processes(
+        sizes: List[int], num_of_processes: int = process.MAX_PROC,
+        events_per_process: int = 50000
+) -> List[int]:
+    """Decides how many processes each bin should be fit with.
+
+    Parameters
+    ----------
+    sizes : List[int]
+        The number of events in each bin.
+    num_of_processes : int, optional
+        The most processes any bin can have, defaults to the number of
+        CPUs.
+    events_per_process : int, optional
+        The number of events each process should handle.
+
+    Returns
+    -------
+    List[int]
+        The number of processes for each bin, at least 1.
+    """
+    return [
+        min(max(math.ceil(size / events_per_process), 1), num_of_processes)
+        for size in sizes
+    ]
+
+
+def _schedule(
+        fit, allocations, num_of_processes, pool, indexes
+) -> Dict[int, Any]:
+    # Largest bins first, then any bin that fits in the free processors
+    pending = sorted(indexes, key=lambda i: allocations[i], reverse=True)
+    results = {}
+    running = {}
+    free = num_of_processes
+
+    with futures.ThreadPoolExecutor(num_of_processes) as executor:
+        while pending or running:
+            for index in list(pending):
+                if allocations[index] <= free:
+                    pending.remove(index)
+                    free -= allocations[index]
+                    running[executor.submit(fit, index, pool)] = index
+
+            done, _ = futures.wait(
+                running, return_when=futures.FIRST_COMPLETED
+            )
+            for future in done:
+                index = running.pop(future)
+                free += allocations[index]
+                results[index] = future.result()
+
+    return results
+
+
+def _events_in(data: Opt[_bin_data]) -> int:
+    return 0 if data is None else len(data)
+
+
+class _Checkpoint:
+    """The progress of a set of fits, saved to disk
+
+    Saves are written to a temporary file that then replaces the
+    checkpoint, so a fit stopped while saving leaves the last checkpoint
+    whole.
+    """
+
+    def __init__(
+            self, path: _path, parameters: List[str], number_of_bins: int,
+            interval: float, resume: bool = False
+    ):
+        self.__path = Path(path)
+        self.__interval = interval
+        self.__lock = threading.Lock()
+        self.__saved = time.monotonic()
+        self.__state = {
+            "parameters": list(parameters), "bins": number_of_bins,
+            "finished": {}, "progress": {}
+        }
+
+        if resume:
+            with self.__path.open("rb") as stream:
+                state = pickle.load(stream)
+            if state["parameters"] != list(parameters) or \
+                    state["bins"] != number_of_bins:
+                raise ValueError("The checkpoint is for different fits!")
+            self.__state = state
+        self.__save()
+
+    @property
+    def finished(self) -> Dict[int, FitResult]:
+        return self.__state["finished"]
+
+    def progress(self, index: int) -> Tuple[Dict[str, float], int]:
+        """The best parameters and call count of an unfinished bin"""
+        progress = self.__state["progress"].get(index)
+        if progress is None:
+            return {}, 0
+        return dict(progress["values"]), progress["calls"]
+
+    def record(self, index: int, values: Dict[str, float], fval: float):
+        with self.__lock:
+            progress = self.__state["progress"].setdefault(
+                index, {"values": {}, "fval": npy.inf, "calls": 0}
+            )
+            progress["calls"] += 1
+            if fval < progress["fval"]:
+                progress["values"], progress["fval"] = values, fval
+
+            if time.monotonic() - self.__saved > self.__interval:
+                self.__save()
+
+    def finish(self, index: int, result: FitResult):
+        # Minuit objects can't be pickled, so only the summary is kept
+        with self.__lock:
+            self.__state["finished"][index] = dataclasses.replace(
+                result, result=None
+            )
+            self.__state["progress"].pop(index, None)
+            self.__save()
+
+    def __save(self):
+        temporary = self.__path.with_name(self.__path.name + ".tmp")
+        with temporary.open("wb") as stream:
+            pickle.dump(self.__state, stream)
+        os.replace(temporary, self.__path)
+        self.__saved = time.monotonic()
+
+
+class _Watched:
+    """Records every call to the likelihood in the checkpoint"""
+
+    def __init__(self, likelihood: Any, index: int, checkpoint: _Checkpoint):
+        self.__likelihood = likelihood
+        self.__index = index
+        self.__checkpoint = checkpoint
+
+    def __call__(self, parameters: Any) -> float:
+        value = self.__likelihood(parameters)
+        if isinstance(parameters, npy.ndarray):
+            parameters = dict(zip(self.array_names, parameters.tolist()))
+        self.__checkpoint.record(self.__index, dict(parameters), value)
+        return value
+
+    def gradient(self, parameters: Any) -> Dict[str, float]:
+        return self.__likelihood.gradient(parameters)
+
+    @property
+    def has_gradient(self) -> bool:
+        return getattr(self.__likelihood, "has_gradient", False)
+
+    @property
+    def array_names(self) -> Opt[List[str]]:
+        return getattr(self.__likelihood, "array_names", None)
@@ -20,23 +20,34 @@
 Main object for Parsing Data
 """
 
+import collections
 import copy
+import math
 import multiprocessing
 from abc import abstractmethod, ABC
-from typing import Any, Callable, Dict, List, Union, Optional as Opt
+from pathlib import Path
+from typing import (
+    Any, Callable, Dict, Iterable, Iterator, List, Sequence, Tuple, Union,
+    Optional as Opt
+)
 
 import numpy as npy
 import pandas as pd
 import numexpr as ne
 
 from PyPWA import info as _info
-from PyPWA.libs import process
+from PyPWA.libs import binning, process
+from PyPWA.libs.file import project
 
 __credits__ = ["Mark Jones"]
 __author__ = _info.AUTHOR
 __version__ = _info.VERSION
 
 
+_pool = Union[process.WorkerPool, process.Cluster]
+_folder = Union[project.BaseFolder, project.BinFolder, project.RowRange]
+_bins = Dict[str, Union[int, Sequence[float]]]
+
 class NestedFunction(ABC):
     """Interface for Amplitudes
 
@@ -50,12 +61,23 @@ class NestedFunction(ABC):
     Set USE_MP to false to execute on the main thread only, this is best
     for when using packages like numexpr
 
+    Optionally, gradient can be defined to return the derivative of the
+    amplitude for each parameter, which lets the likelihood provide
+    an analytic gradient to the optimizer.
+
+    Set USE_ARRAYS to true to receive the parameters in calculate and
+    gradient as an array instead of a dictionary, which saves looking up
+    each parameter by name on every call. The likelihood must then be
+    given parameter_names, and the index of each parameter in the array
+    is kept in parameter_index before setup is called.
+
     See Also
     --------
     FunctionAmplitude : For using the old amplitudes with PyPWA 3
     """
 
     USE_MP = True
+    USE_ARRAYS = False
 
     def __call__(self, *args):
         return self.calculate(*args)
@@ -91,6 +113,40 @@ class NestedFunction(ABC):
         """
         ...
 
+    def gradient(self, parameters) -> Dict[str, npy.ndarray]:
+        """Calculates the derivative of the amplitude for each parameter
+
+        Optional, if it isn't defined the optimizer will fall back to
+        finite differences.
+
+        Parameters
+        ----------
+        parameters :  Dict[str, float]
+            The parameters sent to the process by the optimizer
+
+        Returns
+        -------
+        Dict[str, npy.ndarray or Series]
+            The derivative of the amplitude for every event, with respect
+            to each parameter.
+        """
+        raise NotImplementedError("This amplitude has no gradient!")
+
+    def setup_parameters(self, index: Dict[str, int]):
+        """Receives the position of each parameter in the parameter array
+
+        Only called when USE_ARRAYS is true, before the amplitude is
+        copied to the processes. By default, the index is kept in
+        parameter_index.
+
+        Parameters
+        ----------
+        index : Dict[str, int]
+            The position of each parameter in the array that will be
+            passed to calculate.
+        """
+        self.parameter_index = index
+
 
 class FunctionAmplitude(NestedFunction):
     """Wrapper for Legacy PyPWA 2.X amplitudes
@@ -128,8 +184,388 @@ class FunctionAmplitude(NestedFunction):
         return self.__processing_function(self.__data, parameters)
 
 
+class WaveAmplitude(NestedFunction):
+    """Amplitude that is a coherent sum of fixed waves
+
+    For amplitudes of the form :math:`|\\sum_i V_i A_i(x)|^2`, where the
+    waves :math:`A_i` only depend on the events and only the complex
+    production amplitudes :math:`V_i` are fit. The waves are computed
+    once in setup, and the extended log likelihood sums the monte carlo
+    with the precomputed integrals :math:`\\sum A_i A_j^*`, so each call
+    costs the square of the number of waves instead of a pass over every
+    monte carlo event. The gradient is also provided.
+
+    Each wave has two parameters, the real and imaginary parts of its
+    production amplitude, named `<wave>_re` and `<wave>_im`.
+
+    Parameters
+    ----------
+    waves : List[str]
+        The names of the waves.
+    basis : Callable[[DataFrame or npy.ndarray], npy.ndarray], optional
+        Computes the complex value of every wave for each event, as an
+        array with a column per wave. If not provided, the waves are
+        read from the columns of the data with the same names.
+    """
+
+    def __init__(
+            self, waves: List[str],
+            basis: Opt[Callable[[Any], npy.ndarray]] = None
+    ):
+        self.__waves = list(waves)
+        self.__basis = basis
+        self.__values: npy.ndarray = None
+        self.__integrals: npy.ndarray = None
+
+    @property
+    def parameters(self) -> List[str]:
+        """The names of every parameter, real and imaginary per wave"""
+        names = []
+        for wave in self.__waves:
+            names.extend([f"{wave}_re", f"{wave}_im"])
+        return names
+
+    def setup(self, data):
+        if self.__basis is not None:
+            values = self.__basis(data)
+        else:
+            values = npy.column_stack([data[wave] for wave in self.__waves])
+        # Single precision data keeps single precision waves
+        values = npy.asarray(values)
+        self.__values = values.astype(
+            npy.result_type(values.dtype, npy.complex64)
+        )
+
+        # M_ij = sum(A_i * A_j*) over the events
+        self.__integrals = self.__values.T @ self.__values.conj()
+
+    def calculate(self, parameters) -> npy.ndarray:
+        return npy.abs(self.__sum(parameters)) ** 2
+
+    def gradient(self, parameters) -> Dict[str, npy.ndarray]:
+        # dI/dRe V_k = 2 Re(S* A_k), dI/dIm V_k = -2 Im(S* A_k)
+        terms = self.__sum(parameters).conj()[:, None] * self.__values
+        return self.__split(terms)
+
+    def integral(self, parameters) -> float:
+        """The sum of the amplitude over every event, from the integrals
+
+        Parameters
+        ----------
+        parameters :  Dict[str, float]
+            The parameters sent to the process by the optimizer
+
+        Returns
+        -------
+        float
+            The same as the sum of calculate, without touching the events.
+        """
+        production = self.__production(parameters)
+        total = production @ self.__integrals @ production.conj()
+        return float(npy.real(total))
+
+    def integral_gradient(self, parameters) -> Dict[str, float]:
+        """The gradient of integral for each parameter"""
+        production = self.__production(parameters)
+        return self.__split(self.__integrals @ production.conj())
+
+    def __production(self, parameters) -> npy.ndarray:
+        return npy.array([
+            complex(parameters[f"{wave}_re"], parameters[f"{wave}_im"])
+            for wave in self.__waves
+        ])
+
+    def __sum(self, parameters) -> npy.ndarray:
+        return self.__values @ self.__production(parameters)
+
+    def __split(self, terms: npy.ndarray) -> Dict[str, Any]:
+        gradient = {}
+        for index, wave in enumerate(self.__waves):
+            gradient[f"{wave}_re"] = 2 * npy.real(terms[..., index])
+            gradient[f"{wave}_im"] = -2 * npy.imag(terms[..., index])
+        return gradient
+
+
+class _CompensatedSum:
+    """Partial sums that can be combined in any order
+
+    Each sum is kept as its rounded value and the error from rounding it,
+    so the sums from every process are combined with about twice the
+    precision of a float. The likelihood is then reproducible regardless
+    of how the events were split between the processes.
+
+    Parameters
+    ----------
+    sums : List[List[float]]
+        The pieces of each sum, as produced by _reproducible_sum.
+    weights : List[float]
+        What each sum is multiplied by once everything is combined.
+    """
+
+    def __init__(self, sums: List[List[float]], weights: List[float]):
+        self.sums = sums
+        self.weights = weights
+
+    def __add__(self, other: Any) -> "_CompensatedSum":
+        if not isinstance(other, _CompensatedSum):
+            return self
+        return _CompensatedSum(
+            [mine + theirs for mine, theirs in zip(self.sums, other.sums)],
+            self.weights
+        )
+
+    __radd__ = __add__
+
+    def __float__(self) -> float:
+        return math.fsum(
+            weight * math.fsum(pieces)
+            for weight, pieces in zip(self.weights, self.sums)
+        )
+
+
+def _reproducible_sum(values: npy.ndarray) -> List[float]:
+    """Sums the values reproducibly, independent of partitioning
+
+    The values are added pairwise, carrying the error of every addition
+    alongside the sum as a double-double, which gives about twice the
+    precision of a float. Rounding can still occur, but the pieces from
+    any split of the values combine to the same result.
+
+    Returns
+    -------
+    List[float]
+        The sum and the error carried alongside it
+    """
+    high = npy.array(values, dtype=float).ravel()
+    low = npy.zeros_like(high)
+    if not len(high):
+        return [0.0, 0.0]
+
+    while len(high) > 1:
+        if len(high) % 2:
+            high, low = npy.append(high, 0.), npy.append(low, 0.)
+
+        # Knuth's TwoSum of each pair gives the sum and its exact error
+        left, right = high[0::2], high[1::2]
+        total = left + right
+        virtual = total - left
+        error = (left - (total - virtual)) + (right - virtual)
+
+        low = low[0::2] + low[1::2] + error
+        high = total + low
+        low = low - (high - total)
+
+    return [float(high[0]), float(low[0])]
+
+
+class _GradientRequest:
+    """Asks the kernels for their gradient instead of the likelihood"""
+
+    def __init__(self, parameters: Dict[str, float]):
+        self.parameters = parameters
+
+
+def _has_gradient(amplitude: NestedFunction) -> bool:
+    return type(amplitude).gradient is not NestedFunction.gradient
+
+
+def _reduce(values: List[Any]) -> Any:
+    # Gradients are reduced one parameter at a time
+    if values and isinstance(values[0], dict):
+        return {
+            name: _reduce([value[name] for value in values])
+            for name in values[0]
+        }
+
+    # Always added in process order, and with the rounding errors if the
+    # sums are compensated, so the result doesn't depend on the processes
+    total = 0.0
+    for value in values:
+        total = total + value
+    return float(total) if isinstance(total, _CompensatedSum) else total
+
+
+_SINGLE = {
+    npy.dtype("float64"): npy.dtype("float32"),
+    npy.dtype("complex128"): npy.dtype("complex64")
+}
+
+
+def _to_single(data: Any) -> Any:
+    # Converts every double in the data to a single, anything else is
+    # returned untouched
+    if isinstance(data, pd.DataFrame):
+        return data.astype({
+            name: _SINGLE[dtype] for name, dtype in data.dtypes.items()
+            if dtype in _SINGLE
+        })
+    elif isinstance(data, (pd.Series, npy.ndarray)) and data.dtype.names:
+        return data.astype([
+            (name, _SINGLE.get(data.dtype[name], data.dtype[name]))
+            for name in data.dtype.names
+        ])
+    elif isinstance(data, (pd.Series, npy.ndarray)) and data.dtype in _SINGLE:
+        return data.astype(_SINGLE[data.dtype])
+    return data
+
+
+def _as_double(values: Any, single: bool) -> Any:
+    # Results from single precision data are summed as doubles
+    return npy.asarray(values, dtype=float) if single else values
+
+
+_chunk = Tuple[NestedFunction, Opt[slice]]
+
+
+def _make_chunks(
+        amplitude: NestedFunction, data: Any, chunk_size: Opt[int],
+        single: bool = False, cache: int = 2 ** 30
+) -> Iterable[_chunk]:
+    # Without a chunk size, the amplitude sees every event at once.
+    # Otherwise a copy of the amplitude is set up for each chunk of events,
+    # so its temporaries are never longer than the chunk
+    if isinstance(data, (project.BaseFolder, project.BinFolder)):
+        data = data.rows()
+    if isinstance(data, project.RowRange):
+        return _StreamedChunks(
+            amplitude, data, chunk_size or _STREAMED_CHUNK, single, cache
+        )
+
+    if not chunk_size:
+        amplitude.setup(data)
+        return [(amplitude, None)]
+
+    chunks = []
+    for start in range(0, max(len(data), 1), chunk_size):
+        rows = slice(start, start + chunk_size)
+        chunk = copy.deepcopy(amplitude)
+        chunk.setup(_rows(data, rows))
+        chunks.append((chunk, rows))
+    return chunks
+
+
+_STREAMED_CHUNK = 250000
+
+
+class _StreamedChunks:
+    """Chunks of events that are read from a project file as needed
+
+    The first chunks are read once and kept, as long as they fit in the
+    cache. The rest are read again, and the amplitude set up again, every
+    time the chunks are iterated over, so the events never have to fit
+    in memory.
+
+    Parameters
+    ----------
+    amplitude : NestedFunction
+        The amplitude to set up with each chunk.
+    rows : project.RowRange
+        The events of this process.
+    chunk_size : int
+        How many events to read at a time.
+    single : bool
+        If the events should be converted to single precision.
+    cache : int
+        How many bytes of events can be kept in memory.
+    """
+
+    def __init__(
+            self, amplitude: NestedFunction, rows: project.RowRange,
+            chunk_size: int, single: bool, cache: int
+    ):
+        self.__amplitude = amplitude
+        self.__rows = rows
+        self.__chunk_size = chunk_size
+        self.__single = single
+
+        # Only whole chunks are cached
+        cached_chunks = cache // max(rows.root.row_size * chunk_size, 1)
+        self.__cached_length = min(cached_chunks * chunk_size, len(rows))
+        self.__cached: List[_chunk] = []
+        for bounds, data in self.__read(0, self.__cached_length):
+            chunk = copy.deepcopy(amplitude)
+            # ParticleLeaf reuses the same pool for every read
+            chunk.setup(copy.deepcopy(data))
+            self.__cached.append((chunk, bounds))
+
+    def __iter__(self) -> Iterator[_chunk]:
+        yield from self.__cached
+        for rows, data in self.__read(self.__cached_length, len(self.__rows)):
+            self.__amplitude.setup(data)
+            yield self.__amplitude, rows
+
+    def close(self):
+        self.__rows.close()
+
+    def __read(self, start: int, stop: int) -> Iterator[Tuple[slice, Any]]:
+        # Every read goes through the file the rows opened, which is
+        # closed with them
+        offset = self.__rows.start
+        for index, data in enumerate(self.__rows.root.iterate_data(
+                self.__chunk_size, offset + start, offset + stop
+        )):
+            first = start + index * self.__chunk_size
+            rows = slice(first, min(first + self.__chunk_size, stop))
+            yield rows, _to_single(data) if self.__single else data
+
+
+def _close_chunks(chunks: Opt[Iterable[_chunk]]):
+    # Streamed chunks hold the file they read from open
+    if isinstance(chunks, _StreamedChunks):
+        chunks.close()
+
+
+def _histogram(
+        bins: _bins, data: Union[npy.ndarray, pd.DataFrame],
+        weights: Opt[Union[npy.ndarray, pd.Series]] = None,
+        monte_carlo: Opt[Union[npy.ndarray, pd.DataFrame]] = None,
+        monte_carlo_weights: Opt[Union[npy.ndarray, pd.Series]] = None
+) -> Tuple[Any, npy.ndarray, Any, Opt[npy.ndarray]]:
+    # Edges are shared between the data and the monte carlo so that
+    # both are evaluated at the same bin centers
+    for values in (data, monte_carlo):
+        if values is not None and not isinstance(
+                values, (npy.ndarray, pd.DataFrame)
+        ):
+            raise ValueError("Histograms need the events in memory!")
+
+    edges = {}
+    for name, count in bins.items():
+        if isinstance(count, int):
+            columns = [npy.asarray(data[name])]
+            if monte_carlo is not None:
+                columns.append(npy.asarray(monte_carlo[name]))
+            count = npy.histogram_bin_edges(npy.concatenate(columns), count)
+        edges[name] = count
+
+    def filled(values, values_weights):
+        centers, counts, _ = binning.make_histogram(
+            values, edges, values_weights
+        )
+        mask = counts != 0
+        if isinstance(centers, pd.DataFrame):
+            return centers[mask].reset_index(drop=True), counts[mask]
+        return centers[mask], counts[mask]
+
+    centers, counts = filled(data, weights)
+    if monte_carlo is None:
+        return centers, counts, None, None
+    return (centers, counts) + filled(monte_carlo, monte_carlo_weights)
+
+
+def _rows(values: Any, rows: Opt[slice]) -> Any:
+    if rows is None or values is None or npy.isscalar(values):
+        return values
+    elif isinstance(values, (pd.Series, pd.DataFrame)):
+        return values.iloc[rows]
+    return values[rows]
+
+
 class _LikelihoodInterface(process.Interface):
 
+    # How many parameter sets can be waiting in each process's pipe
+    PIPELINE_DEPTH = 8
+
     def run(self, communicator: List[Any], *args: Any) -> Any:
         # Our wrappers around the optimizers collapse the parameters into
         # a single parameter. Other optimizers probably won't do this, so
@@ -141,36 +577,288 @@ class _LikelihoodInterface(process.Interface):
         for likelihood_process in communicator:
             likelihood_process.send(args)
 
-        result = npy.float(0)
+        results = []
         for likelihood_process in communicator:
 
             data = likelihood_process.recv()
             if isinstance(data, process.ProcessCodes):
                 raise likelihood_process.recv()
 
-            result += data
-        return result
+            results.append(data)
+        return _reduce(results)
+
+    def run_batch(
+            self, communicator: List[Any], batch: List[Any]
+    ) -> npy.ndarray:
+        # Keep a few parameter sets queued in every pipe, so the processes
+        # start on the next set as soon as they've sent their result.
+        for parameters in batch[:self.PIPELINE_DEPTH]:
+            for likelihood_process in communicator:
+                likelihood_process.send(parameters)
+
+        results = npy.zeros(len(batch))
+        for index in range(len(batch)):
+            values = []
+            for likelihood_process in communicator:
+                data = likelihood_process.recv()
+                if isinstance(data, process.ProcessCodes):
+                    raise likelihood_process.recv()
+                values.append(data)
+            results[index] = _reduce(values)
+
+            queued = index + self.PIPELINE_DEPTH
+            if queued < len(batch):
+                for likelihood_process in communicator:
+                    likelihood_process.send(batch[queued])
+        return results
 
 
 class _GeneralLikelihood:
 
-    def __init__(self, amplitude: NestedFunction, num_of_process: int):
+    def __init__(
+            self, amplitude: NestedFunction, num_of_process: int,
+            use_shared_memory: bool = False,
+            pool: Opt[_pool] = None,
+            balance: bool = False,
+            parameter_names: Opt[List[str]] = None,
+            backend: str = "processes",
+            timeout: Opt[float] = None,
+            respawn: bool = False,
+            affinity: Union[bool, List[List[int]]] = False,
+            deterministic: bool = False,
+            cache_size: int = 0,
+            precision: str = "double"
+    ):
+        if backend not in ("processes", "threads"):
+            raise ValueError(f"Unknown backend {backend!r}!")
+        if precision not in ("double", "single"):
+            raise ValueError(f"Unknown precision {precision!r}!")
+
         self._amplitude = amplitude
         self._num_of_processes = num_of_process
+        self._use_shared_memory = use_shared_memory
+        self._pool = pool
+        self._balancer = process.LoadBalancer() if balance else \
+            process.LoadBalancer(rebalances=0)
+        # Compensated sums can't be sent through the shared results
+        self._parameter_names = None if deterministic else parameter_names
+        self._deterministic = deterministic
+        self._backend = backend
+        self._timeout = timeout
+        self._respawn = respawn
+        self._affinity = affinity
+        self._cache = collections.OrderedDict()
+        self._cache_size = cache_size
+        self._cache_hits = 0
+        self._cache_misses = 0
+
+        self._array_names = None
+        if amplitude.USE_ARRAYS:
+            if not parameter_names:
+                raise ValueError("Array parameters need parameter_names!")
+            self._array_names = list(parameter_names)
+            amplitude.setup_parameters(
+                {name: index for index, name in enumerate(parameter_names)}
+            )
 
     def _setup_interface(
             self, likelihood_data: Dict[str, Any], kernel: process.Kernel
     ):
-        if not self._amplitude.USE_MP or not self._num_of_processes:
+        if not self._num_of_processes or (
+                not self._amplitude.USE_MP and self._backend != "threads"
+        ):
             [setattr(kernel, n, v) for n, v in likelihood_data.items()]
             kernel.setup()
             self._interface = kernel
 
+        elif self._backend == "threads":
+            self._interface = process.make_threads(
+                likelihood_data, kernel, _LikelihoodInterface(),
+                self._num_of_processes
+            )
+
+        elif self._pool is not None:
+            # Only a WorkerPool's processes can be timed for the balancer
+            timed = {"timed": True} \
+                if isinstance(self._pool, process.WorkerPool) else {}
+            self._interface = self._pool.load(
+                likelihood_data, kernel, _LikelihoodInterface(),
+                min(self._num_of_processes, self._pool.size),
+                timeout=self._timeout, **timed
+            )
+
         else:
             interface = _LikelihoodInterface()
             self._interface = process.make_processes(
-                likelihood_data, kernel, interface, self._num_of_processes
-                )
+                likelihood_data, kernel, interface, self._num_of_processes,
+                use_shared_memory=self._use_shared_memory,
+                timeout=self._timeout, respawn=self._respawn,
+                affinity=self._affinity, timed=True
+            )
+
+        if self._parameter_names and \
+                isinstance(self._interface, process.ProcessInterface):
+            self._interface.share_parameters(
+                self._parameter_names, self._array_names is not None,
+                _GradientRequest if self.has_gradient else None
+            )
+
+    def _run(self, *args):
+        args = self._as_array(*args)
+        key = self.__cache_key(args)
+        if key is None:
+            return self.__compute(*args)
+
+        if key in self._cache:
+            self._cache_hits += 1
+            self._cache.move_to_end(key)
+            return self._cache[key]
+
+        self._cache_misses += 1
+        value = self.__compute(*args)
+        self._cache[key] = value
+        if len(self._cache) > self._cache_size:
+            self._cache.popitem(last=False)
+        return value
+
+    def __cache_key(self, args: Tuple[Any, ...]) -> Opt[Tuple[Any, ...]]:
+        if not self._cache_size:
+            return None
+
+        # Dictionaries are keyed by their sorted values, so the same
+        # point is found no matter what order the names were given in
+        if len(args) == 1 and isinstance(args[0], dict):
+            args = tuple(sorted(args[0].items()))
+        elif len(args) == 1 and isinstance(args[0], npy.ndarray):
+            args = tuple(args[0].tolist())
+        try:
+            hash(args)
+        except TypeError:
+            return None
+        return args
+
+    def __compute(self, *args):
+        if not isinstance(self._interface, process.ProcessInterface):
+            return _reduce([self._interface.run(*args)])
+
+        values = self.__shared_values(args)
+        if values is not None:
+            value = 0.0
+            for result in self._interface.run_shared(values):
+                value += result
+        else:
+            value = self._interface.run(*args)
+
+        self._balancer.update(self._interface)
+        return value
+
+    def __shared_values(self, args: Tuple[Any, ...]) -> Opt[List[float]]:
+        # The values for the shared parameter block, if it can be used
+        if not self._parameter_names or not isinstance(
+                self._interface, process.ProcessInterface
+        ) or len(args) != 1 or not isinstance(args[0], (dict, npy.ndarray)):
+            return None
+        if isinstance(args[0], dict):
+            return [args[0][name] for name in self._parameter_names]
+        return args[0]
+
+    def _as_array(self, *args) -> Tuple[Any, ...]:
+        # Amplitudes that use arrays can still be called with a
+        # dictionary, which is ordered by parameter_names once here
+        if self._array_names and len(args) == 1 and isinstance(args[0], dict):
+            return npy.array([args[0][n] for n in self._array_names]),
+        return args
+
+    def gradient(self, parameters: Dict[str, float]) -> Dict[str, float]:
+        """Computes the gradient of the likelihood
+
+        Only available if the amplitude defines gradient, see
+        `has_gradient`.
+
+        Parameters
+        ----------
+        parameters : Dict[str, float] or npy.ndarray
+            The parameters to compute the gradient at, as an array in the
+            order of parameter_names if the amplitude uses arrays.
+
+        Returns
+        -------
+        Dict[str, float]
+            The derivative of the likelihood for each parameter the
+            amplitude provides a derivative for.
+
+        Raises
+        ------
+        ValueError
+            If the amplitude does not define gradient.
+        """
+        if not self.has_gradient:
+            raise ValueError("The amplitude does not define a gradient!")
+        parameters, = self._as_array(parameters)
+
+        # Gradients go through the shared block too, so a fit that calls
+        # both doesn't move the processes in and out of the shared loop
+        values = self.__shared_values((parameters,))
+        if values is not None:
+            return _reduce(self._interface.run_shared(values, True))
+        return _reduce([self._interface.run(_GradientRequest(parameters))])
+
+    @property
+    def has_gradient(self) -> bool:
+        """True if the amplitude provides its own gradient"""
+        return _has_gradient(self._amplitude)
+
+    @property
+    def array_names(self) -> Opt[List[str]]:
+        """The order of the parameter array, if the amplitude uses arrays"""
+        return self._array_names
+
+    def batch(self, parameters: List[Dict[str, float]]) -> npy.ndarray:
+        """Computes the likelihood for several sets of parameters
+
+        The parameter sets are streamed to the processes back to back,
+        so the processes don't sit idle waiting between sets. Useful for
+        scans, finite differences, or population based optimizers.
+
+        Parameters
+        ----------
+        parameters : List[Dict[str, float]]
+            The sets of parameters to compute the likelihood for
+
+        Returns
+        -------
+        npy.ndarray
+            The likelihood for each set of parameters, in the same order
+        """
+        results = self._interface.run_batch(
+            [self._as_array(values)[0] for values in parameters]
+        )
+        return npy.array([_reduce([result]) for result in results])
+
+    @property
+    def cache_stats(self) -> Dict[str, int]:
+        """How well the cache of previous calls is doing
+
+        Provides hits, misses, the current size, and max_size. Only
+        calls with hashable parameters are counted.
+        """
+        return {
+            "hits": self._cache_hits, "misses": self._cache_misses,
+            "size": len(self._cache), "max_size": self._cache_size
+        }
+
+    def clear_cache(self):
+        """Forgets every cached call, and resets the counts"""
+        self._cache.clear()
+        self._cache_hits = self._cache_misses = 0
+
+    @property
+    def timings(self) -> Dict[str, Any]:
+        """How long each process has been taking to compute its share
+
+        See process.LoadBalancer.stats for the values provided.
+        """
+        return self._balancer.stats
 
 
 class ChiSquared(_GeneralLikelihood):
@@ -203,11 +891,76 @@ class ChiSquared(_GeneralLikelihood):
         to the number of threads available on the machine. If USE_MP is
         set to false or this is set to zero, no extra processes will
         be spawned
+    use_shared_memory : bool, optional
+        If True, the data is placed once into shared memory and each
+        process only receives a view of its partition instead of a copy.
+        Recommended for very large datasets. Defaults to False.
+    pool : WorkerPool or Cluster, optional
+        A pool of already running processes to load the likelihood into
+        instead of spawning new processes. Closing the likelihood hands
+        the processes back to the pool. With a Cluster, the data can be
+        paths to files that each worker reads its own share of.
+    balance : bool, optional
+        If True, the events are redistributed between the processes
+        after the first few calls so that every process takes about the
+        same time. The timings are available from `timings` either way.
+        Defaults to False.
+    parameter_names : List[str], optional
+        The names of every parameter the likelihood will be called with.
+        If provided, parameters are sent to the processes through shared
+        memory instead of being pickled for every process, which is much
+        quicker for fast amplitudes. Required for amplitudes that use
+        arrays, which are then given the parameters in this order.
+    backend : str, optional
+        Either "processes" or "threads". With threads, the amplitude is
+        run on a thread for each partition of the data, avoiding the cost
+        of spawning processes and copying the data. Only useful when the
+        amplitude spends most of its time in numpy or numexpr, which
+        release the GIL. Defaults to "processes".
+    timeout : float, optional
+        The most seconds to wait on a process before it is considered to
+        have stopped responding. Processes that die are always noticed,
+        this only catches processes that hang. Defaults to no limit.
+    respawn : bool, optional
+        If True, a process that dies or stops responding is replaced by
+        a new process with the same events, and the call is repeated.
+        Otherwise an error naming the process is raised. Not supported
+        with a pool. Defaults to False.
+    affinity : bool or List[List[int]], optional
+        If True, each process is pinned to its own core and keeps its
+        events in memory local to that core, with numexpr and BLAS
+        limited to as many threads as it has cores. Lists of cores can
+        be provided for each process instead. Not supported with a pool.
+        Defaults to False.
+    deterministic : bool, optional
+        If True, the sums are computed with twice the precision of a
+        float, so the likelihood is reproducible regardless of how the
+        data is split between the processes. About 30 times
+        slower to sum, and parameter_names is ignored. Defaults to False.
+    cache_size : int, optional
+        How many of the most recent calls to remember. A call with the
+        same parameters as a remembered call returns the remembered value
+        without computing the likelihood again, which helps when HESSE,
+        MINOS or scans repeat points. See `cache_stats`. Defaults to 0,
+        no cache.
+    precision : str, optional
+        Either "double" or "single". With single, each process converts
+        its doubles in the data and monte carlo to singles before the
+        amplitude sees them, halving the memory the amplitude has to
+        read, while the sums are still accumulated as doubles. Useful
+        for early fits and scans. Defaults to "double".
+    histogram : Dict[str, int or Sequence[float]], optional
+        The columns to histogram the data over, with the number of bins
+        or their edges. If provided, the data is histogrammed once, the
+        amplitude is evaluated only at the center of each non-empty bin,
+        and the bin counts are used as the binned values. Defaults to
+        using every event.
 
     Raises
     ------
     ValueError
-        If binned values or expected/errors are not provided
+        If binned values or expected/errors are not provided, a
+        histogram is combined with them, or the backend is unknown.
 
     Notes
     -----
@@ -231,16 +984,41 @@ class ChiSquared(_GeneralLikelihood):
             expected_values: Opt[Union[npy.ndarray, pd.Series]] = None,
             is_minimizer: Opt[bool] = True,
             num_of_processes=multiprocessing.cpu_count(),
+            use_shared_memory: bool = False,
+            pool: Opt[_pool] = None,
+            balance: bool = False,
+            parameter_names: Opt[List[str]] = None,
+            backend: str = "processes",
+            timeout: Opt[float] = None,
+            respawn: bool = False,
+            affinity: Union[bool, List[List[int]]] = False,
+            deterministic: bool = False,
+            cache_size: int = 0,
+            precision: str = "double",
+            histogram: Opt[_bins] = None
     ):
 
-        super(ChiSquared, self).__init__(amplitude, num_of_processes)
+        super(ChiSquared, self).__init__(
+            amplitude, num_of_processes, use_shared_memory, pool, balance,
+            parameter_names, backend, timeout, respawn, affinity,
+            deterministic, cache_size, precision
+        )
         multiplier = 1 if is_minimizer else -1
 
+        if histogram is not None:
+            if binned is not None or expected_values is not None:
+                raise ValueError(
+                    "A histogram can't be used with binned or expected values!"
+                )
+            data, binned, _, _ = _histogram(histogram, data)
+
         likelihood_data = self.__prep_data(
             data, binned, event_errors, expected_values
         )
 
-        kernel = _ChiSquaredKernel(multiplier, amplitude)
+        kernel = _ChiSquaredKernel(
+            multiplier, amplitude, deterministic, precision
+        )
         self._setup_interface(likelihood_data, kernel)
 
     @staticmethod
@@ -267,7 +1045,7 @@ class ChiSquared(_GeneralLikelihood):
         self.close()
 
     def __call__(self, *args):
-        return self._interface.run(*args)
+        return self._run(*args)
 
     def close(self):
         """Closes the likelihood
@@ -279,9 +1057,14 @@ class ChiSquared(_GeneralLikelihood):
 
 class _ChiSquaredKernel(process.Kernel):
 
-    def __init__(self, multiplier: int, amplitude: NestedFunction):
+    def __init__(
+            self, multiplier: int, amplitude: NestedFunction,
+            deterministic: bool = False, precision: str = "double"
+    ):
         self.__multiplier = multiplier
         self.__amplitude = amplitude
+        self.__deterministic = deterministic
+        self.__single = precision == "single"
 
         # These are set by the process lib
         self.data: npy.ndarray = None
@@ -293,6 +1076,8 @@ class _ChiSquaredKernel(process.Kernel):
         self.__likelihood: Callable[[npy.ndarray], npy.float] = None
 
     def setup(self):
+        if self.__single:
+            self.data = _to_single(self.data)
         self.__amplitude.setup(self.data)
 
         if self.binned is not None:
@@ -301,23 +1086,51 @@ class _ChiSquaredKernel(process.Kernel):
             self.__likelihood = self.__expected_errors
 
     def process(self, data: Any = False) -> float:
-        intensity = self.__amplitude.calculate(data)
-        return self.__multiplier * self.__likelihood(intensity)
+        if isinstance(data, _GradientRequest):
+            return self.__gradient(data.parameters)
+
+        intensity = _as_double(self.__amplitude.calculate(data), self.__single)
+        expression, values = self.__likelihood(intensity)
+        if self.__deterministic:
+            terms = ne.evaluate(expression, local_dict=values)
+            return _CompensatedSum(
+                [_reproducible_sum(terms)], [self.__multiplier]
+            )
+
+        return self.__multiplier * ne.evaluate(
+            f"sum({expression})", local_dict=values
+        )
 
-    def __binned(self, results):
-        return ne.evaluate(
-            "sum(((results - binned)**2)/binned)", local_dict={
-                "results": results, "binned": self.__binned
+    def __gradient(self, params):
+        # d/dp (I - e)**2 / err = 2 * (I - e) / err * dI/dp
+        intensity = _as_double(
+            self.__amplitude.calculate(params), self.__single
+        )
+        if self.binned is not None:
+            expected, errors = self.binned, self.binned
+        else:
+            expected, errors = self.expected_values, self.event_errors
+        weight = self.__multiplier * ne.evaluate(
+            "2 * (results - expected) / errors", local_dict={
+                "results": intensity, "expected": expected, "errors": errors
             }
         )
 
+        return {
+            name: npy.sum(weight * npy.asarray(derivative))
+            for name, derivative in self.__amplitude.gradient(params).items()
+        }
+
+    def __binned(self, results):
+        return "((results - binned)**2)/binned", {
+            "results": results, "binned": self.binned
+        }
+
     def __expected_errors(self, results):
-        return ne.evaluate(
-            "sum(((results - expected)**2)/errors)", local_dict={
-                "results": results, "expected": self.expected_values,
-                "errors": self.event_errors
-            }
-        )
+        return "((results - expected)**2)/errors", {
+            "results": results, "expected": self.expected_values,
+            "errors": self.event_errors
+        }
 
 
 class LogLikelihood(_GeneralLikelihood):
@@ -333,9 +1146,12 @@ class LogLikelihood(_GeneralLikelihood):
     ----------
     amplitude : AbstractAmplitude
         Either an user defined amplitude, or an amplitude from PyPWA
-    data : DataFrame or npy.ndarray
-        Data that will be passed directly to the amplitude
-    monte_carlo : DataFrame or npy.ndarray, optional
+    data : DataFrame, npy.ndarray, or project folder
+        Data that will be passed directly to the amplitude. If a folder
+        from a ProjectDatabase is given, each process reads its own range
+        of the events from the file in chunks, so the events never have
+        to fit in memory.
+    monte_carlo : DataFrame, npy.ndarray, or project folder, optional
         Data that will be passed to the monte_carlo
     binned : Series or npy.ndarray, optional
         Array with bin values. This won't be used if monte_carlo is
@@ -344,7 +1160,17 @@ class LogLikelihood(_GeneralLikelihood):
         Array with quality factor values
     generated_length : int, optional
         The generated length of values for use with the monte_carlo,
-        this value will default to the length of monte_carlo
+        this value will default to the length of monte_carlo. Must be
+        provided if the monte_carlo is given as paths for a Cluster.
+    monte_carlo_weights : Series or npy.ndarray, optional
+        The weight of every monte carlo event, applied to the amplitude
+        of each event in the monte carlo sum. The monte_carlo must be
+        provided. Defaults to 1.
+    weight_correction : bool, optional
+        If True, the likelihood is scaled by sum(Q_f) / sum(Q_f^2), so
+        that when the quality factors are event weights, such as
+        sWeights, the errors from the fit account for the weights. The
+        quality factors must be provided. Defaults to False.
     is_minimizer : bool, optional
         Specify if the final value of the likelihood should be multiplied
         by -1. Defaults to True.
@@ -353,6 +1179,100 @@ class LogLikelihood(_GeneralLikelihood):
         to the number of threads available on the machine. If USE_MP is
         set to false or this is set to zero, no extra processes will
         be spawned
+    use_shared_memory : bool, optional
+        If True, the data is placed once into shared memory and each
+        process only receives a view of its partition instead of a copy.
+        Recommended for very large datasets. Defaults to False.
+    pool : WorkerPool or Cluster, optional
+        A pool of already running processes to load the likelihood into
+        instead of spawning new processes. Closing the likelihood hands
+        the processes back to the pool. With a Cluster, the data can be
+        paths to files that each worker reads its own share of.
+    balance : bool, optional
+        If True, the events are redistributed between the processes
+        after the first few calls so that every process takes about the
+        same time. The timings are available from `timings` either way.
+        Defaults to False.
+    parameter_names : List[str], optional
+        The names of every parameter the likelihood will be called with.
+        If provided, parameters are sent to the processes through shared
+        memory instead of being pickled for every process, which is much
+        quicker for fast amplitudes. Required for amplitudes that use
+        arrays, which are then given the parameters in this order.
+    backend : str, optional
+        Either "processes" or "threads". With threads, the amplitude is
+        run on a thread for each partition of the data, avoiding the cost
+        of spawning processes and copying the data. Only useful when the
+        amplitude spends most of its time in numpy or numexpr, which
+        release the GIL. Defaults to "processes".
+    timeout : float, optional
+        The most seconds to wait on a process before it is considered to
+        have stopped responding. Processes that die are always noticed,
+        this only catches processes that hang. Defaults to no limit.
+    respawn : bool, optional
+        If True, a process that dies or stops responding is replaced by
+        a new process with the same events, and the call is repeated.
+        Otherwise an error naming the process is raised. Not supported
+        with a pool. Defaults to False.
+    affinity : bool or List[List[int]], optional
+        If True, each process is pinned to its own core and keeps its
+        events in memory local to that core, with numexpr and BLAS
+        limited to as many threads as it has cores. Lists of cores can
+        be provided for each process instead. Not supported with a pool.
+        Defaults to False.
+    deterministic : bool, optional
+        If True, the sums are computed with twice the precision of a
+        float, so the likelihood is reproducible regardless of how the
+        data is split between the processes. About 30 times
+        slower to sum, and parameter_names is ignored. Defaults to False.
+    cache_size : int, optional
+        How many of the most recent calls to remember. A call with the
+        same parameters as a remembered call returns the remembered value
+        without computing the likelihood again, which helps when HESSE,
+        MINOS or scans repeat points. See `cache_stats`. Defaults to 0,
+        no cache.
+    precision : str, optional
+        Either "double" or "single". With single, each process converts
+        its doubles in the data and monte carlo to singles before the
+        amplitude sees them, halving the memory the amplitude has to
+        read, while the sums are still accumulated as doubles. Useful
+        for early fits and scans. Defaults to "double".
+    monte_carlo_parameters : List[str], optional
+        The names of the only parameters that change the amplitude of
+        the monte carlo. If provided, the sum over the monte carlo is
+        reused for every call where these parameters are unchanged, such
+        as when only data side parameters are being moved. Defaults to
+        recomputing the monte carlo on every call.
+    chunk_size : int, optional
+        If provided, each process gives the amplitude this many events at
+        a time and adds up the results, so the amplitude's temporary
+        arrays never grow past the size of a chunk. A copy of the
+        amplitude is set up for each chunk, and the data must be an array
+        or DataFrame. Defaults to every event of the process at once, or
+        250,000 events for folders.
+    stream_cache : int, optional
+        How many bytes of events each process keeps in memory for each
+        folder. Chunks past this are read from the file again on every
+        call. Defaults to 1 GiB.
+    histogram : Dict[str, int or Sequence[float]], optional
+        The columns to histogram the events over, with the number of
+        bins or their edges. If provided, the data and monte carlo are
+        histogrammed once with the same edges, and the amplitude is only
+        evaluated at the center of each non-empty bin, with the counts
+        of the data used as the binned values, or as the quality factors
+        with monte carlo, and the counts of the monte carlo as its
+        weights. The quality factors and monte carlo weights are summed
+        into the counts. Only for events in memory. Defaults to using
+        every event.
+
+    Raises
+    ------
+    ValueError
+        If the backend is unknown, the monte_carlo is read by a
+        Cluster's workers without a generated_length, the weight
+        correction is requested without quality factors, monte carlo
+        weights are given without the monte_carlo, or a histogram is
+        requested with binned values or events that aren't in memory.
 
     Notes
     -----
@@ -369,49 +1289,134 @@ class LogLikelihood(_GeneralLikelihood):
         L = \\sum{Q_f \\cdot log (Amp(data))} - \\
             \\frac{1}{generated\_length} \\cdot \\sum{Amp(monte\_carlo)}
 
+    With monte carlo weights, each :math:`Amp(monte\_carlo)` in the sum is
+    multiplied by its weight.
+
     """
 
     def __init__(
             self, amplitude: NestedFunction,
-            data: Union[npy.ndarray, pd.DataFrame],
-            monte_carlo: Opt[Union[npy.ndarray, pd.DataFrame]] = None,
+            data: Union[npy.ndarray, pd.DataFrame, _folder],
+            monte_carlo: Opt[Union[npy.ndarray, pd.DataFrame, _folder]] = None,
             binned: Opt[Union[npy.ndarray, pd.Series]] = None,
             quality_factor: Opt[Union[npy.ndarray, pd.Series]] = None,
             generated_length: Opt[int] = 1,
             is_minimizer: Opt[bool] = True,
             num_of_processes=multiprocessing.cpu_count(),
+            use_shared_memory: bool = False,
+            pool: Opt[_pool] = None,
+            balance: bool = False,
+            parameter_names: Opt[List[str]] = None,
+            backend: str = "processes",
+            timeout: Opt[float] = None,
+            respawn: bool = False,
+            affinity: Union[bool, List[List[int]]] = False,
+            deterministic: bool = False,
+            cache_size: int = 0,
+            precision: str = "double",
+            monte_carlo_parameters: Opt[List[str]] = None,
+            monte_carlo_weights: Opt[Union[npy.ndarray, pd.Series]] = None,
+            weight_correction: bool = False,
+            chunk_size: Opt[int] = None,
+            stream_cache: int = 2 ** 30,
+            histogram: Opt[_bins] = None
     ):
-        super(LogLikelihood, self).__init__(amplitude, num_of_processes)
+        super(LogLikelihood, self).__init__(
+            amplitude, num_of_processes, use_shared_memory, pool, balance,
+            parameter_names, backend, timeout, respawn, affinity,
+            deterministic, cache_size, precision
+        )
         multiplier = -1 if is_minimizer else 1
+        if weight_correction:
+            multiplier *= self.__weight_correction(quality_factor)
+
+        if monte_carlo_weights is not None and monte_carlo is None:
+            raise ValueError("The monte carlo weights need the monte carlo!")
 
         if monte_carlo is not None and generated_length == 1:
+            if isinstance(monte_carlo, (str, Path, list)):
+                raise ValueError(
+                    "generated_length must be provided when the monte "
+                    "carlo is read by the workers!"
+                )
             generated_length = len(monte_carlo)
 
-        kernel = _LogLikelihoodKernel(multiplier, amplitude, generated_length)
+        if histogram is not None:
+            data, binned, quality_factor, monte_carlo, monte_carlo_weights = (
+                self.__histogram(
+                    histogram, data, monte_carlo, binned, quality_factor,
+                    monte_carlo_weights
+                )
+            )
+
+        # Arrays are indexed by position instead of by name
+        if self._array_names and monte_carlo_parameters is not None:
+            monte_carlo_parameters = [
+                self._array_names.index(n) for n in monte_carlo_parameters
+            ]
+
+        kernel = _LogLikelihoodKernel(
+            multiplier, amplitude, generated_length, deterministic,
+            monte_carlo_parameters, precision, chunk_size, stream_cache
+        )
         likelihood_data = self.__prep_data(
-            data, monte_carlo, binned, quality_factor
+            data, monte_carlo, binned, quality_factor, monte_carlo_weights
         )
 
         self._setup_interface(likelihood_data, kernel)
 
     @staticmethod
     def __prep_data(
-            data: Union[npy.ndarray, pd.DataFrame],
-            monte_carlo: Opt[Union[npy.ndarray, pd.DataFrame]] = None,
+            data: Union[npy.ndarray, pd.DataFrame, _folder],
+            monte_carlo: Opt[Union[npy.ndarray, pd.DataFrame, _folder]] = None,
             binned: Opt[Union[npy.ndarray, pd.Series]] = None,
             quality_factor: Opt[Union[npy.ndarray, pd.Series]] = None,
+            monte_carlo_weights: Opt[Union[npy.ndarray, pd.Series]] = None
     ) -> Dict[str, Union[npy.ndarray, pd.DataFrame, pd.Series]]:
         likelihood_data = {"data": data}
         if monte_carlo is not None:
             likelihood_data["monte_carlo"] = monte_carlo
+            if monte_carlo_weights is not None:
+                likelihood_data["monte_carlo_weights"] = monte_carlo_weights
         if binned is not None:
             likelihood_data["binned"] = binned
         if quality_factor is not None:
             likelihood_data["quality_factor"] = quality_factor
         return likelihood_data
 
+    @staticmethod
+    def __histogram(
+            bins: _bins,
+            data: Union[npy.ndarray, pd.DataFrame],
+            monte_carlo: Opt[Union[npy.ndarray, pd.DataFrame]],
+            binned: Opt[Union[npy.ndarray, pd.Series]],
+            quality_factor: Opt[Union[npy.ndarray, pd.Series]],
+            monte_carlo_weights: Opt[Union[npy.ndarray, pd.Series]]
+    ) -> Tuple[Any, Opt[npy.ndarray], Opt[npy.ndarray], Any, Any]:
+        if binned is not None:
+            raise ValueError("A histogram can't be used with binned values!")
+
+        data, counts, monte_carlo, monte_carlo_weights = _histogram(
+            bins, data, quality_factor, monte_carlo, monte_carlo_weights
+        )
+
+        # Binned values are ignored by the extended likelihood, so the
+        # counts are carried by the quality factors instead
+        if monte_carlo is None:
+            return data, counts, None, None, None
+        return data, None, counts, monte_carlo, monte_carlo_weights
+
+    @staticmethod
+    def __weight_correction(
+            quality_factor: Opt[Union[npy.ndarray, pd.Series]]
+    ) -> float:
+        if quality_factor is None:
+            raise ValueError("The weight correction needs quality factors!")
+        weights = npy.asarray(quality_factor, dtype=float)
+        return npy.sum(weights) / npy.sum(weights ** 2)
+
     def __call__(self, *args):
-        return self._interface.run(*args)
+        return self._run(*args)
 
     def __enter__(self):
         return self
@@ -431,51 +1436,173 @@ class _LogLikelihoodKernel(process.Kernel):
 
     def __init__(
             self, multiplier: int, amplitude: NestedFunction,
-            generated_length=Opt[int]
+            generated_length=Opt[int], deterministic: bool = False,
+            monte_carlo_parameters: Opt[List[str]] = None,
+            precision: str = "double", chunk_size: Opt[int] = None,
+            stream_cache: int = 2 ** 30
     ):
         self.__multiplier = multiplier
         self.__data_amplitude = amplitude
         self.__monte_carlo_amplitude = copy.deepcopy(amplitude)
         self.__generated = 1/generated_length
+        self.__deterministic = deterministic
+        self.__monte_carlo_parameters = monte_carlo_parameters
+        self.__single = precision == "single"
+        self.__chunk_size = chunk_size
+        self.__stream_cache = stream_cache
+        self.__last_key: Opt[Tuple[Any, ...]] = None
+        self.__last_sum: Any = None
 
         # These are set by the process lib
         self.data: npy.ndarray = None
         self.monte_carlo: npy.ndarray = None
+        self.monte_carlo_weights: npy.ndarray = None
         self.binned: Union[npy.ndarray, float] = 1
         self.quality_factor: Union[npy.ndarray, float] = 1
 
-        # This is set at run time, after data has been loaded
+        # These are set at run time, after data has been loaded
         self.__likelihood: Callable[[npy.ndarray], npy.float] = None
+        self.__use_integrals = False
+        self.__data_chunks: Iterable[_chunk] = None
+        self.__monte_carlo_chunks: Iterable[_chunk] = None
 
     def setup(self):
-        self.__data_amplitude.setup(self.data)
+        if self.__single:
+            self.data = _to_single(self.data)
+            self.monte_carlo = _to_single(self.monte_carlo)
+        self.__data_chunks = _make_chunks(
+            self.__data_amplitude, self.data, self.__chunk_size,
+            self.__single, self.__stream_cache
+        )
 
         if self.monte_carlo is not None and self.__generated is not None:
-            self.__monte_carlo_amplitude.setup(self.monte_carlo)
+            self.__monte_carlo_chunks = _make_chunks(
+                self.__monte_carlo_amplitude, self.monte_carlo,
+                self.__chunk_size, self.__single, self.__stream_cache
+            )
             self.__likelihood = self.__extended_likelihood
+
+            # Waves can sum the monte carlo from their integrals, but the
+            # deterministic and weighted sums need every event
+            self.__use_integrals = not self.__deterministic and isinstance(
+                self.__monte_carlo_amplitude, WaveAmplitude
+            ) and self.monte_carlo_weights is None
         else:
             self.__likelihood = self.__log_likelihood
 
     def process(self, data: Any = False) -> float:
-        return self.__multiplier * self.__likelihood(data)
+        if isinstance(data, _GradientRequest):
+            return self.__gradient(data.parameters)
+        return self.__likelihood(data)
+
+    def close(self):
+        _close_chunks(self.__data_chunks)
+        _close_chunks(self.__monte_carlo_chunks)
+
+    def __gradient(self, params):
+        # d/dp qf * binned * log(I) = qf * binned / I * dI/dp, binned is
+        # ignored by the extended likelihood
+        extended = self.__likelihood == self.__extended_likelihood
+        gradient = {}
+        for amplitude, rows in self.__data_chunks:
+            values = self.__values(amplitude, params, rows)
+            if extended:
+                values["binned"] = 1
+            weight = self.__multiplier * ne.evaluate(
+                "qf * binned / data", local_dict=values
+            )
+
+            for name, derivative in amplitude.gradient(params).items():
+                gradient[name] = gradient.get(name, 0.) + npy.sum(
+                    weight * npy.asarray(derivative)
+                )
+
+        if extended:
+            scale = self.__multiplier * self.__generated
+            for amplitude, rows in self.__monte_carlo_chunks:
+                if self.__use_integrals:
+                    monte_carlo = amplitude.integral_gradient(params)
+                else:
+                    monte_carlo = amplitude.gradient(params)
+
+                for name, derivative in monte_carlo.items():
+                    gradient[name] = gradient.get(name, 0.) - scale * npy.sum(
+                        self.__weigh(derivative, rows)
+                    )
+        return gradient
+
+    def __values(self, amplitude, params, rows) -> Dict[str, Any]:
+        return {
+            "qf": _rows(self.quality_factor, rows),
+            "binned": _rows(self.binned, rows),
+            "data": _as_double(amplitude.calculate(params), self.__single)
+        }
+
+    def __weigh(self, values, rows):
+        if self.monte_carlo_weights is None:
+            return values
+        weights = _rows(self.monte_carlo_weights, rows)
+        return npy.asarray(values) * npy.asarray(weights)
+
+    def __data_sum(self, params, expression):
+        # Deterministic sums are kept as the pieces of every chunk
+        total = [] if self.__deterministic else 0.
+        for amplitude, rows in self.__data_chunks:
+            values = self.__values(amplitude, params, rows)
+            if self.__deterministic:
+                total += _reproducible_sum(
+                    ne.evaluate(expression, local_dict=values)
+                )
+            else:
+                total += ne.evaluate(f"sum({expression})", local_dict=values)
+        return total
 
     def __extended_likelihood(self, params):
-        data = self.__data_amplitude.calculate(params)
-        monte_carlo = self.__monte_carlo_amplitude.calculate(params)
-        likelihood = ne.evaluate(
-            "sum(qf * log(data))", local_dict={
-                "qf": self.quality_factor, "data": data
-            }
+        likelihood = self.__data_sum(params, "qf * log(data)")
+        monte_carlo = self.__monte_carlo_sum(params)
+
+        if self.__deterministic:
+            return _CompensatedSum(
+                [likelihood, monte_carlo],
+                [self.__multiplier, -self.__multiplier * self.__generated]
+            )
+
+        return self.__multiplier * (
+            likelihood - self.__generated * monte_carlo
         )
-        return likelihood - self.__generated * npy.sum(monte_carlo)
+
+    def __monte_carlo_sum(self, params):
+        # The last sum is reused while the parameters that the monte carlo
+        # depends on haven't changed
+        key = None
+        if self.__monte_carlo_parameters is not None and \
+                isinstance(params, (dict, npy.ndarray)):
+            key = tuple(params[n] for n in self.__monte_carlo_parameters)
+            if key == self.__last_key:
+                return self.__last_sum
+
+        total = [] if self.__deterministic else 0.
+        for amplitude, rows in self.__monte_carlo_chunks:
+            if self.__use_integrals:
+                total += amplitude.integral(params)
+                continue
+
+            values = self.__weigh(
+                _as_double(amplitude.calculate(params), self.__single), rows
+            )
+            if self.__deterministic:
+                total += _reproducible_sum(values)
+            else:
+                total += npy.sum(values)
+
+        self.__last_key, self.__last_sum = key, total
+        return total
 
     def __log_likelihood(self, params):
-        data = self.__data_amplitude.calculate(params)
-        return ne.evaluate(
-            "sum(qf*binned*log(data))", local_dict={
-                "qf": self.quality_factor, "binned": self.binned, "data": data
-            }
-        )
+        likelihood = self.__data_sum(params, "qf*binned*log(data)")
+        if self.__deterministic:
+            return _CompensatedSum([likelihood], [self.__multiplier])
+        return self.__multiplier * likelihood
 
 
 class EmptyLikelihood(_GeneralLikelihood):
@@ -496,19 +1623,99 @@ class EmptyLikelihood(_GeneralLikelihood):
         to the number of threads available on the machine. If USE_MP is
         set to false or this is set to zero, no extra processes will
         be spawned
+    use_shared_memory : bool, optional
+        If True, the data is placed once into shared memory and each
+        process only receives a view of its partition instead of a copy.
+        Recommended for very large datasets. Defaults to False.
+    pool : WorkerPool or Cluster, optional
+        A pool of already running processes to load the likelihood into
+        instead of spawning new processes. Closing the likelihood hands
+        the processes back to the pool. With a Cluster, the data can be
+        paths to files that each worker reads its own share of.
+    balance : bool, optional
+        If True, the events are redistributed between the processes
+        after the first few calls so that every process takes about the
+        same time. The timings are available from `timings` either way.
+        Defaults to False.
+    parameter_names : List[str], optional
+        The names of every parameter the likelihood will be called with.
+        If provided, parameters are sent to the processes through shared
+        memory instead of being pickled for every process, which is much
+        quicker for fast amplitudes. Required for amplitudes that use
+        arrays, which are then given the parameters in this order.
+    backend : str, optional
+        Either "processes" or "threads". With threads, the amplitude is
+        run on a thread for each partition of the data, avoiding the cost
+        of spawning processes and copying the data. Only useful when the
+        amplitude spends most of its time in numpy or numexpr, which
+        release the GIL. Defaults to "processes".
+    timeout : float, optional
+        The most seconds to wait on a process before it is considered to
+        have stopped responding. Processes that die are always noticed,
+        this only catches processes that hang. Defaults to no limit.
+    respawn : bool, optional
+        If True, a process that dies or stops responding is replaced by
+        a new process with the same events, and the call is repeated.
+        Otherwise an error naming the process is raised. Not supported
+        with a pool. Defaults to False.
+    affinity : bool or List[List[int]], optional
+        If True, each process is pinned to its own core and keeps its
+        events in memory local to that core, with numexpr and BLAS
+        limited to as many threads as it has cores. Lists of cores can
+        be provided for each process instead. Not supported with a pool.
+        Defaults to False.
+    deterministic : bool, optional
+        If True, the sums are computed with twice the precision of a
+        float, so the likelihood is reproducible regardless of how the
+        data is split between the processes. About 30 times
+        slower to sum, and parameter_names is ignored. Defaults to False.
+    cache_size : int, optional
+        How many of the most recent calls to remember. A call with the
+        same parameters as a remembered call returns the remembered value
+        without computing the likelihood again, which helps when HESSE,
+        MINOS or scans repeat points. See `cache_stats`. Defaults to 0,
+        no cache.
+    precision : str, optional
+        Either "double" or "single". With single, each process converts
+        its doubles in the data and monte carlo to singles before the
+        amplitude sees them, halving the memory the amplitude has to
+        read, while the sums are still accumulated as doubles. Useful
+        for early fits and scans. Defaults to "double".
+    chunk_size : int, optional
+        If provided, each process gives the amplitude this many events at
+        a time and adds up the results, so the amplitude's temporary
+        arrays never grow past the size of a chunk. A copy of the
+        amplitude is set up for each chunk, and the data must be an array
+        or DataFrame. Defaults to every event of the process at once.
     """
 
     def __init__(
             self, amplitude: NestedFunction,
             data: Union[npy.ndarray, pd.DataFrame],
-            num_of_processes=multiprocessing.cpu_count()
+            num_of_processes=multiprocessing.cpu_count(),
+            use_shared_memory: bool = False,
+            pool: Opt[_pool] = None,
+            balance: bool = False,
+            parameter_names: Opt[List[str]] = None,
+            backend: str = "processes",
+            timeout: Opt[float] = None,
+            respawn: bool = False,
+            affinity: Union[bool, List[List[int]]] = False,
+            deterministic: bool = False,
+            cache_size: int = 0,
+            precision: str = "double",
+            chunk_size: Opt[int] = None
     ):
-        super(EmptyLikelihood, self).__init__(amplitude, num_of_processes)
-        kernel = _EmptyKernel(amplitude)
+        super(EmptyLikelihood, self).__init__(
+            amplitude, num_of_processes, use_shared_memory, pool, balance,
+            parameter_names, backend, timeout, respawn, affinity,
+            deterministic, cache_size, precision
+        )
+        kernel = _EmptyKernel(amplitude, deterministic, precision, chunk_size)
         self._setup_interface({"data": data}, kernel)
 
     def __call__(self, *args):
-        return self._interface.run(*args)
+        return self._run(*args)
 
     def __enter__(self):
         return self
@@ -526,14 +1733,49 @@ class EmptyLikelihood(_GeneralLikelihood):
 
 class _EmptyKernel(process.Kernel):
 
-    def __init__(self, amplitude: NestedFunction):
+    def __init__(
+            self, amplitude: NestedFunction, deterministic: bool = False,
+            precision: str = "double", chunk_size: Opt[int] = None
+    ):
         self.__amplitude = amplitude
+        self.__deterministic = deterministic
+        self.__single = precision == "single"
+        self.__chunk_size = chunk_size
 
         # These are set by the process lib
         self.data: npy.ndarray = None
 
+        # This is set at run time, after data has been loaded
+        self.__chunks: Iterable[_chunk] = None
+
     def setup(self):
-        self.__amplitude.setup(self.data)
+        if self.__single:
+            self.data = _to_single(self.data)
+        self.__chunks = _make_chunks(
+            self.__amplitude, self.data, self.__chunk_size, self.__single
+        )
+
+    def close(self):
+        _close_chunks(self.__chunks)
 
     def process(self, data: Any = False) -> float:
-        return npy.sum(self.__amplitude.calculate(data))
+        if isinstance(data, _GradientRequest):
+            gradient = {}
+            for amplitude, rows in self.__chunks:
+                derivatives = amplitude.gradient(data.parameters)
+                for name, derivative in derivatives.items():
+                    gradient[name] = gradient.get(name, 0.) + \
+                        npy.sum(derivative)
+            return gradient
+
+        total = [] if self.__deterministic else 0.
+        for amplitude, rows in self.__chunks:
+            values = _as_double(amplitude.calculate(data), self.__single)
+            if self.__deterministic:
+                total += _reproducible_sum(values)
+            else:
+                total += npy.sum(values)
+
+        if self.__deterministic:
+            return _CompensatedSum([total], [1])
+        return total
@@ -20,11 +20,19 @@
 
 """
 
-from typing import Any as _Any, Callable as _Call, Dict as _Dict, List as _List
+import collections as _collections
+import copy as _copy
+import dataclasses as _dataclasses
+from typing import (
+    Any as _Any, Callable as _Call, Dict as _Dict, List as _List,
+    Optional as _Opt, Union as _Union
+)
 
 import iminuit as _iminuit
+import numpy as _npy
 
 from PyPWA import info as _info
+from PyPWA.libs import process as _process
 from . import likelihoods as _likelihoods
 
 __credits__ = ["Mark Jones"]
@@ -35,23 +43,63 @@ __version__ = _info.VERSION
 class _Translator:
 
     def __init__(
-            self, parameters: _List[str], function_call: _Call[[_Any], float]
+            self, parameters: _List[str], function_call: _Call[[_Any], float],
+            fixed: _List[str] = ()
     ):
         self.__parameters = parameters
         self.__function = function_call
+        self.__fixed = set(fixed)
+
+        # Likelihoods whose amplitude uses arrays are given the values
+        # directly, reordered from minuit's order to their own
+        self.__order = None
+        names = getattr(function_call, "array_names", None)
+        if names:
+            self.__order = _npy.array([parameters.index(n) for n in names])
 
     def __call__(self, *args: _List[float]) -> float:
+        return self.__function(self.__with_values(args))
+
+    def gradient(self, *args: _List[float]) -> _List[float]:
+        gradient = self.__function.gradient(self.__with_values(args))
+        missing = self.__missing(gradient)
+        if missing:
+            raise ValueError(
+                f"The amplitude has no derivative for {', '.join(missing)}!"
+            )
+        # Only fixed parameters can go without a derivative
+        return [gradient.get(name, 0.) for name in self.__parameters]
+
+    def has_full_gradient(self, *args: _List[float]) -> bool:
+        # Whether every free parameter has a derivative at these values,
+        # otherwise the optimizer has to use finite differences instead
+        if not getattr(self.__function, "has_gradient", False):
+            return False
+        gradient = self.__function.gradient(self.__with_values(args))
+        return not self.__missing(gradient)
+
+    def __missing(self, gradient: _Dict[str, float]) -> _List[str]:
+        return [
+            name for name in self.__parameters
+            if name not in gradient and name not in self.__fixed
+        ]
+
+    def __with_values(
+            self, args: _List[float]
+    ) -> _Union[_Dict[str, float], _npy.ndarray]:
+        if self.__order is not None:
+            return _npy.array(args)[self.__order]
+
         parameters_with_values = {}
         for parameter, arg in zip(self.__parameters, args):
             parameters_with_values[parameter] = arg
-
-        return self.__function(parameters_with_values)
+        return parameters_with_values
 
 
 def minuit(
         parameters: _List[str], settings: _Dict[str, _Any],
         likelihood: _likelihoods.ChiSquared, set_up: int, strategy=1,
-        num_of_calls=1000
+        num_of_calls=1000, use_gradient=True
 ):
     """Optimization using iminuit
 
@@ -70,6 +118,10 @@ def minuit(
     num_of_calls : int
         A suggested max number of calls to minuit. This may or may not
         be respected.
+    use_gradient : bool, optional
+        If True and the likelihood's amplitude defines a derivative for
+        every free parameter, the analytic gradient is given to iminuit
+        instead of it computing finite differences. Defaults to True.
 
     Returns
     -------
@@ -85,7 +137,11 @@ def minuit(
     """
     settings["forced_parameters"] = parameters
     settings["errordef"] = set_up
-    translator = _Translator(parameters, likelihood)
+    fixed = [name for name in parameters if settings.get(f"fix_{name}")]
+    translator = _Translator(parameters, likelihood, fixed)
+    start = [settings.get(name, 0.) for name in parameters]
+    if use_gradient and translator.has_full_gradient(*start):
+        settings["grad"] = translator.gradient
     optimizer = _iminuit.Minuit(translator, **settings)
 
     optimizer.strategy = strategy
@@ -93,3 +149,247 @@ def minuit(
     optimizer.migrad(num_of_calls)
 
     return optimizer
+
+
+@_dataclasses.dataclass
+class StartResult:
+    """The outcome of a fit from one starting point of multi_start
+
+    Attributes
+    ----------
+    start : Dict[str, float]
+        The values the fit was started from.
+    values : Dict[str, float]
+        The values at the minimum.
+    errors : Dict[str, float]
+        The errors at the minimum.
+    fval : float
+        The value of the likelihood at the minimum.
+    valid : bool
+        If MIGRAD considers the minimum valid.
+    edm : float
+        The estimated distance to the minimum.
+    calls : int
+        How many times the likelihood or its gradient was called.
+    accurate_covariance : bool
+        If the covariance matrix is accurate.
+    at_limit : bool
+        If any parameter is at one of its limits.
+    reached_call_limit : bool
+        If MIGRAD stopped because it ran out of calls.
+    """
+    start: _Dict[str, float]
+    values: _Dict[str, float]
+    errors: _Dict[str, float]
+    fval: float
+    valid: bool
+    edm: float
+    calls: int
+    accurate_covariance: bool
+    at_limit: bool
+    reached_call_limit: bool
+
+
+def multi_start(
+        parameters: _List[str], settings: _Dict[str, _Any],
+        likelihood: _likelihoods.ChiSquared, set_up: int,
+        num_of_starts: int = 50, sampling: str = "uniform",
+        seed: _Opt[int] = None, strategy: int = 1, num_of_calls: int = 1000,
+        use_gradient: bool = True,
+        num_of_processes: int = _process.MAX_PROC
+) -> _List[StartResult]:
+    """Fits from many starting points to search for the global minimum
+
+    The starting points are drawn between the limits of every free
+    parameter that has both limits set, and the other parameters start
+    from their values in settings. Each fit is run with minuit, spread
+    across a set of processes that each hold their own copy of the
+    likelihood, so only the starting points are sent for every fit.
+
+    Parameters
+    ----------
+    parameters : List[str]
+        The names of the parameters for iminuit to use
+    settings : Dict[str, Any]
+        The settings to be passed to iminuit for every fit. The limits
+        set with limit_<name> are where the starting points are drawn.
+    likelihood : Likelihood object from likelihoods or single function
+        Likelihoods must be created with num_of_processes=0, as they're
+        copied into each of the processes.
+    set_up : float
+        Set to 1 for log-likelihoods, or .5 for Chi-Squared
+    num_of_starts : int, optional
+        How many fits to run. Defaults to 50.
+    sampling : str, optional
+        Either "uniform", where each starting point is drawn uniformly
+        between the limits, or "latin", a latin hypercube, where the
+        range of every parameter is split into num_of_starts slices and
+        each slice is started from once. Defaults to "uniform".
+    seed : int, optional
+        The seed for the starting points, for repeatable fits.
+    strategy : int, optional
+        Fitting strategy passed to minuit. Defaults to 1.
+    num_of_calls : int, optional
+        A suggested max number of calls to minuit for each fit.
+    use_gradient : bool, optional
+        Passed to minuit for every fit. Defaults to True.
+    num_of_processes : int, optional
+        How many fits to run at once, defaults to the number of CPUs. If
+        set to zero, the fits are run one after another on the main
+        process.
+
+    Returns
+    -------
+    List[StartResult]
+        The result of every fit, from the smallest likelihood to the
+        largest.
+
+    Raises
+    ------
+    ValueError
+        If the sampling is unknown, no free parameter has both limits,
+        or the likelihood has its own processes, threads, or workers.
+    RuntimeError
+        If a process dies during a fit, naming the start it was fitting.
+
+    Examples
+    --------
+    >>> with LogLikelihood(amp, data, mc, num_of_processes=0) as like:
+    ...     results = multi_start(params, settings, like, 1, 100)
+    >>> best = results[0].values
+    """
+    # Only likelihoods that run on the main process can be copied into
+    # the processes, which rules out processes, threads, and clusters
+    interface = getattr(likelihood, "_interface", None)
+    if interface is not None and not isinstance(interface, _process.Kernel):
+        raise ValueError(
+            f"multi_start needs a likelihood without processes, not one "
+            f"using a {type(interface).__name__}!"
+        )
+
+    starts = _make_starts(
+        parameters, settings, num_of_starts, sampling,
+        _npy.random.RandomState(seed)
+    )
+    kernel = _MultiStartKernel(
+        parameters, settings, likelihood, set_up, strategy, num_of_calls,
+        use_gradient
+    )
+
+    if not num_of_processes:
+        results = kernel.run_batch(starts)
+    else:
+        interface = _process.make_processes(
+            {}, kernel, _MultiStartInterface(),
+            min(num_of_processes, len(starts))
+        )
+        try:
+            results = interface.run(starts)
+        finally:
+            interface.close()
+
+    # Failed fits can return nan, which are ranked last
+    return sorted(results, key=lambda r: (_npy.isnan(r.fval), r.fval))
+
+
+def _make_starts(
+        parameters: _List[str], settings: _Dict[str, _Any], number: int,
+        sampling: str, random: _npy.random.RandomState
+) -> _List[_Dict[str, float]]:
+    free = []
+    for name in parameters:
+        limits = settings.get(f"limit_{name}")
+        if settings.get(f"fix_{name}") or limits is None or None in limits:
+            continue
+        free.append(name)
+    if not free:
+        raise ValueError("No free parameters have both limits set!")
+
+    if sampling == "uniform":
+        unit = random.random_sample((number, len(free)))
+    elif sampling == "latin":
+        slices = _npy.array([random.permutation(number) for _ in free]).T
+        unit = (slices + random.random_sample(slices.shape)) / number
+    else:
+        raise ValueError(f"Unknown sampling {sampling!r}!")
+
+    low, high = _npy.array([settings[f"limit_{name}"] for name in free]).T
+    values = low + unit * (high - low)
+    return [dict(zip(free, start.tolist())) for start in values]
+
+
+class _MultiStartKernel(_process.Kernel):
+
+    def __init__(
+            self, parameters: _List[str], settings: _Dict[str, _Any],
+            likelihood: _Any, set_up: int, strategy: int, num_of_calls: int,
+            use_gradient: bool
+    ):
+        self.__parameters = parameters
+        self.__settings = settings
+        self.__likelihood = likelihood
+        self.__set_up = set_up
+        self.__strategy = strategy
+        self.__num_of_calls = num_of_calls
+        self.__use_gradient = use_gradient
+
+    def __deepcopy__(self, memo: _Dict[int, _Any]) -> "_MultiStartKernel":
+        # Each process gets its own copy of the likelihood when it starts,
+        # so the kernels don't need to copy it beforehand
+        return _copy.copy(self)
+
+    def setup(self):
+        pass
+
+    def process(self, data: _Any = False) -> StartResult:
+        settings = dict(self.__settings)
+        settings.update(data)
+        optimizer = minuit(
+            self.__parameters, settings, self.__likelihood, self.__set_up,
+            self.__strategy, self.__num_of_calls, self.__use_gradient
+        )
+        return StartResult(
+            dict(data), dict(optimizer.values), dict(optimizer.errors),
+            optimizer.fval, optimizer.valid, optimizer.fmin.edm,
+            optimizer.ncalls_total + optimizer.ngrads_total,
+            optimizer.fmin.has_accurate_covar,
+            optimizer.fmin.has_parameters_at_limit,
+            optimizer.fmin.has_reached_call_limit
+        )
+
+
+class _MultiStartInterface(_process.Interface):
+
+    # How many seconds to wait on each process before checking the next
+    INTERVAL = .01
+
+    def run(self, communicator: _List[_Any], *args: _Any) -> _List[_Any]:
+        # Each process is sent its next start as soon as it's finished
+        pending = _collections.deque(enumerate(args[0]))
+        results = [None] * len(args[0])
+        working = {}
+        for connection in communicator:
+            if pending:
+                working[connection], start = pending.popleft()
+                connection.send(start)
+
+        while working:
+            for connection in list(working):
+                try:
+                    if not connection.poll(self.INTERVAL):
+                        continue
+                    data = connection.recv()
+                except (EOFError, OSError, RuntimeError) as error:
+                    raise RuntimeError(
+                        f"Lost the process fitting start "
+                        f"{working[connection]}! {error}"
+                    ) from error
+
+                if isinstance(data, _process.ProcessCodes):
+                    raise connection.recv()
+                results[working.pop(connection)] = data
+
+                if pending:
+                    working[connection], start = pending.popleft()
+                    connection.send(start)
+        return results
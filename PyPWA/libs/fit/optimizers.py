@@ -0,0 +1,515 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Optimizers that share the settings and results of the minuit wrapper.
+=====================================================================
+
+Every optimizer accepts the parameter names, the iminuit style settings,
+and the likelihood, and returns a FitResult with the same fields, so the
+optimizer used for a fit can be swapped by changing a single argument.
+Initial values are taken from `<name>`, limits from `limit_<name>`,
+fixed parameters from `fix_<name>` and initial steps from `error_<name>`.
+"""
+
+import dataclasses
+import time
+from abc import ABC, abstractmethod
+from typing import Any, Dict, List, Optional as Opt, Tuple, Union
+
+import numpy as npy
+import scipy
+from scipy import optimize as scipy_optimize
+
+from PyPWA import info as _info
+from .minuit import minuit, _Translator
+
+__credits__ = ["Mark Jones"]
+__author__ = _info.AUTHOR
+__version__ = _info.VERSION
+
+
+_SCIPY_VERSION = tuple(int(part) for part in scipy.__version__.split(".")[:2])
+
+
+@dataclasses.dataclass
+class FitResult:
+    """The outcome of a fit from any of the optimizers
+
+    Attributes
+    ----------
+    values : Dict[str, float]
+        The values at the minimum.
+    errors : Dict[str, float]
+        The errors at the minimum, from the covariance of the fit. Fixed
+        parameters have no error, and errors that couldn't be estimated
+        are nan.
+    fval : float
+        The value of the likelihood at the minimum.
+    valid : bool
+        If the optimizer considers the fit to have converged.
+    calls : int
+        How many times the likelihood or its gradient was called.
+    time : float
+        How many seconds the fit took.
+    optimizer : str
+        The name of the optimizer.
+    message : str
+        Why the optimizer stopped.
+    result : Any
+        What the optimizer returned, such as the Minuit object, for
+        anything the other fields don't cover.
+    """
+    values: Dict[str, float]
+    errors: Dict[str, float]
+    fval: float
+    valid: bool
+    calls: int
+    time: float
+    optimizer: str
+    message: str = ""
+    result: Any = None
+
+
+class Optimizer(ABC):
+    """Interface for optimizers
+
+    Subclass this to use another optimizer with optimize.
+    """
+
+    @abstractmethod
+    def minimize(
+            self, parameters: List[str], settings: Dict[str, Any],
+            likelihood: Any, set_up: float
+    ) -> FitResult:
+        """Fits the likelihood
+
+        Parameters
+        ----------
+        parameters : List[str]
+            The names of the parameters to fit.
+        settings : Dict[str, Any]
+            The iminuit style settings of the parameters.
+        likelihood : Likelihood object from likelihoods or single function
+            The likelihood to minimize.
+        set_up : float
+            Set to 1 for log-likelihoods, or .5 for Chi-Squared
+
+        Returns
+        -------
+        FitResult
+            The result of the fit.
+        """
+        ...
+
+
+class MinuitOptimizer(Optimizer):
+    """Fits with MIGRAD through minuit
+
+    Parameters
+    ----------
+    strategy : int, optional
+        Fitting strategy. Defaults to 1.
+    num_of_calls : int, optional
+        A suggested max number of calls to minuit.
+    use_gradient : bool, optional
+        If True and the likelihood's amplitude defines a derivative for
+        every free parameter, the analytic gradient is given to iminuit.
+        Defaults to True.
+    """
+
+    def __init__(
+            self, strategy: int = 1, num_of_calls: int = 1000,
+            use_gradient: bool = True
+    ):
+        self.__strategy = strategy
+        self.__num_of_calls = num_of_calls
+        self.__use_gradient = use_gradient
+
+    def minimize(
+            self, parameters: List[str], settings: Dict[str, Any],
+            likelihood: Any, set_up: float
+    ) -> FitResult:
+        start = time.perf_counter()
+        optimizer = minuit(
+            parameters, dict(settings), likelihood, set_up,
+            self.__strategy, self.__num_of_calls, self.__use_gradient
+        )
+        return from_minuit(optimizer, time.perf_counter() - start)
+
+
+def from_minuit(optimizer: Any, seconds: float = 0.) -> FitResult:
+    """Describes a finished Minuit object as a FitResult
+
+    Parameters
+    ----------
+    optimizer : iminuit.Minuit
+        The minuit object after migrad has run.
+    seconds : float, optional
+        How long the fit took.
+
+    Returns
+    -------
+    FitResult
+        The result, with the Minuit object kept as its result.
+    """
+    # Minuit reports the initial step as the error of fixed parameters
+    errors = {
+        name: 0. if optimizer.fixed[name] else error
+        for name, error in optimizer.errors.items()
+    }
+    return FitResult(
+        dict(optimizer.values), errors, optimizer.fval, optimizer.valid,
+        optimizer.ncalls_total + optimizer.ngrads_total, seconds, "minuit",
+        "" if optimizer.valid else str(optimizer.fmin), optimizer
+    )
+
+
+class ScipyOptimizer(Optimizer):
+    """Fits with scipy.optimize.minimize
+
+    The limits are given to scipy as bounds, so limits can only be used
+    with the methods that support bounds. Methods that return the full
+    inverse Hessian, such as BFGS, provide the errors from it, for the
+    others the Hessian is computed from finite differences once the fit
+    has finished, since the limited memory estimate from L-BFGS-B is too
+    rough for errors.
+
+    Parameters
+    ----------
+    method : str, optional
+        Any method supported by scipy.optimize.minimize. Defaults to
+        L-BFGS-B.
+    options : Dict[str, Any], optional
+        The options to pass to the method.
+    use_gradient : bool, optional
+        If True and the likelihood's amplitude defines a derivative for
+        every free parameter, the analytic gradient is given to scipy,
+        otherwise scipy computes finite differences when the method needs
+        them. Defaults to True.
+    """
+
+    # Methods that would warn about being given a gradient
+    DERIVATIVE_FREE = ("nelder-mead", "powell", "cobyla")
+
+    # Methods that accept bounds, Nelder-Mead only does from scipy 1.7
+    BOUNDED = ("l-bfgs-b", "tnc", "slsqp", "powell", "trust-constr") + (
+        ("nelder-mead",) if _SCIPY_VERSION >= (1, 7) else ()
+    )
+
+    def __init__(
+            self, method: str = "L-BFGS-B",
+            options: Opt[Dict[str, Any]] = None, use_gradient: bool = True
+    ):
+        self.__method = method
+        self.__options = options
+        self.__use_gradient = use_gradient
+
+    def minimize(
+            self, parameters: List[str], settings: Dict[str, Any],
+            likelihood: Any, set_up: float
+    ) -> FitResult:
+        start = time.perf_counter()
+        problem = _Problem(parameters, settings, likelihood)
+        if problem.bounds and self.__method.lower() not in self.BOUNDED:
+            raise ValueError(
+                f"scipy's {self.__method} doesn't support limits! Use one "
+                f"of {', '.join(self.BOUNDED)}, or remove the limits."
+            )
+
+        jacobian = None
+        if self.__use_gradient and \
+                self.__method.lower() not in self.DERIVATIVE_FREE \
+                and problem.has_gradient:
+            jacobian = problem.gradient
+
+        result = scipy_optimize.minimize(
+            problem, problem.start, method=self.__method, jac=jacobian,
+            bounds=problem.bounds, options=self.__options
+        )
+
+        inverse = getattr(result, "hess_inv", None)
+        if isinstance(inverse, npy.ndarray):
+            errors = _errors_from(2 * set_up * inverse)
+        else:
+            errors = _numeric_errors(problem, result.x, set_up)
+
+        return FitResult(
+            problem.values(result.x), problem.errors(errors),
+            float(result.fun), bool(result.success), problem.calls,
+            time.perf_counter() - start, f"scipy {self.__method}",
+            str(result.message), result
+        )
+
+
+class NelderMead(Optimizer):
+    """Fits with a Nelder-Mead simplex, without needing derivatives
+
+    Each point of the simplex is kept inside the limits. The fit stops
+    once the likelihood differs by less than the tolerance across the
+    simplex, and then the errors are found from a Hessian of finite
+    differences.
+
+    Parameters
+    ----------
+    max_calls : int, optional
+        The most times the likelihood will be called for the simplex.
+        Defaults to 10,000.
+    tolerance : float, optional
+        How close the likelihood needs to be across the simplex to stop,
+        in units of set_up. Defaults to 1e-6.
+    """
+
+    def __init__(self, max_calls: int = 10000, tolerance: float = 1e-6):
+        self.__max_calls = max_calls
+        self.__tolerance = tolerance
+
+    def minimize(
+            self, parameters: List[str], settings: Dict[str, Any],
+            likelihood: Any, set_up: float
+    ) -> FitResult:
+        start = time.perf_counter()
+        problem = _Problem(parameters, settings, likelihood)
+        low, high = problem.limits
+
+        simplex = [problem.start]
+        for index, step in enumerate(problem.steps):
+            point = problem.start.copy()
+            point[index] += step
+            if point[index] > high[index]:
+                point[index] -= 2 * step
+            simplex.append(npy.clip(point, low, high))
+        simplex = npy.array(simplex)
+        values = npy.array([problem(point) for point in simplex])
+
+        valid = False
+        while problem.calls < self.__max_calls:
+            order = npy.argsort(values)
+            simplex, values = simplex[order], values[order]
+            if values[-1] - values[0] <= self.__tolerance * set_up:
+                valid = True
+                break
+            self.__step(problem, simplex, values, low, high)
+
+        best = npy.argmin(values)
+        message = "Converged" if valid else "Reached the call limit"
+        errors = _numeric_errors(problem, simplex[best], set_up)
+        return FitResult(
+            problem.values(simplex[best]), problem.errors(errors),
+            float(values[best]), valid, problem.calls,
+            time.perf_counter() - start, "nelder-mead", message
+        )
+
+    @staticmethod
+    def __step(problem, simplex, values, low, high):
+        # The simplex is sorted, and its worst point is replaced in place
+        centroid = npy.mean(simplex[:-1], axis=0)
+        worst = simplex[-1]
+
+        reflected = npy.clip(2 * centroid - worst, low, high)
+        reflected_value = problem(reflected)
+        if reflected_value < values[0]:
+            expanded = npy.clip(3 * centroid - 2 * worst, low, high)
+            expanded_value = problem(expanded)
+            if expanded_value < reflected_value:
+                simplex[-1], values[-1] = expanded, expanded_value
+            else:
+                simplex[-1], values[-1] = reflected, reflected_value
+            return
+
+        if reflected_value < values[-2]:
+            simplex[-1], values[-1] = reflected, reflected_value
+            return
+
+        if reflected_value < values[-1]:
+            contracted = (centroid + reflected) / 2
+        else:
+            contracted = (centroid + worst) / 2
+        contracted_value = problem(contracted)
+        if contracted_value < min(reflected_value, values[-1]):
+            simplex[-1], values[-1] = contracted, contracted_value
+            return
+
+        # Nothing improved on the worst point, so shrink towards the best
+        simplex[1:] = (simplex[0] + simplex[1:]) / 2
+        values[1:] = [problem(point) for point in simplex[1:]]
+
+
+_OPTIMIZERS = {
+    "minuit": MinuitOptimizer,
+    "scipy": ScipyOptimizer,
+    "nelder-mead": NelderMead
+}
+
+
+def optimize(
+        parameters: List[str], settings: Dict[str, Any], likelihood: Any,
+        set_up: float, optimizer: Union[str, Optimizer] = "minuit"
+) -> FitResult:
+    """Fits the likelihood with any of the optimizers
+
+    Parameters
+    ----------
+    parameters : List[str]
+        The names of the parameters to fit
+    settings : Dict[str, Any]
+        The iminuit style settings, see the module documentation for the
+        settings every optimizer understands.
+    likelihood : Likelihood object from likelihoods or single function
+        The likelihood to minimize.
+    set_up : float
+        Set to 1 for log-likelihoods, or .5 for Chi-Squared
+    optimizer : str or Optimizer, optional
+        Either "minuit", "scipy", or "nelder-mead" to use the optimizer
+        with its default options, or an Optimizer. Defaults to "minuit".
+
+    Returns
+    -------
+    FitResult
+        The values, errors, likelihood, call count, and time of the fit.
+
+    Raises
+    ------
+    ValueError
+        If the optimizer is unknown.
+
+    Examples
+    --------
+    >>> result = optimize(
+    ...     params, settings, likelihood, 1, ScipyOptimizer("L-BFGS-B")
+    ... )
+    >>> result.values, result.calls, result.time
+    """
+    if isinstance(optimizer, str):
+        if optimizer not in _OPTIMIZERS:
+            raise ValueError(f"Unknown optimizer {optimizer!r}!")
+        optimizer = _OPTIMIZERS[optimizer]()
+    return optimizer.minimize(parameters, settings, likelihood, set_up)
+
+
+class _Problem:
+    """The likelihood as a function of an array of the free parameters"""
+
+    def __init__(
+            self, parameters: List[str], settings: Dict[str, Any],
+            likelihood: Any
+    ):
+        self.__parameters = parameters
+        self.__values = npy.array(
+            [float(settings.get(name, 0.)) for name in parameters]
+        )
+        self.__free = npy.array(
+            [not settings.get(f"fix_{name}", False) for name in parameters]
+        )
+        self.__translator = _Translator(
+            parameters, likelihood,
+            [name for name, free in zip(parameters, self.__free) if not free]
+        )
+        self.__limits = [
+            settings.get(f"limit_{name}") or (None, None)
+            for name, free in zip(parameters, self.__free) if free
+        ]
+        self.__steps = npy.array([
+            settings.get(f"error_{name}", .1 * abs(value) or .1)
+            for name, value, free in zip(
+                parameters, self.__values, self.__free
+            ) if free
+        ], dtype=float)
+        self.calls = 0
+
+    def __call__(self, free: npy.ndarray) -> float:
+        self.calls += 1
+        return self.__translator(*self.__full(free))
+
+    def gradient(self, free: npy.ndarray) -> npy.ndarray:
+        self.calls += 1
+        gradient = npy.array(self.__translator.gradient(*self.__full(free)))
+        return gradient[self.__free]
+
+    @property
+    def has_gradient(self) -> bool:
+        # The analytic gradient is only used if it covers every free value
+        return self.__translator.has_full_gradient(*self.__values)
+
+    @property
+    def start(self) -> npy.ndarray:
+        return self.__values[self.__free].copy()
+
+    @property
+    def steps(self) -> npy.ndarray:
+        return self.__steps
+
+    @property
+    def bounds(self) -> Opt[List[Tuple[Opt[float], Opt[float]]]]:
+        if all(limit == (None, None) for limit in self.__limits):
+            return None
+        return [tuple(limit) for limit in self.__limits]
+
+    @property
+    def limits(self) -> Tuple[npy.ndarray, npy.ndarray]:
+        low = [-npy.inf if lim[0] is None else lim[0] for lim in self.__limits]
+        high = [npy.inf if lim[1] is None else lim[1] for lim in self.__limits]
+        return npy.array(low, dtype=float), npy.array(high, dtype=float)
+
+    def values(self, free: npy.ndarray) -> Dict[str, float]:
+        return dict(zip(self.__parameters, self.__full(free).tolist()))
+
+    def errors(self, free: npy.ndarray) -> Dict[str, float]:
+        errors = npy.zeros(len(self.__parameters))
+        errors[self.__free] = free
+        return dict(zip(self.__parameters, errors.tolist()))
+
+    def __full(self, free: npy.ndarray) -> npy.ndarray:
+        values = self.__values.copy()
+        values[self.__free] = free
+        return values
+
+
+def _numeric_errors(
+        problem: _Problem, point: npy.ndarray, set_up: float
+) -> npy.ndarray:
+    # The Hessian from central differences around the minimum
+    steps = 1e-4 * npy.maximum(npy.abs(point), 1)
+    centre = problem(point)
+    hessian = npy.zeros((len(point), len(point)))
+
+    def shifted(*shifts):
+        moved = point.copy()
+        for index, sign in shifts:
+            moved[index] += sign * steps[index]
+        return problem(moved)
+
+    for i in range(len(point)):
+        hessian[i, i] = (
+            shifted((i, 1)) - 2 * centre + shifted((i, -1))
+        ) / steps[i] ** 2
+        for j in range(i + 1, len(point)):
+            hessian[i, j] = hessian[j, i] = (
+                shifted((i, 1), (j, 1)) - shifted((i, 1), (j, -1))
+                - shifted((i, -1), (j, 1)) + shifted((i, -1), (j, -1))
+            ) / (4 * steps[i] * steps[j])
+
+    try:
+        return _errors_from(2 * set_up * npy.linalg.inv(hessian))
+    except npy.linalg.LinAlgError:
+        return npy.full(len(point), npy.nan)
+
+
+def _errors_from(covariance: npy.ndarray) -> npy.ndarray:
+    variances = npy.diag(covariance)
+    return npy.sqrt(npy.where(variances >= 0, variances, npy.nan))
@@ -31,7 +31,11 @@ File Layout
 -----------
 - Templates and Abstract Classes
 - Predefined Types
+- Shared Memory
+- Process Placement
 - Process creation functions
+- Thread creation functions
+- Distributed Processes
 - Process and Interface Objects
 
 
@@ -41,21 +45,69 @@ Duplex processes will not shutdown automatically, you must shut them down
 from the returned interface object. This is done so that when new
 parameters are passed to the Duplex Processes there will not be an
 associated "startup" cost.
+
+When use_shared_memory is set, the data is copied once into shared memory
+and each process is only sent a description of its partition. This avoids
+copying the entire dataset into every process for large datasets.
+
+Every wait on a process also watches that the process is still alive, so
+a process killed by the operating system raises an error naming the
+process instead of blocking forever. With respawn set, the dead process
+is replaced with a new process holding the same partition, and whatever
+it was working on is sent again.
+
+When affinity is set, each process is pinned to its own core before its
+data is unpacked, and then copies its partition so that the memory is
+allocated on the NUMA node of that core. The number of threads numexpr
+and BLAS may start in each process is capped to the cores it's pinned to.
+
+A WorkerPool keeps its processes alive between kernels, new kernels and
+their data are loaded into the already running processes instead of
+spawning new ones.
+
+A Cluster does the same with workers on other machines, started with
+run_worker and connected over TCP. Data that is too large for a single
+machine can be given as file paths, which each worker reads its own
+shard of.
+
+make_threads runs the same kernels and interfaces on threads instead of
+processes. Each thread works on a view of its partition, so nothing is
+copied or pickled. This is only quicker when the kernel spends most of
+its time in code that releases the GIL, like numpy or numexpr.
 """
 
 import copy
+import functools
+import glob
+import itertools
+import logging
+import os
+import queue
+import threading
 import time
 from abc import ABC, abstractmethod
 from enum import Enum
-from multiprocessing import cpu_count, Pipe, Process
-from multiprocessing.connection import Connection
-from typing import Any, Dict, List, Tuple, Union
-
+from multiprocessing import (
+    AuthenticationError, cpu_count, Pipe, Process, resource_tracker,
+    Semaphore, shared_memory
+)
+from multiprocessing.connection import (
+    answer_challenge, Connection, deliver_challenge, Listener, SocketClient
+)
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple, Union, Optional as Opt
+
+import numexpr as ne
 import numpy as npy
 import pandas as pd
 
 from PyPWA import info as _info
-from PyPWA.libs import vectors
+from PyPWA.libs import file, vectors
+
+try:
+    import threadpoolctl
+except ImportError:
+    threadpoolctl = None
 
 __credits__ = ["Mark Jones"]
 __author__ = _info.AUTHOR
@@ -63,6 +115,7 @@ __version__ = _info.VERSION
 
 
 MAX_PROC = cpu_count()
+_LOGGER = logging.getLogger(__name__)
 
 
 """
@@ -104,6 +157,9 @@ class Kernel(ABC):
     def run(self, data: Any = False) -> Any:
         return self.process(data)
 
+    def run_batch(self, batch: List[Any]) -> List[Any]:
+        return [self.process(data) for data in batch]
+
     def close(self):
         pass
 
@@ -149,6 +205,27 @@ class Interface(ABC):
         """
         ...
 
+    def run_batch(self, communicator: List[Any], batch: List[Any]) -> Any:
+        """
+        Runs each item of the batch through the kernels. By default this
+        calls run once per item, override it to keep the kernels busy
+        by sending several items before waiting on the results.
+
+        Parameters
+        ----------
+        communicator : List[multiprocessing.Pipe]
+            A list of pipes that will be used to communicate with
+            the kernels.
+        batch : List[Any]
+            The values to pass to run, one at a time.
+
+        Returns
+        -------
+        Any
+            The results for each item in the batch.
+        """
+        return [self.run(communicator, item) for item in batch]
+
 
 """
 Predefined Types
@@ -160,6 +237,428 @@ _pipe = Tuple[List[Connection], List[Connection]]
 _supported_types = Union[npy.ndarray, vectors.ParticlePool, pd.DataFrame]
 _data = Dict[str, _supported_types]
 _data_packet = List[_data]
+_bounds = List[Tuple[int, int]]
+_shares = Opt[npy.ndarray]
+_affinity = Union[bool, List[List[int]]]
+_address = Tuple[str, int]
+_path = Union[str, Path]
+_sharded_data = Dict[str, Union[_supported_types, _path, List[_path]]]
+_folders = (
+    file.project.BaseFolder, file.project.BinFolder, file.project.RowRange
+)
+
+
+"""
+Shared Memory
+"""
+
+
+class _SharedArray:
+    """Describes a partition of an array that lives in shared memory
+
+    Only the name of the shared block, the dtype, and the partition's
+    location are pickled and sent to the process, the process then
+    attaches to the block and views its partition without copying.
+    """
+
+    def __init__(
+            self, name: str, dtype: npy.dtype, shape: Tuple[int, ...],
+            offset: int, length: int, kind: str, columns: Any = None
+    ):
+        self.name = name
+        self.dtype = dtype
+        self.shape = shape
+        self.offset = offset
+        self.length = length
+        self.kind = kind
+        self.columns = columns
+
+    def attach(self) -> Tuple[_supported_types, shared_memory.SharedMemory]:
+        memory = shared_memory.SharedMemory(self.name)
+        row_size = self.dtype.itemsize * int(npy.prod(self.shape[1:]))
+        array = npy.ndarray(
+            (self.length,) + self.shape[1:], self.dtype, memory.buf,
+            self.offset * row_size
+        )
+
+        if self.kind == "series":
+            return pd.Series(array, name=self.columns, copy=False), memory
+        return array, memory
+
+    def part(self, start: int, stop: int) -> "_SharedArray":
+        """Describes the rows from start to stop of this partition"""
+        return _SharedArray(
+            self.name, self.dtype, self.shape, self.offset + start,
+            stop - start, self.kind, self.columns
+        )
+
+
+class _SharedFrame:
+    """Describes a partition of a DataFrame that lives in shared memory
+
+    Each column is kept in its own shared block, so the frame built in
+    the process holds a view of every column instead of a copy.
+    """
+
+    def __init__(self, columns: List[Any], arrays: List[_SharedArray]):
+        self.columns = columns
+        self.arrays = arrays
+
+    @property
+    def length(self) -> int:
+        return self.arrays[0].length if self.arrays else 0
+
+    def attach(self) -> Tuple[pd.DataFrame, List[shared_memory.SharedMemory]]:
+        views, memories = {}, []
+        for column, shared in zip(self.columns, self.arrays):
+            views[column], memory = shared.attach()
+            memories.append(memory)
+        return pd.DataFrame(views, columns=self.columns, copy=False), memories
+
+    def part(self, start: int, stop: int) -> "_SharedFrame":
+        """Describes the rows from start to stop of this partition"""
+        return _SharedFrame(
+            self.columns, [shared.part(start, stop) for shared in self.arrays]
+        )
+
+
+class SharedData:
+    """Stores data in shared memory for use by several processes
+
+    Numpy arrays, Series, and DataFrames are copied once into shared
+    memory, anything else, like ParticlePools and project folders, is
+    kept as is and will be split and copied into each process as usual.
+    Each column of a DataFrame is given its own block, so that the frame
+    each process builds views the shared columns.
+
+    Parameters
+    ----------
+    data : Dict[str, ndarray, ParticlePool, or DataFrame]
+        The data that should be shared with the processes.
+
+    Notes
+    -----
+    Close must be called after every process using the data is done,
+    otherwise the shared memory will not be released until the
+    interpreter exits.
+    """
+
+    def __init__(self, data: _data):
+        self.__blocks: Dict[Any, shared_memory.SharedMemory] = {}
+        self.__shared: Dict[str, Union[_SharedArray, _SharedFrame]] = {}
+        self.__local: _data = {}
+
+        for key, value in data.items():
+            self.__store(key, value)
+
+    def __store(self, key: str, value: _supported_types):
+        if isinstance(value, pd.DataFrame):
+            self.__store_frame(key, value)
+            return
+        elif isinstance(value, pd.Series):
+            array, kind, columns = value.to_numpy(), "series", value.name
+        elif isinstance(value, npy.ndarray):
+            array, kind, columns = value, "array", None
+        elif isinstance(value, (vectors.ParticlePool,) + _folders):
+            self.__local[key] = value
+            return
+        else:
+            raise ValueError(f"Unknown data {value!r}")
+
+        if array.dtype.hasobject:
+            self.__local[key] = value
+            return
+
+        self.__shared[key] = self.__copy(key, array, kind, columns)
+
+    def __store_frame(self, key: str, frame: pd.DataFrame):
+        arrays = [frame[column].to_numpy() for column in frame.columns]
+        if any(array.dtype.hasobject for array in arrays):
+            self.__local[key] = frame
+            return
+
+        self.__shared[key] = _SharedFrame(list(frame.columns), [
+            self.__copy((key, index), array, "array", None)
+            for index, array in enumerate(arrays)
+        ])
+
+    def __copy(
+            self, block_key: Any, array: npy.ndarray, kind: str,
+            columns: Any
+    ) -> _SharedArray:
+        block = shared_memory.SharedMemory(
+            create=True, size=max(array.nbytes, 1)
+        )
+        shared = npy.ndarray(array.shape, array.dtype, block.buf)
+        shared[:] = array
+
+        self.__blocks[block_key] = block
+        return _SharedArray(
+            block.name, array.dtype, array.shape, 0, len(array), kind, columns
+        )
+
+    def partition(
+            self, number_of_processes: int, shares: _shares = None
+    ) -> _data_packet:
+        """Describes each process's partition of the shared data
+
+        Parameters
+        ----------
+        number_of_processes : int
+            How many partitions the data should be split into.
+        shares : npy.ndarray, optional
+            The fraction of events each partition should hold, if not
+            provided the data will be split into nearly equal partitions.
+
+        Returns
+        -------
+        List[Dict[str, Any]]
+            A dictionary for each process, shared arrays are described
+            instead of copied.
+        """
+        packets = _make_data_packets(
+            self.__local, number_of_processes, shares
+        )
+        for key, shared in self.__shared.items():
+            bounds = _partition_bounds(
+                shared.length, number_of_processes, shares
+            )
+            for packet, (start, stop) in zip(packets, bounds):
+                packet[key] = shared.part(start, stop)
+        return packets
+
+    def describe(self, key: str) -> _SharedArray:
+        """Describes the entire shared array for key"""
+        return self.__shared[key]
+
+    def view(self, key: str) -> npy.ndarray:
+        """Views the entire shared array for key from this process"""
+        shared = self.__shared[key]
+        return npy.ndarray(shared.shape, shared.dtype, self.__blocks[key].buf)
+
+    def close(self):
+        for block in self.__blocks.values():
+            block.close()
+            block.unlink()
+        self.__blocks = {}
+
+
+def _attach_shared_data(kernel: Kernel) -> List[shared_memory.SharedMemory]:
+    # The memory handles have to stay alive for as long as the kernel
+    # uses the views, otherwise the memory will be unmapped from under it.
+    handles = []
+    for key, value in list(vars(kernel).items()):
+        if isinstance(value, _SharedArray):
+            array, handle = value.attach()
+            setattr(kernel, key, array)
+            handles.append(handle)
+        elif isinstance(value, _SharedFrame):
+            frame, frame_handles = value.attach()
+            setattr(kernel, key, frame)
+            handles.extend(frame_handles)
+    return handles
+
+
+class _SharedParameters:
+    """Broadcasts parameters to the processes through shared memory
+
+    Each parameter is given a fixed slot in a shared block, so sending
+    parameters is a single write instead of pickling a dictionary for
+    every process. Each process writes its result into its own slot of a
+    shared result array. With as_array, the processes pass the block to
+    the kernel as an array instead of a dictionary.
+
+    With a gradient request, the GRADIENT command passes the parameters
+    to the kernel wrapped in the request instead, and each process writes
+    the dictionary it returns into its own row of the gradient block,
+    marking which of the parameters it provided.
+    """
+
+    RUN = 0
+    EXIT = 1
+    GRADIENT = 2
+
+    def __init__(
+            self, names: List[str], number_of_processes: int,
+            as_array: bool = False,
+            gradient_request: Opt[Callable[[Any], Any]] = None
+    ):
+        self.names = list(names)
+        self.as_array = as_array
+        self.gradient_request = gradient_request
+        self.__data = SharedData({
+            "parameters": npy.zeros(len(names)),
+            "command": npy.zeros(1, npy.int64),
+            "results": npy.zeros(number_of_processes),
+            "status": npy.zeros(number_of_processes, npy.int8),
+            "gradient": npy.zeros((number_of_processes, len(names))),
+            "provided": npy.zeros((number_of_processes, len(names)), bool),
+        })
+        self.__slots = self.__data.partition(number_of_processes)
+        self.parameters = self.__data.view("parameters")
+        self.command = self.__data.view("command")
+        self.results = self.__data.view("results")
+        self.status = self.__data.view("status")
+        self.gradient = self.__data.view("gradient")
+        self.provided = self.__data.view("provided")
+
+    def layout(self, index: int) -> Dict[str, Any]:
+        """What the process at index needs to attach to the block"""
+        return {
+            "names": self.names,
+            "as_array": self.as_array,
+            "gradient_request": self.gradient_request,
+            "parameters": self.__data.describe("parameters"),
+            "command": self.__data.describe("command"),
+            "results": self.__slots[index]["results"],
+            "status": self.__slots[index]["status"],
+            "gradient": self.__slots[index]["gradient"],
+            "provided": self.__slots[index]["provided"],
+        }
+
+    def gradients(self) -> List[Dict[str, float]]:
+        """The gradient each process provided, in process order"""
+        return [
+            {
+                name: float(value)
+                for name, value, given in zip(self.names, values, provided)
+                if given
+            } for values, provided in zip(self.gradient, self.provided)
+        ]
+
+    def close(self):
+        # The views have to be dropped before the memory can be closed
+        self.parameters = self.command = self.results = self.status = None
+        self.gradient = self.provided = None
+        self.__data.close()
+
+
+"""
+Process Placement
+"""
+
+
+# Read by OpenMP, BLAS, and numexpr when they decide how many threads to use
+_THREAD_VARIABLES = [
+    "OMP_NUM_THREADS", "MKL_NUM_THREADS", "OPENBLAS_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS"
+]
+
+
+class _Placement:
+    """Where a process should run and how many threads it can use
+
+    Parameters
+    ----------
+    cpus : List[int], optional
+        The cores the process should be pinned to.
+    threads : int, optional
+        The most threads numexpr and BLAS should use in the process.
+    keys : List[str]
+        The names of the data on the kernel, which will be copied once
+        the process has been pinned.
+    """
+
+    def __init__(
+            self, cpus: Opt[List[int]], threads: Opt[int], keys: List[str]
+    ):
+        self.cpus = cpus
+        self.threads = threads
+        self.keys = keys
+
+    def pin(self):
+        if self.cpus and hasattr(os, "sched_setaffinity"):
+            os.sched_setaffinity(0, self.cpus)
+
+        if self.threads:
+            for variable in _THREAD_VARIABLES:
+                os.environ[variable] = str(self.threads)
+            ne.set_num_threads(self.threads)
+            if threadpoolctl:
+                threadpoolctl.threadpool_limits(self.threads)
+
+    def localize(self, kernel: Kernel):
+        # Memory is placed on the NUMA node of the core that first writes
+        # to it, so copying the partition after pinning moves it locally.
+        if not self.cpus:
+            return
+        for key in self.keys:
+            value = getattr(kernel, key, None)
+            if isinstance(value, (npy.ndarray, pd.Series, pd.DataFrame)):
+                setattr(kernel, key, value.copy())
+
+
+def _make_placements(
+        number_of_processes: int, keys: List[str], affinity: _affinity,
+        threads_per_process: Opt[int]
+) -> List[Opt[_Placement]]:
+    if not affinity and not threads_per_process:
+        return [None] * number_of_processes
+
+    if affinity is True:
+        cores = _cores_by_node()
+        cpus = [[cores[i % len(cores)]] for i in range(number_of_processes)]
+    elif affinity:
+        if len(affinity) != number_of_processes:
+            raise ValueError(
+                f"Affinity has {len(affinity)} core sets for "
+                f"{number_of_processes} processes!"
+            )
+        cpus = [list(cores) for cores in affinity]
+    else:
+        cpus = [None] * number_of_processes
+
+    if affinity and not hasattr(os, "sched_setaffinity"):
+        _LOGGER.warning("CPU affinity isn't supported on this platform!")
+
+    return [
+        _Placement(
+            cores, threads_per_process or (len(cores) if cores else None),
+            keys
+        ) for cores in cpus
+    ]
+
+
+def _cores_by_node() -> List[int]:
+    """The available cores, alternating between the NUMA nodes
+
+    Alternating between the nodes spreads the processes over every
+    node's memory, even when there are fewer processes than cores.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        available = os.sched_getaffinity(0)
+    else:
+        available = set(range(MAX_PROC))
+
+    nodes = []
+    node_lists = glob.glob("/sys/devices/system/node/node*/cpulist")
+    for cpu_list in sorted(node_lists, key=_node_number):
+        with open(cpu_list) as stream:
+            cores = _parse_cpu_list(stream.read())
+        nodes.append([core for core in cores if core in available])
+
+    ordered = [
+        core for cores in itertools.zip_longest(*nodes)
+        for core in cores if core is not None
+    ]
+    return ordered + sorted(available.difference(ordered))
+
+
+def _node_number(path: str) -> int:
+    # The paths are /sys/devices/system/node/node<number>/cpulist
+    return int(os.path.basename(os.path.dirname(path))[4:])
+
+
+def _parse_cpu_list(cpu_list: str) -> List[int]:
+    # Linux lists cores as ranges, e.g. "0-3,8-11"
+    cores = []
+    for part in cpu_list.strip().split(","):
+        if "-" in part:
+            start, stop = part.split("-")
+            cores.extend(range(int(start), int(stop) + 1))
+        elif part:
+            cores.append(int(part))
+    return cores
 
 
 """
@@ -170,27 +669,211 @@ Process creation functions
 def make_processes(
         data: _data, template_kernel: Kernel,
         interface: Interface, number_of_processes: int = MAX_PROC,
-        use_duplex: bool = True
+        use_duplex: bool = True, use_shared_memory: bool = False,
+        timeout: Opt[float] = None, respawn: bool = False,
+        affinity: _affinity = False, threads_per_process: Opt[int] = None,
+        timed: bool = False
 ) -> "ProcessInterface":
-
-    packets = _make_data_packets(data, number_of_processes)
-    kernels = _create_kernels_containing_data(template_kernel, packets)
-    processes, communication = _create_processes(kernels, use_duplex)
+    """Creates the processes and returns the interface to them
+
+    Parameters
+    ----------
+    data : Dict[str, ndarray, ParticlePool, or DataFrame]
+        The data that will be split between the kernels. Each key will
+        be set as an attribute on the kernel.
+    template_kernel : Kernel
+        The kernel that will be copied into each process.
+    interface : Interface
+        The interface that will communicate with the kernels.
+    number_of_processes : int, optional
+        The number of processes to spawn, defaults to the number of CPUs
+    use_duplex : bool, optional
+        Whether the processes should wait for data (True), or immediately
+        process and return (False). Defaults to True.
+    use_shared_memory : bool, optional
+        If True the data is placed into shared memory once and each
+        process receives a view of its partition instead of a copy.
+        Defaults to False.
+    timeout : float, optional
+        The most seconds to wait on a process before it is considered to
+        have stopped responding. Defaults to waiting for as long as the
+        process is alive.
+    respawn : bool, optional
+        If True, a process that dies or stops responding is replaced with
+        a new process holding the same partition, instead of raising an
+        error. Defaults to False.
+    affinity : bool or List[List[int]], optional
+        If True, each process is pinned to a core, alternating between
+        NUMA nodes. A list of cores can be provided for each process
+        instead. Pinned processes copy their partition after pinning so
+        that it is stored on their NUMA node, even when using shared
+        memory. Defaults to False.
+    threads_per_process : int, optional
+        The most threads numexpr and BLAS can use in each process.
+        Defaults to the number of cores each process is pinned to, or no
+        limit if the processes aren't pinned.
+    timed : bool, optional
+        If True, each process records the processor time its kernel took
+        on the last call, which is read from the interface's durations,
+        such as by a LoadBalancer. Defaults to False.
+
+    Returns
+    -------
+    ProcessInterface
+        The interface to the running processes, must be closed when no
+        longer needed.
+    """
+    partitioner = _Partitioner(
+        data, template_kernel, use_shared_memory, timed
+    )
+    kernels = partitioner.kernels(number_of_processes)
+    placements = _make_placements(
+        number_of_processes, list(data), affinity, threads_per_process
+    )
+    processes, communication = _create_processes(
+        kernels, use_duplex, placements
+    )
 
     for process in processes:
         process.start()
 
-    return ProcessInterface(interface, communication, processes)
+    return ProcessInterface(
+        interface, communication, processes, partitioner,
+        timeout=timeout, respawn=respawn
+    )
+
+
+class _Partitioner:
+    """Creates the kernels with their partition of the data
 
+    This is kept by the ProcessInterface so that the data can be
+    partitioned again later with different shares for each process. When
+    timed, each kernel is also given a slot of a shared array to record
+    how long it took.
+    """
 
-def _make_data_packets(data: _data, number_of_processes: int) -> _data_packet:
+    def __init__(
+            self, data: _data, template_kernel: Kernel,
+            use_shared_memory: bool, timed: bool = False
+    ):
+        self.__template = template_kernel
+        self.__shared = SharedData(data) if use_shared_memory else None
+        self.__data = None if use_shared_memory else data
+        self.__timed = timed
+        self.__timer: Opt[SharedData] = None
+        self.__shares: _shares = None
+
+    def kernels(
+            self, number_of_processes: int, shares: _shares = None
+    ) -> List[Kernel]:
+        self.__shares = shares
+        if self.__shared is not None:
+            packets = self.__shared.partition(number_of_processes, shares)
+        else:
+            packets = _make_data_packets(
+                self.__data, number_of_processes, shares
+            )
+
+        # Each process writes how long its kernel took into its own slot
+        if self.__timed and self.__timer is None:
+            timer = {"timer": npy.zeros(number_of_processes)}
+            self.__timer = SharedData(timer)
+        timers = self.__timers(number_of_processes)
+
+        return [
+            self.__build(index, packet, timer)
+            for index, (packet, timer) in enumerate(zip(packets, timers))
+        ]
+
+    def kernel(self, index: int, number_of_processes: int) -> Kernel:
+        """The kernel for the process at index, with the current shares
+
+        Only the kernel at index is copied from the template, the other
+        partitions are only sliced to find where its partition is.
+        """
+        if self.__shared is not None:
+            packets = self.__shared.partition(
+                number_of_processes, self.__shares
+            )
+        else:
+            packets = _make_data_packets(
+                self.__data, number_of_processes, self.__shares
+            )
+        timers = self.__timers(number_of_processes)
+        return self.__build(index, packets[index], timers[index])
+
+    def __timers(self, number_of_processes: int) -> _data_packet:
+        if self.__timer is None:
+            return [{} for _ in range(number_of_processes)]
+        return self.__timer.partition(number_of_processes)
+
+    def __build(
+            self, index: int, packet: _data, timer: Dict[str, Any]
+    ) -> Kernel:
+        kernel = _create_kernels_containing_data(self.__template, [packet])[0]
+        kernel.PROCESS_ID = index
+        if "timer" in timer:
+            kernel._process_timer = timer["timer"]
+        return kernel
+
+    @property
+    def durations(self) -> Opt[npy.ndarray]:
+        if self.__timer is None:
+            return None
+        return self.__timer.view("timer").copy()
+
+    def close(self):
+        if self.__shared is not None:
+            self.__shared.close()
+        if self.__timer is not None:
+            self.__timer.close()
+
+
+def _partition_bounds(
+        length: int, number_of_processes: int, shares: _shares = None
+) -> _bounds:
+    if shares is None:
+        # Matches the partitions produced by numpy's array_split
+        quotient, remainder = divmod(length, number_of_processes)
+        sizes = [
+            quotient + (1 if index < remainder else 0)
+            for index in range(number_of_processes)
+        ]
+        edges = npy.concatenate([[0], npy.cumsum(sizes)])
+    else:
+        edges = npy.round(npy.cumsum(npy.concatenate([[0], shares])) * length)
+        edges[-1] = length
+
+    edges = edges.astype(int)
+    return list(zip(edges[:-1], edges[1:]))
+
+
+def _make_data_packets(
+        data: _data, number_of_processes: int, shares: _shares = None
+) -> _data_packet:
     list_of_dicts = [dict() for i in range(number_of_processes)]
 
     for key in data.keys():
         if isinstance(data[key], (npy.ndarray, pd.Series, pd.DataFrame)):
-            split = npy.array_split(data[key], number_of_processes)
+            bounds = _partition_bounds(
+                len(data[key]), number_of_processes, shares
+            )
+            # Frames are sliced by position, whatever their index is
+            if isinstance(data[key], (pd.Series, pd.DataFrame)):
+                split = [data[key].iloc[start:stop] for start, stop in bounds]
+            else:
+                split = [data[key][start:stop] for start, stop in bounds]
         elif isinstance(data[key], vectors.ParticlePool):
+            if shares is not None:
+                raise ValueError("ParticlePools can only be split evenly!")
             split = data[key].split(number_of_processes)
+        elif isinstance(data[key], _folders):
+            # Each process is only told which events to read
+            rows = data[key]
+            if not isinstance(rows, file.project.RowRange):
+                rows = rows.rows()
+            bounds = _partition_bounds(len(rows), number_of_processes, shares)
+            split = [rows.split(start, stop) for start, stop in bounds]
         else:
             raise ValueError(f"Unknown data {data[key]!r}")
 
@@ -213,13 +896,22 @@ def _create_kernels_containing_data(
     return kernels_with_data
 
 
-def _create_processes(kernels: List[Kernel], is_duplex: bool) -> _main:
+def _create_processes(
+        kernels: List[Kernel], is_duplex: bool,
+        placements: List[Opt[_Placement]] = None
+) -> _main:
     receives, sends = _get_pipes_for_communication(len(kernels), is_duplex)
+    if placements is None:
+        placements = [None] * len(kernels)
 
     processes = []
-    for index, (kernel, send_pipe) in enumerate(zip(kernels, sends)):
+    for index, (kernel, send_pipe, placement) in enumerate(
+            zip(kernels, sends, placements)
+    ):
         kernel.PROCESS_ID = index
-        processes.append(_SmartProcess(kernel, send_pipe))
+        processes.append(
+            _SmartProcess(kernel, send_pipe, placement=placement)
+        )
     return processes, receives
 
 
@@ -234,6 +926,509 @@ def _get_pipes_for_communication(num_of_pipes: int, is_duplex: bool) ->_pipe:
     return main, child
 
 
+"""
+Thread creation functions
+"""
+
+
+def make_threads(
+        data: _data, template_kernel: Kernel,
+        interface: Interface, number_of_threads: int = MAX_PROC,
+        use_duplex: bool = True
+) -> "ThreadInterface":
+    """Creates the kernels on threads and returns the interface to them
+
+    The kernels and interface are the same as those used with
+    make_processes, but each kernel runs on a thread with a view of its
+    partition of the data.
+
+    Parameters
+    ----------
+    data : Dict[str, ndarray, ParticlePool, or DataFrame]
+        The data that will be split between the kernels. Each key will
+        be set as an attribute on the kernel.
+    template_kernel : Kernel
+        The kernel that will be copied into each thread.
+    interface : Interface
+        The interface that will communicate with the kernels.
+    number_of_threads : int, optional
+        The number of threads to start, defaults to the number of CPUs
+    use_duplex : bool, optional
+        Whether the threads should wait for data (True), or immediately
+        process and return (False). Defaults to True.
+
+    Returns
+    -------
+    ThreadInterface
+        The interface to the running threads, must be closed when no
+        longer needed.
+    """
+    packets = _make_data_packets(data, number_of_threads)
+    kernels = _create_kernels_containing_data(template_kernel, packets)
+
+    threads, connections = [], []
+    for index, kernel in enumerate(kernels):
+        kernel.PROCESS_ID = index
+        main, child = _ThreadConnection.pair()
+        threads.append(_SmartThread(kernel, child, use_duplex))
+        connections.append(main)
+
+    for thread in threads:
+        thread.start()
+
+    return ThreadInterface(interface, connections, threads)
+
+
+class _ThreadConnection:
+    """Mimics a multiprocessing Connection between two threads"""
+
+    def __init__(self, incoming: queue.Queue, outgoing: queue.Queue):
+        self.__incoming = incoming
+        self.__outgoing = outgoing
+        self.__waiting: List[Any] = []
+        self.readable = self.writable = True
+
+    @classmethod
+    def pair(cls) -> Tuple["_ThreadConnection", "_ThreadConnection"]:
+        left, right = queue.Queue(), queue.Queue()
+        return cls(left, right), cls(right, left)
+
+    def send(self, value: Any):
+        self.__outgoing.put(value)
+
+    def recv(self) -> Any:
+        if self.__waiting:
+            return self.__waiting.pop()
+        return self.__incoming.get()
+
+    def poll(self, timeout: float = 0) -> bool:
+        if not self.__waiting:
+            try:
+                self.__waiting.append(self.__incoming.get(timeout=timeout))
+            except queue.Empty:
+                return False
+        return True
+
+    def close(self):
+        self.readable = self.writable = False
+
+
+"""
+Distributed Processes
+"""
+
+
+class _FileShard:
+    """Describes the part of a file a worker should read
+
+    Only the path and the worker's position are sent, the worker then
+    reads only its share of the events from the file. Files that are
+    shared between workers must be numpy files so that a share can be
+    read without reading the rest of the file.
+    """
+
+    def __init__(self, path: _path, index: int, count: int):
+        self.path = Path(path)
+        self.index = index
+        self.count = count
+
+        if count > 1 and self.path.suffix != ".npy":
+            raise ValueError(
+                f"{self.path} can't be split between workers, only numpy "
+                f"files can be read in part! Give each worker its own "
+                f"file instead."
+            )
+
+    def load(self) -> _supported_types:
+        if self.count == 1:
+            return file.read(self.path)
+
+        data = npy.load(self.path, mmap_mode="r")
+        start, stop = _partition_bounds(len(data), self.count)[self.index]
+        return npy.array(data[start:stop])
+
+
+def _load_file_shards(kernel: Kernel):
+    for key, value in list(vars(kernel).items()):
+        if isinstance(value, _FileShard):
+            setattr(kernel, key, value.load())
+
+
+def _make_shard_packets(
+        data: _sharded_data, number_of_workers: int
+) -> _data_packet:
+    in_memory = {
+        key: value for key, value in data.items()
+        if not isinstance(value, (str, Path, list))
+    }
+    packets = _make_data_packets(in_memory, number_of_workers)
+
+    for key, value in data.items():
+        if isinstance(value, (str, Path)):
+            shards = [
+                _FileShard(value, index, number_of_workers)
+                for index in range(number_of_workers)
+            ]
+        elif isinstance(value, list):
+            if len(value) != number_of_workers:
+                raise ValueError(
+                    f"{key} has {len(value)} files for {number_of_workers} "
+                    f"workers!"
+                )
+            shards = [_FileShard(path, 0, 1) for path in value]
+        else:
+            continue
+
+        for packet, shard in zip(packets, shards):
+            packet[key] = shard
+    return packets
+
+
+def run_worker(
+        address: _address, authkey: bytes, connections: Opt[int] = None
+):
+    """Runs kernels sent from a Cluster on another machine
+
+    The worker waits for a Cluster to connect, then runs the kernels it
+    is sent until the Cluster disconnects, and then waits for the next
+    Cluster. Clusters that connect while another is being served are
+    kept waiting, and give up if they wait longer than their wait.
+
+    Parameters
+    ----------
+    address : Tuple[str, int]
+        The host and port to listen on.
+    authkey : bytes
+        The key the Cluster must provide to connect. Kernels are sent
+        pickled, so this must be kept secret.
+    connections : int, optional
+        How many Clusters to serve before returning, defaults to serving
+        forever.
+    """
+    resource_tracker.ensure_running()
+    served = 0
+    with Listener(address, authkey=authkey) as listener:
+        while connections is None or served < connections:
+            try:
+                connection = listener.accept()
+            except (AuthenticationError, EOFError, OSError) as error:
+                # Usually a Cluster that gave up waiting for the last one
+                _LOGGER.warning(f"Refused a connection: {error!r}")
+                continue
+
+            with connection:
+                _LOGGER.info(f"Serving {listener.last_accepted}")
+                try:
+                    _SmartProcess(None, connection, True).run()
+                except (EOFError, OSError):
+                    _LOGGER.warning(f"Lost {listener.last_accepted}")
+            served += 1
+
+
+class Cluster:
+    """Workers on other machines that kernels can be loaded into.
+
+    Each worker must already be running run_worker, or the pyworker
+    command. Kernels are loaded into the workers the same way as into a
+    WorkerPool, and the interface combines the results on this machine.
+
+    Parameters
+    ----------
+    addresses : List[Tuple[str, int]]
+        The host and port of each worker.
+    authkey : bytes
+        The key that the workers were started with.
+    wait : float, optional
+        How many seconds to keep retrying workers that are not accepting
+        connections yet, or waiting on workers that are still serving
+        another Cluster, defaults to 30.
+
+    Notes
+    -----
+    Data given as a path to a numpy file is read in part by each worker,
+    which reads only its equal share of the events. Data given as a list
+    of paths, one for each worker, is read entirely by its worker. Any
+    other data is split and sent to the workers. The amplitude must be
+    importable on every worker.
+
+    Examples
+    --------
+    >>> cluster = Cluster([("node1", 5000), ("node2", 5000)], b"secret")
+    >>> with LogLikelihood(
+    ...         amp, "data.npy", ["mc1.npy", "mc2.npy"],
+    ...         generated_length=10**8, pool=cluster
+    ... ) as likelihood:
+    ...     minuit(params, settings, likelihood, 1)
+    """
+
+    def __init__(
+            self, addresses: List[_address], authkey: bytes,
+            wait: float = 30
+    ):
+        self.__addresses = list(addresses)
+        self.__authkey = authkey
+        self.__wait = wait
+
+    def load(
+            self, data: _sharded_data, template_kernel: Kernel,
+            interface: Interface, number_of_processes: int = None,
+            use_duplex: bool = True, timeout: Opt[float] = None
+    ) -> "ClusterInterface":
+        """Loads a kernel and its data into the workers
+
+        Parameters
+        ----------
+        data : Dict[str, ndarray, DataFrame, str, or List[str]]
+            The data, or paths to the data, to be split between the
+            workers.
+        template_kernel : Kernel
+            The kernel that will be copied into each worker.
+        interface : Interface
+            The interface that will communicate with the kernels.
+        number_of_processes : int, optional
+            How many of the workers to use, defaults to all of them.
+        use_duplex : bool, optional
+            Whether the kernels should wait for data (True), or
+            immediately process and return (False). Defaults to True.
+        timeout : float, optional
+            The most seconds to wait on a worker before it is considered
+            to have stopped responding.
+
+        Returns
+        -------
+        ClusterInterface
+            The interface to the workers, closing it disconnects from
+            them.
+
+        Raises
+        ------
+        RuntimeError
+            If a worker can't be reached, or is still serving another
+            Cluster. Any workers already connected to are disconnected.
+        ValueError
+            If a file that isn't a numpy file is split between workers.
+        """
+        if number_of_processes is None:
+            number_of_processes = self.size
+        addresses = self.__addresses[:number_of_processes]
+
+        packets = _make_shard_packets(data, len(addresses))
+        kernels = _create_kernels_containing_data(template_kernel, packets)
+
+        connections = []
+        try:
+            for index, (address, kernel) in enumerate(
+                    zip(addresses, kernels)
+            ):
+                kernel.PROCESS_ID = index
+                connections.append(_RemoteConnection(
+                    self.__connect(address), address, timeout
+                ))
+                connections[-1].send(ProcessCodes.LOAD)
+                connections[-1].send((kernel, use_duplex))
+        except BaseException:
+            for connection in connections:
+                connection.close()
+            raise
+
+        return ClusterInterface(interface, connections)
+
+    def __connect(self, address: _address) -> Connection:
+        give_up = time.monotonic() + self.__wait
+        while True:
+            try:
+                return self.__handshake(address, give_up)
+            except (ConnectionError, EOFError) as error:
+                if time.monotonic() > give_up:
+                    raise RuntimeError(
+                        f"Worker {address} is not accepting connections!"
+                    ) from error
+                time.sleep(.1)
+
+    def __handshake(self, address: _address, give_up: float) -> Connection:
+        connection = SocketClient(address)
+
+        # A worker serving another Cluster won't start the handshake
+        # until that Cluster disconnects, so it's only waited on so long
+        try:
+            if not connection.poll(max(give_up - time.monotonic(), .1)):
+                raise RuntimeError(
+                    f"Worker {address} is still serving another Cluster!"
+                )
+            answer_challenge(connection, self.__authkey)
+            deliver_challenge(connection, self.__authkey)
+        except BaseException:
+            connection.close()
+            raise
+        return connection
+
+    @property
+    def size(self) -> int:
+        return len(self.__addresses)
+
+    def close(self):
+        pass  # Each interface disconnects from the workers when closed
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class _RemoteConnection:
+    """Names the worker when its connection is lost or stops responding"""
+
+    def __init__(
+            self, connection: Connection, address: _address,
+            timeout: Opt[float]
+    ):
+        self.__connection = connection
+        self.__address = address
+        self.__timeout = timeout
+
+    @property
+    def readable(self) -> bool:
+        return not self.__connection.closed
+
+    @property
+    def writable(self) -> bool:
+        return not self.__connection.closed
+
+    def send(self, value: Any):
+        try:
+            self.__connection.send(value)
+        except OSError as error:
+            raise RuntimeError(
+                f"Lost connection to worker {self.__address}!"
+            ) from error
+
+    def recv(self) -> Any:
+        if self.__timeout is not None and \
+                not self.__connection.poll(self.__timeout):
+            raise RuntimeError(
+                f"Worker {self.__address} stopped responding for "
+                f"{self.__timeout} seconds!"
+            )
+        try:
+            return self.__connection.recv()
+        except (EOFError, OSError) as error:
+            raise RuntimeError(
+                f"Lost connection to worker {self.__address}!"
+            ) from error
+
+    def poll(self, timeout: float = 0) -> bool:
+        return self.__connection.poll(timeout)
+
+    def close(self):
+        self.__connection.close()
+
+
+"""
+Load Balancing
+"""
+
+
+class LoadBalancer:
+    """Equalizes how long each process takes by moving the partitions.
+
+    The processor time each process spends in its kernel is recorded
+    for every call, and after the warmup number of calls the partition
+    boundaries are moved so that each process holds an equal share of
+    the measured cost. This is repeated until the processes are balanced
+    within the threshold, or the limit of rebalances is reached.
+
+    Parameters
+    ----------
+    warmup : int, optional
+        How many calls to measure before rebalancing, defaults to 3.
+    rebalances : int, optional
+        The most times the partitions will be moved, defaults to 3. Set
+        to 0 to only record the timings.
+    threshold : float, optional
+        The ratio of the slowest process to the average process that is
+        considered balanced, defaults to 1.05.
+    """
+
+    def __init__(
+            self, warmup: int = 3, rebalances: int = 3,
+            threshold: float = 1.05
+    ):
+        self.__warmup = warmup
+        self.__rebalances = rebalances
+        self.__threshold = threshold
+        self.__total: _shares = None
+        self.__calls = 0
+        self.__history: List[float] = []
+        self.__shares: _shares = None
+
+    def update(self, interface: "ProcessInterface"):
+        """Records the last call's timings and rebalances if needed"""
+        self.record(interface.durations)
+        self.balance(interface)
+
+    def record(self, durations: npy.ndarray):
+        if self.__calls:
+            self.__total = self.__total + durations
+        else:
+            self.__total = npy.array(durations, dtype=float)
+        self.__calls += 1
+
+    def balance(self, interface: "ProcessInterface"):
+        """Repartitions the interface if the processes are unbalanced"""
+        if self.__calls < self.__warmup:
+            return
+        if len(self.__history) >= self.__rebalances:
+            return
+
+        imbalance = self.imbalance
+        if imbalance < self.__threshold:
+            return
+
+        mean = self.__total / self.__calls
+        if self.__shares is None:
+            self.__shares = npy.full(len(mean), 1 / len(mean))
+
+        # Treat the cost as constant inside each partition, then move the
+        # boundaries so that each partition holds an equal share of the
+        # total cost.
+        edges = npy.concatenate([[0], npy.cumsum(self.__shares)])
+        cost = npy.concatenate([[0], npy.cumsum(npy.maximum(mean, 1e-9))])
+        targets = npy.linspace(0, cost[-1], len(mean) + 1)
+        self.__shares = npy.diff(npy.interp(targets, cost, edges))
+
+        interface.repartition(self.__shares)
+        self.__history.append(imbalance)
+        self.__total, self.__calls = None, 0
+
+    @property
+    def imbalance(self) -> float:
+        """The slowest process's time divided by the average time"""
+        if not self.__calls:
+            return npy.nan
+        return self.__total.max() / self.__total.mean()
+
+    @property
+    def stats(self) -> Dict[str, Any]:
+        """The timings of the processes
+
+        Returns
+        -------
+        Dict[str, Any]
+            - durations: The mean processor time in seconds each process
+              spent per call since the last rebalance.
+            - imbalance: The current slowest to mean duration ratio.
+            - history: The imbalance before each rebalance.
+            - shares: The fraction of events each process holds.
+        """
+        return {
+            "durations": self.__total / self.__calls if self.__calls else None,
+            "imbalance": self.imbalance,
+            "history": list(self.__history),
+            "shares": self.__shares,
+        }
+
+
 """
 Process and Interface Objects
 """
@@ -243,29 +1438,347 @@ class ProcessCodes(Enum):
 
     SHUTDOWN = 1
     ERROR = 2
+    LOAD = 3
+    UNLOAD = 4
+    SHARE = 5
+
+
+class _MonitoredConnection:
+    """Watches the process on the other end of a connection
+
+    Waiting for a reply polls the connection, and between polls asks the
+    interface to check the process. If the process is replaced, anything
+    sent that hasn't been replied to is sent again to the new process.
+    A connection whose other end has closed is treated as waiting on a
+    process that is exiting, so it is named or replaced the same way.
+    Polling without a reply checks the process too, so interfaces that
+    poll their connections notice a process that has died.
+    """
+
+    # How many seconds to wait between checks on the process
+    INTERVAL = .1
+
+    def __init__(
+            self, connection: Connection, index: int,
+            check: Callable[[int, float], Opt[Connection]]
+    ):
+        self.connection = connection
+        self.__index = index
+        self.__check = check
+        self.__unanswered: List[Any] = []
+        self.__closed = False
+
+    @property
+    def readable(self) -> bool:
+        return self.connection.readable
+
+    @property
+    def writable(self) -> bool:
+        return self.connection.writable
+
+    def send(self, value: Any):
+        self.connection.send(value)
+        self.__unanswered.append(value)
+
+    def recv(self) -> Any:
+        waited = 0.0
+        while True:
+            if self.__closed:
+                time.sleep(self.INTERVAL)
+            elif self.__poll():
+                try:
+                    value = self.connection.recv()
+                except (EOFError, OSError):
+                    # Only happens once the process has closed its end,
+                    # which the check below notices once it has exited
+                    self.__closed = True
+                else:
+                    if self.__unanswered:
+                        self.__unanswered.pop(0)
+                    return value
+
+            waited += self.INTERVAL
+            if self.__replace_if_unhealthy(waited):
+                waited = 0.0
+
+    def __poll(self, timeout: float = INTERVAL) -> bool:
+        try:
+            return self.connection.poll(timeout)
+        except (EOFError, OSError):
+            return False
+
+    def __replace_if_unhealthy(self, waited: float) -> bool:
+        replacement = self.__check(self.__index, waited)
+        if replacement is None:
+            return False
+
+        self.connection = replacement
+        self.__closed = False
+        for value in self.__unanswered:
+            self.connection.send(value)
+        return True
+
+    def poll(self, timeout: float = 0) -> bool:
+        if not self.__closed and self.__poll(timeout):
+            return True
+        self.__replace_if_unhealthy(0.)
+        return False
+
+    def close(self):
+        self.connection.close()
 
 
 class ProcessInterface:
 
     def __init__(
             self, interface_kernel: Interface,
-            process_com: List[Connection], processes: List["_SmartProcess"]):
-        self.__connections = process_com
+            process_com: List[Connection], processes: List["_SmartProcess"],
+            partitioner: "_Partitioner" = None,
+            release: Callable[[], None] = None,
+            timeout: Opt[float] = None, respawn: bool = False):
+        self.__connections = [
+            _MonitoredConnection(connection, index, self.__check)
+            for index, connection in enumerate(process_com)
+        ]
         self.__interface = interface_kernel
         self.__processes = processes
+        self.__partitioner = partitioner
+        self.__release = release
+        self.__timeout = timeout
+        self.__respawn = respawn
+        self.__unresponsive = set()
+        self.__shared_parameters: Opt[_SharedParameters] = None
+        self.__sharing = False
+        self.__closed = False
 
     def run(self, *args):
+        self.__stop_sharing()
         try:
             return self.__interface.run(self.__connections, *args)
         except Exception as error:
             self.close()
             raise error
 
+    def run_batch(self, batch: List[Any]):
+        self.__stop_sharing()
+        try:
+            return self.__interface.run_batch(self.__connections, batch)
+        except Exception as error:
+            self.close()
+            raise error
+
+    def share_parameters(
+            self, names: List[str], as_array: bool = False,
+            gradient_request: Opt[Callable[[Any], Any]] = None
+    ):
+        """Sets the layout of the shared parameter block
+
+        After this is called, run_shared can be used to send parameters
+        through shared memory instead of the pipes. The kernels must
+        accept a dictionary of floats and return a single float.
+
+        Parameters
+        ----------
+        names : List[str]
+            The names of the parameters, in the order they'll be passed
+            to run_shared.
+        as_array : bool, optional
+            If True, the kernels are given a copy of the parameters as an
+            array in the order of names, instead of a dictionary.
+            Defaults to False.
+        gradient_request : Callable, optional
+            Wraps the parameters before they're given to the kernels when
+            run_shared is asked for the gradient. The kernels must then
+            return a dictionary of floats keyed by the names. Without
+            it, gradients can only be requested through run.
+        """
+        self.__stop_sharing()
+        if self.__shared_parameters:
+            self.__shared_parameters.close()
+        self.__shared_parameters = _SharedParameters(
+            names, len(self.__processes), as_array, gradient_request
+        )
+
+    def run_shared(
+            self, values: List[float], gradient: bool = False
+    ) -> Union[npy.ndarray, List[Dict[str, float]]]:
+        """Runs the kernels with parameters sent through shared memory
+
+        Parameters
+        ----------
+        values : List[float]
+            The value of each parameter, in the same order as the names
+            passed to share_parameters.
+        gradient : bool, optional
+            If True, the kernels are given the parameters wrapped in the
+            gradient_request passed to share_parameters, and their
+            gradients are returned instead. Defaults to False.
+
+        Returns
+        -------
+        npy.ndarray or List[Dict[str, float]]
+            The value returned by each kernel, in process order, or the
+            gradient from each kernel if gradient is True.
+
+        Raises
+        ------
+        ValueError
+            If the gradient is asked for without a gradient_request.
+        Exception
+            Any error raised by a kernel.
+        """
+        shared = self.__shared_parameters
+        if gradient and shared.gradient_request is None:
+            raise ValueError("No gradient_request was shared!")
+
+        if not self.__sharing:
+            for index, monitored in enumerate(self.__connections):
+                monitored.connection.send(ProcessCodes.SHARE)
+                monitored.connection.send(shared.layout(index))
+            self.__sharing = True
+
+        shared.parameters[:] = values
+        shared.command[0] = shared.GRADIENT if gradient else shared.RUN
+        for process in self.__processes:
+            process.signals[0].release()
+        lost = [index for index in range(len(self.__processes))
+                if not self.__wait_for_shared(index)]
+
+        if lost:
+            # The rest have to leave the shared loop before the lost
+            # processes can be replaced and the call started again.
+            self.__stop_sharing(
+                [i not in lost for i in range(len(self.__processes))]
+            )
+            for index in lost:
+                self.__connections[index].connection = self.__recover(index)
+            return self.run_shared(values, gradient)
+
+        if shared.status.any():
+            self.__raise_shared_error()
+        if gradient:
+            return shared.gradients()
+        return shared.results.copy()
+
+    def __wait_for_shared(self, index: int) -> bool:
+        # Returns false if the process died before it was done
+        process, waited = self.__processes[index], 0.0
+        while not process.signals[1].acquire(
+                timeout=_MonitoredConnection.INTERVAL
+        ):
+            waited += _MonitoredConnection.INTERVAL
+            if not self.__is_healthy(index, waited):
+                return False
+        return True
+
+    def __check(self, index: int, waited: float) -> Opt[Connection]:
+        # Called by the connections while waiting on the process at index
+        if self.__is_healthy(index, waited):
+            return None
+        return self.__recover(index)
+
+    def __is_healthy(self, index: int, waited: float) -> bool:
+        process = self.__processes[index]
+        if self.__timeout is not None and waited >= self.__timeout:
+            self.__unresponsive.add(index)
+            process.terminate()
+            process.join(1)
+            return False
+        return process.is_alive()
+
+    def __recover(self, index: int) -> Connection:
+        process = self.__processes[index]
+        if index in self.__unresponsive:
+            self.__unresponsive.remove(index)
+            message = f"Process {index} (pid {process.pid}) stopped " \
+                      f"responding for {self.__timeout} seconds!"
+        elif process.exitcode is not None and process.exitcode < 0:
+            message = f"Process {index} (pid {process.pid}) was killed " \
+                      f"by signal {-process.exitcode}!"
+        else:
+            message = f"Process {index} (pid {process.pid}) died with " \
+                      f"exit code {process.exitcode}!"
+
+        if not self.__respawn or self.__release or not self.__partitioner:
+            self.close()
+            raise RuntimeError(message)
+
+        _LOGGER.warning(f"{message} Starting a new process in its place.")
+
+        # Simplex processes are connected with one way pipes
+        is_duplex = self.__connections[index].writable
+        kernel = self.__partitioner.kernel(index, len(self.__processes))
+        main, child = Pipe(is_duplex)
+        replacement = _SmartProcess(
+            kernel, child, placement=process.placement
+        )
+        replacement.start()
+        child.close()
+
+        process.close()
+        self.__processes[index] = replacement
+        return main
+
+    def __raise_shared_error(self):
+        # Processes that failed have already left the shared loop
+        failed = self.__shared_parameters.status.nonzero()[0]
+        error = RuntimeError("Unknown error in process!")
+        for index in failed:
+            if self.__connections[index].recv() is ProcessCodes.ERROR:
+                error = self.__connections[index].recv()
+
+        self.__stop_sharing(
+            [i not in failed for i in range(len(self.__processes))]
+        )
+        self.close()
+        raise error
+
+    def __stop_sharing(self, still_sharing: List[bool] = None):
+        if not self.__sharing:
+            return
+
+        if still_sharing is None:
+            still_sharing = [True] * len(self.__processes)
+
+        self.__shared_parameters.command[0] = self.__shared_parameters.EXIT
+        for process, sharing in zip(self.__processes, still_sharing):
+            if sharing:
+                process.signals[0].release()
+        for index, sharing in enumerate(still_sharing):
+            if sharing:
+                self.__wait_for_shared(index)
+
+        self.__shared_parameters.status[:] = 0
+        self.__sharing = False
+
     def close(self):
+        if self.__closed:
+            return
+        self.__closed = True
+
+        self.__stop_sharing()
+        if self.__shared_parameters:
+            self.__shared_parameters.close()
+
+        # Processes that belong to a pool are handed back instead of
+        # being shutdown so that they can be reused.
+        if self.__release:
+            self.__release()
+        else:
+            self.__shutdown()
+
+        # Release the shared memory now that nothing is using it
+        if self.__partitioner:
+            self.__partitioner.close()
+
+    def __shutdown(self):
         # Close the pipes and shutdown the processes
         for connection in self.__connections:
             if connection.writable:
-                connection.send(ProcessCodes.SHUTDOWN)
+                try:
+                    connection.send(ProcessCodes.SHUTDOWN)
+                except (BrokenPipeError, OSError):
+                    pass  # The process has already died
             connection.close()
 
         # Wait at most 2 seconds for the processes to shutdown
@@ -278,20 +1791,354 @@ class ProcessInterface:
                 process.terminate()
             process.close()
 
+    def repartition(self, shares: npy.ndarray):
+        """Moves the partition boundaries between the duplex processes
+
+        The data is split again with the provided shares and new kernels
+        are loaded into the running processes. With shared memory, only
+        the new descriptions of the partitions are sent.
+
+        Parameters
+        ----------
+        shares : npy.ndarray
+            The fraction of the events each process should hold, in the
+            same order as the processes.
+        """
+        self.__stop_sharing()
+        kernels = self.__partitioner.kernels(len(self.__connections), shares)
+        for monitored, kernel in zip(self.__connections, kernels):
+            monitored.connection.send(ProcessCodes.LOAD)
+            monitored.connection.send((kernel, True))
+
+    @property
+    def durations(self) -> Opt[npy.ndarray]:
+        """The processor time each kernel spent on the last call
+
+        None unless the processes were made with timed set.
+        """
+        return self.__partitioner.durations
+
     @property
     def is_alive(self) -> bool:
         return any([proc.is_alive() for proc in self.__processes])
 
 
+class WorkerPool:
+    """Long-lived processes that kernels can be loaded into.
+
+    Spawning processes and moving data into them is the most expensive
+    part of creating a likelihood. The pool spawns its processes once,
+    and each call to load sends a new kernel to already running
+    processes, with the data shared through shared memory. This is
+    useful when fitting many bins one after another.
+
+    Parameters
+    ----------
+    number_of_processes : int, optional
+        The number of processes to keep alive, defaults to the number of
+        CPUs.
+
+    Notes
+    -----
+    The kernels are pickled when they're loaded into the pool, so any
+    amplitude used with the pool must be defined before the pool is
+    created. The pool must be closed once it is no longer needed, or be
+    created using the `with` statement.
+
+    Examples
+    --------
+    >>> with WorkerPool() as pool:
+    ...     for data, mc in bins:
+    ...         with LogLikelihood(amp, data, mc, pool=pool) as likelihood:
+    ...             minuit(params, settings, likelihood, 1)
+    """
+
+    def __init__(self, number_of_processes: int = MAX_PROC):
+        self.__lock = threading.Lock()
+        self.__connections: List[Connection] = []
+        self.__processes: List[_SmartProcess] = []
+        self.__idle = list(range(number_of_processes))
+
+        # The processes need to share our resource tracker, otherwise they
+        # will each try to cleanup the shared memory they've attached to.
+        resource_tracker.ensure_running()
+
+        for index in range(number_of_processes):
+            connection, process = self.__spawn()
+            self.__connections.append(connection)
+            self.__processes.append(process)
+
+    @staticmethod
+    def __spawn() -> Tuple[Connection, "_SmartProcess"]:
+        main, child = Pipe(True)
+        process = _SmartProcess(None, child, True)
+        process.start()
+        child.close()
+        return main, process
+
+    def load(
+            self, data: _data, template_kernel: Kernel,
+            interface: Interface, number_of_processes: int = None,
+            use_duplex: bool = True, timeout: Opt[float] = None,
+            timed: bool = False
+    ) -> ProcessInterface:
+        """Loads a kernel and its data into idle processes
+
+        Parameters
+        ----------
+        data : Dict[str, ndarray, ParticlePool, or DataFrame]
+            The data that will be split between the kernels.
+        template_kernel : Kernel
+            The kernel that will be copied into each process.
+        interface : Interface
+            The interface that will communicate with the kernels.
+        number_of_processes : int, optional
+            How many of the idle processes to use, defaults to all of them
+        use_duplex : bool, optional
+            Whether the kernels should wait for data (True), or
+            immediately process and return (False). Defaults to True.
+        timeout : float, optional
+            The most seconds to wait on a process before it is considered
+            to have stopped responding. Processes that die are replaced
+            by the pool once the interface is closed.
+        timed : bool, optional
+            If True, each process records the processor time its kernel
+            took on the last call, see make_processes. Defaults to False.
+
+        Returns
+        -------
+        ProcessInterface
+            The interface to the loaded processes. Closing it hands the
+            processes back to the pool.
+
+        Raises
+        ------
+        RuntimeError
+            If there are not enough idle processes.
+        """
+        with self.__lock:
+            if number_of_processes is None:
+                number_of_processes = len(self.__idle)
+            if not 0 < number_of_processes <= len(self.__idle):
+                raise RuntimeError(
+                    f"Requested {number_of_processes} processes, but only "
+                    f"{len(self.__idle)} of {self.size} are idle!"
+                )
+            reserved = self.__idle[:number_of_processes]
+            self.__idle = self.__idle[number_of_processes:]
+
+        partitioner = _Partitioner(data, template_kernel, True, timed)
+        kernels = partitioner.kernels(number_of_processes)
+
+        for index, kernel in zip(reserved, kernels):
+            self.__connections[index].send(ProcessCodes.LOAD)
+            self.__connections[index].send((kernel, use_duplex))
+
+        return ProcessInterface(
+            interface, [self.__connections[i] for i in reserved],
+            [self.__processes[i] for i in reserved], partitioner,
+            functools.partial(self.__release, reserved), timeout
+        )
+
+    def __release(self, reserved: List[int]):
+        for index in reserved:
+            self.__unload(index)
+
+        with self.__lock:
+            self.__idle.extend(reserved)
+            self.__idle.sort()
+
+    def __unload(self, index: int):
+        # Anything left in the pipe from the previous kernel is discarded
+        # until the process acknowledges the unload.
+        connection = self.__connections[index]
+        try:
+            connection.send(ProcessCodes.UNLOAD)
+        except (BrokenPipeError, OSError):
+            pass  # The process has died, and will be replaced below
+        while True:
+            try:
+                if connection.poll(1):
+                    if connection.recv() is ProcessCodes.UNLOAD:
+                        return
+                    continue
+            except (EOFError, OSError):
+                pass  # The process has died
+            if not self.__processes[index].is_alive():
+                connection.close()
+                self.__processes[index].join()
+                self.__processes[index].close()
+                connection, process = self.__spawn()
+                self.__connections[index] = connection
+                self.__processes[index] = process
+                return
+
+    @property
+    def size(self) -> int:
+        return len(self.__processes)
+
+    @property
+    def idle(self) -> int:
+        return len(self.__idle)
+
+    def close(self):
+        """Shuts down every process in the pool"""
+        interface = ProcessInterface(
+            None, self.__connections, self.__processes
+        )
+        interface.close()
+        self.__connections, self.__processes, self.__idle = [], [], []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+
+class ThreadInterface:
+    """The interface to kernels running on threads
+
+    Provides the same run, run_batch, and close as the ProcessInterface,
+    so either can be used by the likelihoods and simulation.
+    """
+
+    def __init__(
+            self, interface_kernel: Interface,
+            thread_com: List[_ThreadConnection],
+            threads: List["_SmartThread"]):
+        self.__connections = thread_com
+        self.__interface = interface_kernel
+        self.__threads = threads
+
+    def run(self, *args):
+        try:
+            return self.__interface.run(self.__connections, *args)
+        except Exception as error:
+            self.close()
+            raise error
+
+    def run_batch(self, batch: List[Any]):
+        try:
+            return self.__interface.run_batch(self.__connections, batch)
+        except Exception as error:
+            self.close()
+            raise error
+
+    def close(self):
+        for connection in self.__connections:
+            if connection.writable:
+                connection.send(ProcessCodes.SHUTDOWN)
+            connection.close()
+
+        for thread in self.__threads:
+            thread.join()
+
+    @property
+    def is_alive(self) -> bool:
+        return any([thread.is_alive() for thread in self.__threads])
+
+
+class ClusterInterface:
+    """The interface to kernels running on a Cluster's workers
+
+    Provides the same run, run_batch, and close as the ProcessInterface.
+    The results from every worker are combined by the interface on this
+    machine.
+    """
+
+    def __init__(
+            self, interface_kernel: Interface,
+            connections: List[_RemoteConnection]):
+        self.__connections = connections
+        self.__interface = interface_kernel
+
+    def run(self, *args):
+        try:
+            return self.__interface.run(self.__connections, *args)
+        except Exception as error:
+            self.close()
+            raise error
+
+    def run_batch(self, batch: List[Any]):
+        try:
+            return self.__interface.run_batch(self.__connections, batch)
+        except Exception as error:
+            self.close()
+            raise error
+
+    def close(self):
+        # Shutting down only disconnects, the workers keep running
+        for connection in self.__connections:
+            if connection.writable:
+                try:
+                    connection.send(ProcessCodes.SHUTDOWN)
+                except RuntimeError:
+                    pass  # The worker has already gone
+            connection.close()
+
+    @property
+    def is_alive(self) -> bool:
+        return any([connection.writable for connection in self.__connections])
+
+
+class _SmartThread(threading.Thread):
+
+    def __init__(
+            self, kernel: Kernel, connect: _ThreadConnection,
+            is_duplex: bool
+    ):
+        super(_SmartThread, self).__init__(daemon=True)
+        self.__kernel = kernel
+        self.__connection = connect
+        self.__is_duplex = is_duplex
+
+    def run(self):
+        try:
+            self.__kernel.setup()
+            if not self.__is_duplex:
+                self.__connection.send(self.__kernel.process())
+                return
+
+            while True:
+                received = self.__connection.recv()
+                if isinstance(received, ProcessCodes):
+                    break
+                self.__connection.send(self.__kernel.process(received))
+        except Exception as error:
+            self.__connection.send(ProcessCodes.ERROR)
+            self.__connection.send(error)
+
+
 class _SmartProcess(Process):
 
-    def __init__(self, kernel: Kernel, connect: Connection):
+    def __init__(
+            self, kernel: Opt[Kernel], connect: Connection,
+            persistent: bool = False, placement: Opt[_Placement] = None
+    ):
         super(_SmartProcess, self).__init__()
         self.__kernel = kernel
         self.__connection = connect
+        self.__persistent = persistent
+        self.__memory = []
         self.daemon = True
+        self.placement = placement
+
+        # Used to start and acknowledge calls with shared parameters
+        self.signals = (Semaphore(0), Semaphore(0))
 
     def run(self):
+        if self.placement:
+            self.placement.pin()
+
+        if self.__persistent:
+            self.__loop()
+            return
+
+        self.__memory = _attach_shared_data(self.__kernel)
+        if self.placement:
+            self.placement.localize(self.__kernel)
+
         if self.__connection.readable:
             self.__run_duplex()
         else:
@@ -309,20 +2156,123 @@ class _SmartProcess(Process):
     def __loop(self):
         while True:
             received = self.__connection.recv()
-            if received == ProcessCodes.SHUTDOWN:
-                self.__connection.close()
-                break
-            self.__process(received)
+            if isinstance(received, ProcessCodes):
+                if received == ProcessCodes.SHUTDOWN:
+                    self.__connection.close()
+                    break
+                elif received == ProcessCodes.LOAD:
+                    self.__load()
+                elif received == ProcessCodes.UNLOAD:
+                    self.__unload()
+                    self.__connection.send(ProcessCodes.UNLOAD)
+                elif received == ProcessCodes.SHARE:
+                    self.__run_shared()
+            else:
+                self.__process(received)
+
+    def __load(self):
+        try:
+            kernel, is_duplex = self.__connection.recv()
+            self.__unload()
+            self.__kernel = kernel
+            self.__memory = _attach_shared_data(kernel)
+            _load_file_shards(kernel)
+            self.__kernel.setup()
+            if not is_duplex:
+                self.__connection.send(self.__kernel.process())
+        except Exception as error:
+            self.__handle_error(error)
+
+    def __unload(self):
+        if self.__kernel is not None:
+            self.__kernel.close()
+        self.__kernel = None
+        for memory in self.__memory:
+            try:
+                memory.close()
+            except BufferError:
+                pass  # Still referenced, closes once garbage collected
+        self.__memory = []
 
     def __process(self, received_data):
         try:
+            if self.__kernel is None:
+                raise RuntimeError("No kernel has been loaded!")
+            start = time.process_time()
             value = self.__kernel.process(received_data)
+            self.__record_time(time.process_time() - start)
         except Exception as error:
             self.__handle_error(error)
-            raise
+            if not self.__persistent:
+                raise
         else:
             self.__connection.send(value)
 
+    def __run_shared(self):
+        start_signal, done_signal = self.signals
+        layout = self.__connection.recv()
+        handles, arrays = [], {}
+        for key in (
+                "parameters", "command", "results", "status", "gradient",
+                "provided"
+        ):
+            arrays[key], handle = layout[key].attach()
+            handles.append(handle)
+        positions = {name: i for i, name in enumerate(layout["names"])}
+
+        while True:
+            start_signal.acquire()
+            if arrays["command"][0] == _SharedParameters.EXIT:
+                done_signal.release()
+                break
+
+            try:
+                start = time.process_time()
+                if layout["as_array"]:
+                    parameters = arrays["parameters"].copy()
+                else:
+                    parameters = dict(
+                        zip(layout["names"], arrays["parameters"].tolist())
+                    )
+                if arrays["command"][0] == _SharedParameters.GRADIENT:
+                    self.__write_gradient(
+                        self.__kernel.process(
+                            layout["gradient_request"](parameters)
+                        ), positions, arrays
+                    )
+                else:
+                    arrays["results"][0] = self.__kernel.process(parameters)
+                self.__record_time(time.process_time() - start)
+            except Exception as error:
+                arrays["status"][0] = 1
+                self.__connection.send(ProcessCodes.ERROR)
+                self.__connection.send(error)
+                break
+            finally:
+                done_signal.release()
+
+        arrays = None
+        for handle in handles:
+            try:
+                handle.close()
+            except BufferError:
+                pass  # Still referenced, closes once garbage collected
+
+    @staticmethod
+    def __write_gradient(
+            gradient: Dict[str, float], positions: Dict[str, int],
+            arrays: Dict[str, npy.ndarray]
+    ):
+        arrays["provided"][0] = False
+        for name, value in gradient.items():
+            arrays["gradient"][0, positions[name]] = value
+            arrays["provided"][0, positions[name]] = True
+
+    def __record_time(self, duration: float):
+        timer = getattr(self.__kernel, "_process_timer", None)
+        if timer is not None:
+            timer[0] = duration
+
     def __run_simplex(self):
         try:
             self.__kernel.setup()
@@ -334,4 +2284,5 @@ class _SmartProcess(Process):
     def __handle_error(self, error):
         self.__connection.send(ProcessCodes.ERROR)
         self.__connection.send(error)
-        self.__connection.close()
+        if not self.__persistent:
+            self.__connection.close()
@@ -40,7 +40,9 @@ def monte_carlo_simulation(
         amplitude: likelihoods.NestedFunction,
         data: Union[npy.ndarray, pd.DataFrame, project.BaseFolder],
         params: Dict[str, float] = None,
-        processes: int = multiprocessing.cpu_count()) -> npy.ndarray:
+        processes: int = multiprocessing.cpu_count(),
+        pool: process.WorkerPool = None,
+        backend: str = "processes") -> npy.ndarray:
     """Produces the rejection list
     This takes a user defined intensity object along with it's
     associated data, and generates a pass/fail array to be used to
@@ -63,6 +65,13 @@ def monte_carlo_simulation(
     processes : int, optional
         Selects the number of processes to run with, defaults to the
         number of processes detected through multiprocessing
+    pool : WorkerPool, optional
+        A pool of already running processes to use instead of spawning
+        new processes.
+    backend : str, optional
+        Either "processes" or "threads". Threads avoid spawning processes
+        and copying the data, but are only quicker if the amplitude
+        releases the GIL. Defaults to "processes".
 
     Returns
     -------
@@ -73,8 +82,8 @@ def monte_carlo_simulation(
     Raises
     ------
     ValueError
-        If the data is not understood. If you received this, check your
-        data to ensure its a supported type
+        If the data is not understood, or the backend is unknown. If you
+        received this, check your data to ensure its a supported type
 
     Examples
     --------
@@ -84,7 +93,7 @@ def monte_carlo_simulation(
     >>> carved = data[rejection]
     """
     intensity, max_value = process_user_function(
-        amplitude, data, params, processes
+        amplitude, data, params, processes, pool, backend
     )
     return make_rejection_list(intensity, max_value)
 
@@ -92,7 +101,9 @@ def monte_carlo_simulation(
 def process_user_function(amplitude: likelihoods.NestedFunction,
         data: Union[npy.ndarray, pd.DataFrame, project.BaseFolder],
         params: Dict[str, float] = None,
-        processes: int = multiprocessing.cpu_count()
+        processes: int = multiprocessing.cpu_count(),
+        pool: process.WorkerPool = None,
+        backend: str = "processes"
 ) -> Tuple[npy.ndarray, float]:
     """Produces an array of values for the calculated function.
 
@@ -113,6 +124,13 @@ def process_user_function(amplitude: likelihoods.NestedFunction,
     processes : int, optional
         Selects the number of processes to run with, defaults to the
         number of processes detected through multiprocessing
+    pool : WorkerPool, optional
+        A pool of already running processes to use instead of spawning
+        new processes.
+    backend : str, optional
+        Either "processes" or "threads". Threads avoid spawning processes
+        and copying the data, but are only quicker if the amplitude
+        releases the GIL. Defaults to "processes".
 
     Returns
     -------
@@ -123,11 +141,13 @@ def process_user_function(amplitude: likelihoods.NestedFunction,
     Raises
     ------
     ValueError
-        If the data is not understood. If you received this, check your
-        data to ensure its a supported type
+        If the data is not understood, or the backend is unknown. If you
+        received this, check your data to ensure its a supported type
     """
     if isinstance(data, (npy.ndarray, pd.DataFrame)):
-        intensity = _in_memory_intensities(amplitude, data, params, processes)
+        intensity = _in_memory_intensities(
+            amplitude, data, params, processes, pool, backend
+        )
     elif isinstance(data, project.BaseFolder):
         intensity = _in_table_intensities(amplitude, data, params)
     else:
@@ -140,18 +160,33 @@ def _in_memory_intensities(
         amplitude: likelihoods.NestedFunction,
         data: Union[npy.ndarray, pd.DataFrame],
         params: Dict[str, float],
-        processes: int) -> npy.ndarray:
+        processes: int,
+        pool: process.WorkerPool = None,
+        backend: str = "processes") -> npy.ndarray:
+
+    if backend not in ("processes", "threads"):
+        raise ValueError(f"Unknown backend {backend!r}!")
 
     kernel = _Kernel(amplitude, params)
-    if not amplitude.USE_MP or not processes:
+    if not processes or (not amplitude.USE_MP and backend != "threads"):
         kernel.data = data
         kernel.setup()
         return kernel.run()[1]
 
     interface = _Interface()
-    manager = process.make_processes(
-        {"data": data}, kernel, interface, processes, False
-    )
+    if backend == "threads":
+        manager = process.make_threads(
+            {"data": data}, kernel, interface, processes, False
+        )
+    elif pool is not None:
+        manager = pool.load(
+            {"data": data}, kernel, interface, min(processes, pool.size),
+            False
+        )
+    else:
+        manager = process.make_processes(
+            {"data": data}, kernel, interface, processes, False
+        )
     result = manager.run()
     manager.close()
     return result
@@ -86,6 +86,14 @@ class _GampDataTest(templates.IReadTest):
         return "{0}()".format(self.__class__.__name__)
 
     def can_read(self, filename):
+        # type: (Path) -> bool
+        try:
+            return self.__can_read(filename)
+        except UnicodeDecodeError:
+            return False  # Binary files, like numpy's
+
+    @staticmethod
+    def __can_read(filename):
         # type: (Path) -> bool
         with filename.open() as stream:
             for i in range(_COUNT):
@@ -24,6 +24,7 @@ package.
 
 - blank - An empty program for testing initializers.
 - masking - The masking and data translation utility
+- worker - Runs the kernels sent from a Cluster on another machine
 - shell - Where PyFit and PySimulate are defined.
 """
 
@@ -0,0 +1,77 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Worker for fitting and simulating across several machines
+=========================================================
+
+Starts a worker that a process.Cluster can connect to. The key must be
+shared with the Cluster, and is read from the PYPWA_AUTHKEY environment
+variable unless a key file is provided, so that it won't show up in the
+process list.
+"""
+
+import argparse
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import List
+
+from PyPWA.libs import process
+from PyPWA import info as _info
+
+__credits__ = ["Mark Jones"]
+__author__ = _info.AUTHOR
+__version__ = _info.VERSION
+
+
+def start_worker(arguments: List[str] = sys.argv[1:]):
+    args = _arguments(arguments)
+    logging.basicConfig(level=logging.INFO)
+
+    if args.key_file:
+        authkey = args.key_file.read_bytes().strip()
+    elif "PYPWA_AUTHKEY" in os.environ:
+        authkey = os.environ["PYPWA_AUTHKEY"].encode()
+    else:
+        print("Provide a key with --key-file or PYPWA_AUTHKEY!")
+        sys.exit(1)
+
+    process.run_worker((args.host, args.port), authkey)
+
+
+def _arguments(args: List[str]) -> argparse.ArgumentParser.parse_args:
+    arguments = argparse.ArgumentParser()
+
+    arguments.add_argument(
+        "--host", default="0.0.0.0",
+        help="The address to listen on, defaults to every interface."
+    )
+
+    arguments.add_argument(
+        "--port", "-p", type=int, required=True,
+        help="The port to listen on."
+    )
+
+    arguments.add_argument(
+        "--key-file", "-k", type=Path,
+        help="A file containing the key the Cluster will connect with."
+    )
+
+    return arguments.parse_args(args)
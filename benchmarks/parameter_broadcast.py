@@ -0,0 +1,67 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+Compares likelihood calls per second through the pipes against the
+shared memory parameter block, using a cheap amplitude so that the cost
+of sending the parameters dominates.
+
+Usage: python benchmarks/parameter_broadcast.py [processes] [parameters]
+"""
+
+import sys
+import time
+
+import numpy as npy
+
+import PyPWA as pwa
+
+
+class CheapAmplitude(pwa.NestedFunction):
+
+    def setup(self, data):
+        self.__data = data
+
+    def calculate(self, parameters):
+        return self.__data * parameters["p0"] + 1
+
+
+def calls_per_second(likelihood, parameters, seconds=2.):
+    calls, start = 0, time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        likelihood(parameters)
+        calls += 1
+    return calls / (time.perf_counter() - start)
+
+
+def main(processes=4, count=20):
+    data = npy.random.rand(10000)
+    names = [f"p{index}" for index in range(count)]
+    parameters = {name: 1. for name in names}
+
+    options = [("pipe", {}), ("shared", {"parameter_names": names})]
+    for label, kwargs in options:
+        with pwa.EmptyLikelihood(
+                CheapAmplitude(), data, processes, **kwargs
+        ) as likelihood:
+            rate = calls_per_second(likelihood, parameters)
+        print(f"{label:>8}: {rate:10.1f} calls/second")
+
+
+if __name__ == "__main__":
+    main(*[int(argument) for argument in sys.argv[1:]])
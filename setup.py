@@ -55,6 +55,7 @@ progs = "PyPWA.progs"
 entry_points = {
     "console_scripts": [
         f"pymask = {progs}.masking:start_masking",
+        f"pyworker = {progs}.worker:start_worker",
 #        f"pybin = {progs}.binner:start_binning",
 #        f"pysimulate = {progs}.simulation:simulation",
 #        f"pyfit = {progs}.pyfit:start_fitting"
@@ -0,0 +1,71 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+"""
+The amplitude and Monte Carlo shared by the fitting tests. The directory
+is a package so that the amplitude can be pickled into worker pools.
+"""
+
+import numpy as npy
+import pandas as pd
+import pytest
+
+from PyPWA.libs import fit
+
+
+class GaussAmplitude(fit.NestedFunction):
+    """A gaussian in x, scaled by the scale parameter if it's given"""
+
+    def setup(self, data):
+        self.__data = data
+
+    def calculate(self, params):
+        return params.get("scale", 1.) * npy.exp(
+            -((self.__data["x"] - params["mean"]) ** 2) / params["width"] ** 2
+        )
+
+
+class GaussGradientAmplitude(GaussAmplitude):
+
+    def setup(self, data):
+        super(GaussGradientAmplitude, self).setup(data)
+        self.__x = data["x"]
+
+    def gradient(self, params):
+        intensity = self.calculate(params)
+        offset = self.__x - params["mean"]
+        gradient = {
+            "mean": intensity * 2 * offset / params["width"] ** 2,
+            "width": intensity * 2 * offset ** 2 / params["width"] ** 3
+        }
+        if "scale" in params:
+            gradient["scale"] = intensity / params["scale"]
+        return gradient
+
+
+MONTE_CARLO = pd.DataFrame({"x": npy.random.RandomState(0).rand(5000) * 10})
+
+
+@pytest.fixture
+def gauss_amplitude():
+    return GaussAmplitude()
+
+
+@pytest.fixture(scope="session")
+def monte_carlo():
+    return MONTE_CARLO
@@ -0,0 +1,165 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as npy
+import pandas as pd
+import pytest
+
+from PyPWA.libs import fit
+from .conftest import GaussAmplitude
+
+
+def make_bin(mean, count):
+    flat = pd.DataFrame({"x": npy.random.rand(count * 5) * 10})
+    keep = npy.exp(-((flat["x"] - mean) ** 2)) > npy.random.rand(len(flat))
+    return flat[keep], flat
+
+
+@pytest.fixture(scope="module")
+def bins():
+    return [make_bin(mean, count) for mean, count in [(3, 500), (5, 5000)]]
+
+
+def test_allocations_scale_with_bin_size():
+    allocations = fit.bins.allocate_processes([10, 100, 1000], 4, 100)
+    assert allocations == [1, 1, 4]
+
+
+def test_fit_bins_finds_each_mean(gauss_amplitude, bins):
+    settings = {
+        "mean": 4, "limit_mean": [0, 10], "width": 1,
+        "limit_width": [.1, 5], "pedantic": False
+    }
+    results = fit.fit_bins(
+        gauss_amplitude, [b[0] for b in bins], [b[1] for b in bins],
+        ["mean", "width"], settings, num_of_processes=3,
+        events_per_process=2000
+    )
+
+    assert len(results) == 2
+    assert all(isinstance(r, fit.FitResult) for r in results)
+    assert all(r.calls == r.result.ncalls_total for r in results)
+    assert round(results[0].values["mean"]) == 3
+    assert round(results[1].values["mean"]) == 5
+
+
+def test_fit_bins_rejects_mismatched_monte_carlo(gauss_amplitude, bins):
+    with pytest.raises(ValueError):
+        fit.fit_bins(gauss_amplitude, [bins[0][0]], [], ["mean"], {})
+
+
+class InterruptedAmplitude(GaussAmplitude):
+
+    USE_MP = False
+
+    def setup(self, data):
+        super(InterruptedAmplitude, self).setup(data)
+        self.__calls = 0
+        self.__large = len(data) > 10000
+
+    def calculate(self, params):
+        self.__calls += 1
+        if self.__large and self.__calls > 40:
+            raise RuntimeError("Interrupted")
+        return super(InterruptedAmplitude, self).calculate(params)
+
+
+def test_resume_skips_finished_bins(bins, tmp_path):
+    checkpoint = tmp_path / "fits.pickle"
+    settings = {
+        "mean": 4, "limit_mean": [0, 10], "width": 1,
+        "limit_width": [.1, 5], "pedantic": False
+    }
+    arguments = (
+        [b[0] for b in bins], [b[1] for b in bins], ["mean", "width"],
+        settings
+    )
+    with pytest.raises(RuntimeError):
+        fit.fit_bins(
+            InterruptedAmplitude(), *arguments, num_of_processes=2,
+            events_per_process=10 ** 6, checkpoint=checkpoint,
+            checkpoint_interval=0
+        )
+
+    results = fit.resume_bins(
+        checkpoint, GaussAmplitude(), *arguments, num_of_processes=2,
+        events_per_process=10 ** 6
+    )
+    assert results[0].result is None
+    assert results[1].result is not None
+    assert results[1].calls > results[1].result.ncalls_total
+    assert round(results[0].values["mean"]) == 3
+    assert round(results[1].values["mean"]) == 5
+
+    resumed = fit.resume_bins(checkpoint, GaussAmplitude(), *arguments)
+    assert all(result.result is None for result in resumed)
+    assert [r.values for r in resumed] == [r.values for r in results]
+
+
+def test_resume_rejects_other_fits(bins, tmp_path):
+    checkpoint = tmp_path / "fits.pickle"
+    fit.fit_bins(
+        GaussAmplitude(), [bins[0][0]], [bins[0][1]], ["mean", "width"],
+        {"mean": 3, "width": 1, "limit_width": [.1, 5]},
+        num_of_processes=1, checkpoint=checkpoint
+    )
+    with pytest.raises(ValueError):
+        fit.resume_bins(
+            checkpoint, GaussAmplitude(), [bins[0][0]], [bins[0][1]],
+            ["mean"], {"mean": 3}
+        )
+
+
+@pytest.mark.parametrize("anchor", [0, 1])
+def test_chain_bins_finds_each_mean(gauss_amplitude, bins, anchor):
+    settings = {
+        "mean": 4, "limit_mean": [0, 10], "width": 1,
+        "limit_width": [.1, 5], "pedantic": False
+    }
+    results = fit.chain_bins(
+        gauss_amplitude, [b[0] for b in bins], [b[1] for b in bins],
+        ["mean", "width"], settings, num_of_processes=2, anchor=anchor
+    )
+
+    assert [result.optimizer for result in results] == ["minuit"] * 2
+    assert round(results[0].values["mean"]) == 3
+    assert round(results[1].values["mean"]) == 5
+
+
+def test_chain_bins_falls_back_to_multi_start(gauss_amplitude, bins):
+    settings = {
+        "mean": 4, "limit_mean": [0, 10], "width": 1,
+        "limit_width": [.1, 5], "pedantic": False
+    }
+    results = fit.chain_bins(
+        gauss_amplitude, [bins[0][0]], [bins[0][1]], ["mean", "width"],
+        settings, num_of_calls=5, num_of_processes=2, num_of_starts=3,
+        seed=1
+    )
+
+    assert results[0].optimizer == "minuit multi-start"
+    assert len(results[0].result) == 3
+    assert results[0].calls >= sum(r.calls for r in results[0].result)
+
+
+def test_warm_start_uses_neighbour():
+    neighbour = fit.FitResult(
+        {"a": 1., "b": 2.}, {"a": .1, "b": 0.}, 0., True, 1, 0., "minuit"
+    )
+    start = fit.bins._warm_start({"a": 0, "b": 0, "error_b": .5}, neighbour)
+    assert start == {"a": 1., "b": 2., "error_a": .1, "error_b": .5}
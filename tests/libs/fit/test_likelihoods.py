@@ -0,0 +1,643 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import math
+import pickle
+
+import numpy as npy
+import pandas as pd
+import pytest
+import tables
+
+from PyPWA.libs import binning, fit, process
+from PyPWA.libs.file import project
+from PyPWA.libs.fit import likelihoods
+from .conftest import GaussAmplitude, GaussGradientAmplitude, MONTE_CARLO
+
+
+DATA = pd.DataFrame({"x": npy.random.rand(1000) * 10})
+PARAMETERS = [{"mean": mean, "width": 2.} for mean in npy.linspace(2, 8, 20)]
+
+
+@pytest.fixture(
+    params=[(0, "processes"), (3, "processes"), (3, "threads")],
+    ids=["single", "multi", "threads"]
+)
+def likelihood(request):
+    processes, backend = request.param
+    with fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO,
+            num_of_processes=processes, backend=backend
+    ) as likelihood:
+        yield likelihood
+
+
+def test_batch_matches_individual_calls(likelihood):
+    expected = [likelihood(parameters) for parameters in PARAMETERS]
+    npy.testing.assert_allclose(likelihood.batch(PARAMETERS), expected)
+
+
+def test_shared_parameters_match_pipes():
+    with fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=3,
+            parameter_names=["mean", "width"]
+    ) as shared, fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=3
+    ) as piped:
+        for parameters in PARAMETERS[:3]:
+            npy.testing.assert_allclose(shared(parameters), piped(parameters))
+
+
+def test_shared_gradients_stay_in_the_shared_loop():
+    with fit.LogLikelihood(
+            GaussGradientAmplitude(), DATA, MONTE_CARLO, num_of_processes=3,
+            parameter_names=["mean", "width"]
+    ) as shared, fit.LogLikelihood(
+            GaussGradientAmplitude(), DATA, MONTE_CARLO, num_of_processes=3
+    ) as piped:
+        for parameters in PARAMETERS[:3]:
+            npy.testing.assert_allclose(shared(parameters), piped(parameters))
+            expected = piped.gradient(parameters)
+            gradient = shared.gradient(parameters)
+            assert shared._interface._ProcessInterface__sharing
+            assert gradient.keys() == expected.keys()
+            for name in expected:
+                npy.testing.assert_allclose(gradient[name], expected[name])
+
+
+def test_threads_match_single_process(likelihood):
+    with fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=0
+    ) as single:
+        for parameters in PARAMETERS[:3]:
+            npy.testing.assert_allclose(
+                likelihood(parameters), single(parameters)
+            )
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        fit.LogLikelihood(GaussAmplitude(), DATA, backend="gpu")
+
+
+def test_worker_read_monte_carlo_needs_generated_length():
+    with pytest.raises(ValueError):
+        fit.LogLikelihood(GaussAmplitude(), "data.npy", "monte_carlo.npy")
+
+
+def test_deterministic_sums_match_across_process_counts():
+    values = set()
+    for processes in [0, 1, 3, 7]:
+        with fit.LogLikelihood(
+                GaussAmplitude(), DATA, MONTE_CARLO,
+                num_of_processes=processes, deterministic=True
+        ) as likelihood:
+            values.add(likelihood(PARAMETERS[0]))
+            values.add(likelihood.batch(PARAMETERS[:2])[0])
+    assert len(values) == 1
+
+
+def test_reproducible_sum_matches_fsum_for_any_split():
+    values = npy.log(npy.random.rand(10001)) * 1e3
+    for pieces in [1, 2, 5, 64]:
+        split = npy.array_split(values, pieces)
+        sums = [likelihoods._reproducible_sum(piece) for piece in split]
+        assert math.fsum(sum(sums, [])) == math.fsum(values)
+
+
+@pytest.mark.parametrize("processes", [0, 3])
+@pytest.mark.parametrize("make_likelihood", [
+    lambda amp, n: fit.LogLikelihood(
+        amp, DATA, MONTE_CARLO, num_of_processes=n
+    ),
+    lambda amp, n: fit.LogLikelihood(amp, DATA, num_of_processes=n),
+    lambda amp, n: fit.ChiSquared(
+        amp, DATA, expected_values=DATA["x"] / 10,
+        event_errors=npy.ones(len(DATA)), num_of_processes=n
+    ),
+    lambda amp, n: fit.EmptyLikelihood(amp, DATA, num_of_processes=n)
+], ids=["extended", "log", "chi-squared", "empty"])
+def test_gradient_matches_finite_differences(make_likelihood, processes):
+    step = 1e-6
+    with make_likelihood(GaussGradientAmplitude(), processes) as likelihood:
+        gradient = likelihood.gradient({"mean": 4., "width": 2.})
+        for name in ["mean", "width"]:
+            up, down = {"mean": 4., "width": 2.}, {"mean": 4., "width": 2.}
+            up[name] += step
+            down[name] -= step
+            expected = (likelihood(up) - likelihood(down)) / (2 * step)
+            npy.testing.assert_allclose(gradient[name], expected, rtol=1e-5)
+
+
+def test_gradient_needs_amplitude_support():
+    with fit.LogLikelihood(
+            GaussAmplitude(), DATA, num_of_processes=0
+    ) as likelihood:
+        assert not likelihood.has_gradient
+        with pytest.raises(ValueError):
+            likelihood.gradient({"mean": 4., "width": 2.})
+
+
+def test_minuit_uses_gradient():
+    random = npy.random.RandomState(1)
+    data = pd.DataFrame({"x": random.normal(5, 1.5, 1000)})
+    monte_carlo = pd.DataFrame({"x": random.rand(5000) * 10})
+    with fit.LogLikelihood(
+            GaussGradientAmplitude(), data, monte_carlo, num_of_processes=0
+    ) as with_gradient, fit.LogLikelihood(
+            GaussAmplitude(), data, monte_carlo, num_of_processes=0
+    ) as without_gradient:
+        settings = {"mean": 4., "width": 2., "limit_width": (.1, 20)}
+        analytic = fit.minuit(
+            ["mean", "width"], dict(settings), with_gradient, 1
+        )
+        numeric = fit.minuit(
+            ["mean", "width"], dict(settings), without_gradient, 1
+        )
+
+    assert analytic.valid
+    npy.testing.assert_allclose(
+        analytic.np_values(), numeric.np_values(), rtol=1e-3
+    )
+    assert analytic.ncalls_total < numeric.ncalls_total
+
+
+WAVES = ["s", "p", "d"]
+WAVE_PARAMETERS = {
+    "s_re": 1., "s_im": 0., "p_re": .5, "p_im": -.3, "d_re": .2, "d_im": .4
+}
+
+
+def make_waves(length):
+    values = npy.random.rand(length, 3) + 1j * npy.random.rand(length, 3)
+    return pd.DataFrame(dict(zip(WAVES, values.T)))
+
+
+WAVE_DATA = make_waves(1000)
+WAVE_MONTE_CARLO = make_waves(5000)
+
+
+class SlowWaveAmplitude(fit.NestedFunction):
+
+    def setup(self, data):
+        self.__data = data
+
+    def calculate(self, params):
+        total = sum(
+            complex(params[f"{w}_re"], params[f"{w}_im"]) * self.__data[w]
+            for w in WAVES
+        )
+        return npy.abs(total) ** 2
+
+
+def test_wave_parameters():
+    assert fit.WaveAmplitude(WAVES).parameters == [
+        "s_re", "s_im", "p_re", "p_im", "d_re", "d_im"
+    ]
+
+
+@pytest.mark.parametrize("processes", [0, 3])
+def test_wave_integrals_match_summing_events(processes):
+    with fit.LogLikelihood(
+            fit.WaveAmplitude(WAVES), WAVE_DATA, WAVE_MONTE_CARLO,
+            num_of_processes=processes
+    ) as fast, fit.LogLikelihood(
+            SlowWaveAmplitude(), WAVE_DATA, WAVE_MONTE_CARLO,
+            num_of_processes=processes
+    ) as slow:
+        npy.testing.assert_allclose(
+            fast(WAVE_PARAMETERS), slow(WAVE_PARAMETERS)
+        )
+
+        step = 1e-6
+        gradient = fast.gradient(WAVE_PARAMETERS)
+        for name in WAVE_PARAMETERS:
+            up, down = dict(WAVE_PARAMETERS), dict(WAVE_PARAMETERS)
+            up[name] += step
+            down[name] -= step
+            expected = (slow(up) - slow(down)) / (2 * step)
+            npy.testing.assert_allclose(gradient[name], expected, rtol=1e-5)
+
+
+def test_wave_basis_function():
+    amplitude = fit.WaveAmplitude(
+        WAVES, lambda data: data[WAVES].to_numpy() * 2
+    )
+    amplitude.setup(WAVE_DATA)
+    expected = SlowWaveAmplitude()
+    expected.setup(WAVE_DATA * 2)
+    npy.testing.assert_allclose(
+        amplitude.calculate(WAVE_PARAMETERS),
+        expected.calculate(WAVE_PARAMETERS)
+    )
+
+
+class CountingAmplitude(GaussAmplitude):
+
+    def setup(self, data):
+        super(CountingAmplitude, self).setup(data)
+        self.calls = 0
+
+    def calculate(self, params):
+        self.calls += 1
+        return super(CountingAmplitude, self).calculate(params)
+
+
+def test_cache_skips_repeated_points():
+    amplitude = CountingAmplitude()
+    with fit.LogLikelihood(
+            amplitude, DATA, num_of_processes=0, cache_size=2
+    ) as likelihood:
+        first = likelihood({"mean": 4., "width": 2.})
+        assert likelihood({"width": 2., "mean": 4.}) == first
+        assert amplitude.calls == 1
+
+        likelihood({"mean": 5., "width": 2.})
+        likelihood({"mean": 6., "width": 2.})
+        likelihood({"mean": 4., "width": 2.})
+        assert amplitude.calls == 4
+
+        assert likelihood.cache_stats == {
+            "hits": 1, "misses": 4, "size": 2, "max_size": 2
+        }
+
+        likelihood.clear_cache()
+        assert likelihood.cache_stats["size"] == 0
+
+
+class SizeRecordingAmplitude(GaussAmplitude):
+
+    sizes = []
+
+    def setup(self, data):
+        super(SizeRecordingAmplitude, self).setup(data)
+        self.__size = len(data)
+
+    def calculate(self, params):
+        self.sizes.append(self.__size)
+        return super(SizeRecordingAmplitude, self).calculate(params)
+
+
+def test_monte_carlo_sum_is_reused_while_its_parameters_are_unchanged():
+    SizeRecordingAmplitude.sizes.clear()
+    with fit.LogLikelihood(
+            SizeRecordingAmplitude(), DATA, MONTE_CARLO, num_of_processes=0,
+            monte_carlo_parameters=["mean", "width"]
+    ) as cached, fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=0
+    ) as expected:
+        for parameters in [PARAMETERS[0], PARAMETERS[0], PARAMETERS[1]]:
+            assert cached(parameters) == expected(parameters)
+
+    assert SizeRecordingAmplitude.sizes.count(len(MONTE_CARLO)) == 2
+    assert SizeRecordingAmplitude.sizes.count(len(DATA)) == 3
+
+
+@pytest.mark.parametrize("processes", [0, 3])
+def test_monte_carlo_weights_match_duplicated_events(processes):
+    weights = npy.random.randint(1, 4, len(MONTE_CARLO))
+    duplicated = MONTE_CARLO.loc[MONTE_CARLO.index.repeat(weights)]
+    with fit.LogLikelihood(
+            GaussGradientAmplitude(), DATA, MONTE_CARLO,
+            generated_length=len(duplicated), monte_carlo_weights=weights,
+            num_of_processes=processes
+    ) as weighted, fit.LogLikelihood(
+            GaussGradientAmplitude(), DATA, duplicated,
+            num_of_processes=processes
+    ) as expected:
+        npy.testing.assert_allclose(
+            weighted(PARAMETERS[0]), expected(PARAMETERS[0])
+        )
+        npy.testing.assert_allclose(
+            list(weighted.gradient(PARAMETERS[0]).values()),
+            list(expected.gradient(PARAMETERS[0]).values())
+        )
+
+
+def test_monte_carlo_weights_need_monte_carlo(gauss_amplitude):
+    with pytest.raises(ValueError, match="need the monte carlo"):
+        fit.LogLikelihood(
+            gauss_amplitude, DATA, num_of_processes=0,
+            monte_carlo_weights=npy.ones(len(MONTE_CARLO))
+        )
+
+
+def test_weight_correction_scales_by_effective_weight():
+    weights = npy.full(len(DATA), .5)
+    with fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, quality_factor=weights,
+            num_of_processes=0, weight_correction=True
+    ) as corrected, fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, quality_factor=weights,
+            num_of_processes=0
+    ) as uncorrected:
+        npy.testing.assert_allclose(
+            corrected(PARAMETERS[0]), 2 * uncorrected(PARAMETERS[0])
+        )
+
+    with pytest.raises(ValueError):
+        fit.LogLikelihood(GaussAmplitude(), DATA, weight_correction=True)
+
+
+class DtypeRecordingAmplitude(GaussAmplitude):
+
+    dtypes = set()
+
+    def setup(self, data):
+        super(DtypeRecordingAmplitude, self).setup(data)
+        self.dtypes.update(data.dtypes)
+
+
+@pytest.mark.parametrize("processes", [0, 3])
+def test_single_precision_is_close_to_double(processes):
+    DtypeRecordingAmplitude.dtypes.clear()
+    with fit.LogLikelihood(
+            DtypeRecordingAmplitude(), DATA, MONTE_CARLO,
+            num_of_processes=processes, precision="single"
+    ) as single, fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=processes
+    ) as double:
+        for parameters in PARAMETERS[:3]:
+            npy.testing.assert_allclose(
+                single(parameters), double(parameters), rtol=1e-5
+            )
+
+    if not processes:
+        assert DtypeRecordingAmplitude.dtypes == {npy.dtype("float32")}
+
+
+def test_to_single_converts_doubles():
+    array = npy.zeros(3, [("x", "f8"), ("n", "i8")])
+    assert likelihoods._to_single(array).dtype == npy.dtype(
+        [("x", "f4"), ("n", "i8")]
+    )
+    assert likelihoods._to_single(npy.zeros(3, complex)).dtype == "c8"
+    assert likelihoods._to_single(DATA)["x"].dtype == "f4"
+
+    with pytest.raises(ValueError):
+        fit.EmptyLikelihood(GaussAmplitude(), DATA, precision="half")
+
+
+@pytest.mark.parametrize("processes", [0, 3])
+@pytest.mark.parametrize("make_likelihood", [
+    lambda amp, n, **kw: fit.LogLikelihood(
+        amp, DATA, MONTE_CARLO, num_of_processes=n,
+        monte_carlo_weights=npy.random.rand(len(MONTE_CARLO)), **kw
+    ),
+    lambda amp, n, **kw: fit.LogLikelihood(
+        amp, DATA, binned=npy.random.rand(len(DATA)),
+        quality_factor=npy.random.rand(len(DATA)), num_of_processes=n, **kw
+    ),
+    lambda amp, n, **kw: fit.EmptyLikelihood(
+        amp, DATA, num_of_processes=n, **kw
+    )
+], ids=["extended", "log", "empty"])
+def test_chunks_match_whole_partitions(make_likelihood, processes):
+    npy.random.seed(2)
+    with make_likelihood(GaussGradientAmplitude(), processes) as whole:
+        expected = whole(PARAMETERS[0])
+        expected_gradient = whole.gradient(PARAMETERS[0])
+
+    npy.random.seed(2)
+    with make_likelihood(
+            GaussGradientAmplitude(), processes, chunk_size=128
+    ) as chunked:
+        npy.testing.assert_allclose(chunked(PARAMETERS[0]), expected)
+        gradient = chunked.gradient(PARAMETERS[0])
+        for name in expected_gradient:
+            npy.testing.assert_allclose(
+                gradient[name], expected_gradient[name]
+            )
+
+
+def test_chunks_limit_what_the_amplitude_sees():
+    SizeRecordingAmplitude.sizes.clear()
+    with fit.LogLikelihood(
+            SizeRecordingAmplitude(), DATA, MONTE_CARLO, num_of_processes=0,
+            chunk_size=300, deterministic=True
+    ) as chunked, fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=0,
+            deterministic=True
+    ) as whole:
+        assert chunked(PARAMETERS[0]) == whole(PARAMETERS[0])
+    assert max(SizeRecordingAmplitude.sizes) == 300
+    assert len(SizeRecordingAmplitude.sizes) == 4 + 17
+
+
+@pytest.fixture
+def folders(tmp_path):
+    database = project.ProjectDatabase(tmp_path / "fit.hd5", "w")
+    data = database.make_folder("data", DATA, "data.csv")
+    monte_carlo = database.make_folder("mc", MONTE_CARLO, "mc.csv")
+    yield data, monte_carlo
+    database.close()
+
+
+@pytest.mark.parametrize("processes", [0, 3])
+@pytest.mark.parametrize("stream_cache", [0, 2 ** 30])
+def test_folders_match_in_memory(folders, processes, stream_cache):
+    data, monte_carlo = folders
+    with fit.LogLikelihood(
+            GaussGradientAmplitude(), data, monte_carlo,
+            num_of_processes=processes, chunk_size=700,
+            stream_cache=stream_cache
+    ) as streamed, fit.LogLikelihood(
+            GaussGradientAmplitude(), DATA, MONTE_CARLO, num_of_processes=0
+    ) as in_memory:
+        for parameters in PARAMETERS[:3]:
+            npy.testing.assert_allclose(
+                streamed(parameters), in_memory(parameters)
+            )
+        gradient = streamed.gradient(PARAMETERS[0])
+        for name, value in in_memory.gradient(PARAMETERS[0]).items():
+            npy.testing.assert_allclose(gradient[name], value)
+
+
+def test_streamed_folders_close_their_files(tmp_path):
+    path = tmp_path / "fit.hd5"
+    database = project.ProjectDatabase(path, "w")
+    data = database.make_folder("data", DATA, "data.csv")
+    rows = data.rows()
+    with fit.LogLikelihood(
+            GaussAmplitude(), rows.split(0, len(rows)), num_of_processes=0,
+            chunk_size=700, stream_cache=0
+    ) as likelihood:
+        for parameters in PARAMETERS:
+            likelihood(parameters)
+        assert len(tables.file._open_files.get_handlers_by_name(
+            str(path)
+        )) == 2
+    database.close()
+    assert not tables.file._open_files.get_handlers_by_name(str(path))
+
+
+@pytest.mark.parametrize("sharing", ["shared memory", "pool"])
+def test_folders_with_shared_data(folders, sharing):
+    data, monte_carlo = folders
+    with process.WorkerPool(2) as pool:
+        with fit.LogLikelihood(
+                GaussAmplitude(), data, monte_carlo, num_of_processes=2,
+                use_shared_memory=sharing == "shared memory",
+                pool=pool if sharing == "pool" else None
+        ) as streamed, fit.LogLikelihood(
+                GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=0
+        ) as in_memory:
+            for parameters in PARAMETERS[:3]:
+                npy.testing.assert_allclose(
+                    streamed(parameters), in_memory(parameters)
+                )
+
+
+def test_folder_rows_split_and_pickle(folders):
+    data, _ = folders
+    rows = data.rows(100)
+    assert len(rows) == len(DATA) - 100
+    assert rows.split(0, 10)._RowRange__root is None
+
+    sent = pickle.loads(pickle.dumps(rows.split(50, 60)))
+    assert (sent.start, sent.stop) == (150, 160)
+    read = npy.concatenate(list(sent.iterate_data(4)))
+    sent.close()
+    npy.testing.assert_array_equal(read["x"], DATA["x"][150:160])
+
+
+def gauss(values, parameters):
+    return npy.exp(
+        -((values - parameters["mean"]) ** 2) / parameters["width"] ** 2
+    )
+
+
+@pytest.mark.parametrize("processes", [0, 3])
+def test_histogram_matches_summing_bins(processes):
+    centers, counts, edges = binning.make_histogram(DATA, {"x": 20})
+    mc_centers, mc_counts, _ = binning.make_histogram(
+        MONTE_CARLO, {"x": edges[0]}
+    )
+    with fit.LogLikelihood(
+            GaussAmplitude(), DATA, num_of_processes=processes,
+            histogram={"x": edges[0]}
+    ) as standard, fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=processes,
+            histogram={"x": edges[0]}
+    ) as extended:
+        for parameters in PARAMETERS[:3]:
+            data_sum = npy.sum(counts * npy.log(
+                gauss(centers["x"], parameters)
+            ))
+            mc_sum = npy.sum(mc_counts * gauss(mc_centers["x"], parameters))
+            npy.testing.assert_allclose(standard(parameters), -data_sum)
+            npy.testing.assert_allclose(
+                extended(parameters), -(data_sum - mc_sum / len(MONTE_CARLO))
+            )
+
+
+def test_histogram_is_close_to_events():
+    with fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=0,
+            histogram={"x": 1000}
+    ) as histogram, fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=0
+    ) as events:
+        npy.testing.assert_allclose(
+            histogram(PARAMETERS[0]), events(PARAMETERS[0]), rtol=1e-3
+        )
+
+
+def test_chi_squared_histogram_uses_counts():
+    centers, counts, _ = binning.make_histogram(DATA, {"x": 10})
+    filled = counts != 0
+    with fit.ChiSquared(
+            GaussAmplitude(), DATA, num_of_processes=0, histogram={"x": 10}
+    ) as histogram, fit.ChiSquared(
+            GaussAmplitude(), centers[filled], counts[filled],
+            num_of_processes=0
+    ) as binned:
+        expected = npy.sum(
+            (gauss(centers["x"][filled], PARAMETERS[0]) - counts[filled]) ** 2
+            / counts[filled]
+        )
+        npy.testing.assert_allclose(histogram(PARAMETERS[0]), expected)
+        npy.testing.assert_allclose(binned(PARAMETERS[0]), expected)
+
+
+def test_histogram_rejects_binned_values():
+    with pytest.raises(ValueError):
+        fit.LogLikelihood(
+            GaussAmplitude(), DATA, binned=npy.ones(len(DATA)),
+            histogram={"x": 10}
+        )
+
+
+class ArrayGaussAmplitude(fit.NestedFunction):
+
+    USE_ARRAYS = True
+
+    def setup(self, data):
+        self.__x = data["x"].to_numpy()
+        self.__mean = self.parameter_index["mean"]
+        self.__width = self.parameter_index["width"]
+
+    def calculate(self, params):
+        assert isinstance(params, npy.ndarray)
+        return npy.exp(
+            -((self.__x - params[self.__mean]) ** 2)
+            / params[self.__width] ** 2
+        )
+
+
+@pytest.mark.parametrize("processes", [0, 3])
+@pytest.mark.parametrize("deterministic", [False, True])
+def test_array_parameters_match_dictionaries(processes, deterministic):
+    with fit.LogLikelihood(
+            ArrayGaussAmplitude(), DATA, MONTE_CARLO,
+            num_of_processes=processes, deterministic=deterministic,
+            parameter_names=["width", "mean"],
+            monte_carlo_parameters=["mean", "width"]
+    ) as arrays, fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=0
+    ) as dictionaries:
+        for parameters in PARAMETERS[:3]:
+            vector = npy.array([parameters["width"], parameters["mean"]])
+            npy.testing.assert_allclose(
+                arrays(vector), dictionaries(parameters)
+            )
+            npy.testing.assert_allclose(
+                arrays(parameters), dictionaries(parameters)
+            )
+        npy.testing.assert_allclose(
+            arrays.batch(PARAMETERS[:3]), dictionaries.batch(PARAMETERS[:3])
+        )
+
+
+def test_array_parameters_need_names():
+    with pytest.raises(ValueError):
+        fit.LogLikelihood(ArrayGaussAmplitude(), DATA)
+
+
+def test_minuit_passes_arrays():
+    settings = {"mean": 4., "width": 2., "limit_width": (.1, 20)}
+    with fit.LogLikelihood(
+            ArrayGaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=0,
+            parameter_names=["width", "mean"]
+    ) as arrays, fit.LogLikelihood(
+            GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=0
+    ) as dictionaries:
+        npy.testing.assert_allclose(
+            fit.minuit(["mean", "width"], dict(settings), arrays, 1).fval,
+            fit.minuit(["mean", "width"], dict(settings), dictionaries, 1).fval
+        )
@@ -0,0 +1,112 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import os
+
+import numpy as npy
+import pandas as pd
+import pytest
+
+from PyPWA.libs import fit, process
+from PyPWA.libs.fit.minuit import _make_starts
+from .conftest import GaussAmplitude, GaussGradientAmplitude, MONTE_CARLO
+
+
+DATA = pd.DataFrame({"x": npy.random.rand(1000) * 10})
+
+
+@pytest.mark.parametrize("processes", [0, 2])
+@pytest.mark.parametrize("sampling", ["uniform", "latin"])
+def test_multi_start_ranks_fits(processes, sampling):
+    random = npy.random.RandomState(1)
+    data = pd.DataFrame({"x": random.normal(5, 1.5, 1000)})
+    settings = {"mean": 4., "width": 2., "limit_mean": (0, 10),
+                "limit_width": (.5, 5)}
+    with fit.LogLikelihood(
+            GaussGradientAmplitude(), data, MONTE_CARLO, num_of_processes=0
+    ) as likelihood:
+        results = fit.multi_start(
+            ["mean", "width"], settings, likelihood, 1, 6, sampling, seed=2,
+            num_of_processes=processes
+        )
+        best = fit.minuit(["mean", "width"], dict(settings), likelihood, 1)
+
+    assert len(results) == 6
+    assert [r.fval for r in results] == sorted(r.fval for r in results)
+    assert len({r.start["mean"] for r in results}) == 6
+    assert all(0 <= r.start["mean"] <= 10 for r in results)
+    assert results[0].valid and results[0].calls > 0
+    npy.testing.assert_allclose(results[0].fval, best.fval, rtol=1e-6)
+
+
+def test_latin_starts_cover_every_slice():
+    starts = _make_starts(
+        ["a", "b"], {"limit_a": (0, 1), "limit_b": (-1, 1), "b": 0}, 10,
+        "latin", npy.random.RandomState(0)
+    )
+    slices = sorted(int(start["a"] * 10) for start in starts)
+    assert slices == list(range(10))
+
+
+def test_multi_start_needs_limits():
+    with pytest.raises(ValueError):
+        fit.multi_start(["mean"], {"mean": 1}, lambda p: 0, 1)
+
+
+START_SETTINGS = {
+    "mean": 4., "width": 2., "limit_mean": (0, 10), "limit_width": (.5, 5)
+}
+
+
+@pytest.mark.parametrize("backend", ["processes", "threads", "pool"])
+def test_multi_start_rejects_likelihoods_with_processes(backend):
+    with process.WorkerPool(2) as pool:
+        options = {"pool": pool} if backend == "pool" else \
+            {"backend": backend}
+        with fit.LogLikelihood(
+                GaussAmplitude(), DATA, MONTE_CARLO, num_of_processes=2,
+                **options
+        ) as likelihood:
+            with pytest.raises(ValueError, match="without processes"):
+                fit.multi_start(
+                    ["mean", "width"], START_SETTINGS, likelihood, 1, 2
+                )
+
+
+class ExitingAmplitude(GaussAmplitude):
+    """Exits in any process other than the one that created it"""
+
+    def __init__(self):
+        super().__init__()
+        self.__parent = os.getpid()
+
+    def calculate(self, params):
+        if os.getpid() != self.__parent:
+            os._exit(3)
+        return super().calculate(params)
+
+
+def test_multi_start_names_the_start_of_a_dead_process():
+    with fit.LogLikelihood(
+            ExitingAmplitude(), DATA, MONTE_CARLO, num_of_processes=0
+    ) as likelihood:
+        with pytest.raises(RuntimeError, match="start 0.*exit code 3"):
+            fit.multi_start(
+                ["mean", "width"], START_SETTINGS, likelihood, 1, 2,
+                num_of_processes=1
+            )
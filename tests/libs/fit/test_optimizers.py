@@ -0,0 +1,149 @@
+#  coding=utf-8
+#
+#  PyPWA, a scientific analysis toolkit.
+#  Copyright (C) 2016 JLab
+#
+#  This program is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  This program is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with this program.  If not, see <http://www.gnu.org/licenses/>.
+
+import numpy as npy
+import pandas as pd
+import pytest
+
+from PyPWA.libs import fit
+from .conftest import GaussGradientAmplitude
+
+
+DATA = pd.DataFrame(
+    {"x": npy.random.RandomState(1).normal(5, 1.5, 1000)}
+)
+PARAMETERS = ["mean", "width", "scale"]
+SETTINGS = {
+    "mean": 4., "width": 2., "scale": 1000., "limit_width": (.1, 20),
+    "limit_scale": (1, 10000)
+}
+UNLIMITED = {"mean": 4., "width": 2., "scale": 1000.}
+
+
+@pytest.fixture(scope="module")
+def likelihood(monte_carlo):
+    with fit.LogLikelihood(
+            GaussGradientAmplitude(), DATA, monte_carlo, num_of_processes=0
+    ) as likelihood:
+        yield likelihood
+
+
+@pytest.mark.parametrize("optimizer, settings", [
+    ("scipy", SETTINGS), ("nelder-mead", SETTINGS),
+    (fit.ScipyOptimizer("Powell"), SETTINGS),
+    (fit.ScipyOptimizer("Nelder-Mead"), SETTINGS),
+    (fit.ScipyOptimizer("BFGS"), UNLIMITED)
+])
+def test_optimizers_match_minuit(likelihood, optimizer, settings):
+    expected = fit.optimize(PARAMETERS, settings, likelihood, 1)
+    result = fit.optimize(
+        PARAMETERS, settings, likelihood, 1, optimizer
+    )
+
+    assert expected.valid and result.valid
+    assert result.calls > 0 and result.time > 0
+    npy.testing.assert_allclose(result.fval, expected.fval, atol=1e-4)
+    for name in PARAMETERS:
+        npy.testing.assert_allclose(
+            result.values[name], expected.values[name], rtol=1e-3
+        )
+        npy.testing.assert_allclose(
+            result.errors[name], expected.errors[name], rtol=.1
+        )
+
+
+def test_limits_are_rejected_by_unbounded_methods(likelihood):
+    with pytest.raises(ValueError, match="doesn't support limits"):
+        fit.optimize(
+            PARAMETERS, SETTINGS, likelihood, 1, fit.ScipyOptimizer("BFGS")
+        )
+
+
+def test_calls_count_the_gradient(likelihood):
+    result = fit.optimize(
+        PARAMETERS, UNLIMITED, likelihood, 1, fit.ScipyOptimizer("BFGS")
+    )
+    assert result.result.njev > 0
+    assert result.calls == result.result.nfev + result.result.njev
+
+    expected = fit.optimize(PARAMETERS, UNLIMITED, likelihood, 1)
+    assert expected.result.ngrads_total > 0
+    assert expected.calls == (
+        expected.result.ncalls_total + expected.result.ngrads_total
+    )
+
+
+def test_fixed_parameters_are_kept(likelihood):
+    settings = dict(SETTINGS, fix_width=True)
+    for optimizer in ["minuit", "scipy", "nelder-mead"]:
+        result = fit.optimize(
+            PARAMETERS, settings, likelihood, 1, optimizer
+        )
+        assert result.values["width"] == 2.
+        assert result.errors["width"] == 0.
+
+
+def test_unknown_optimizer_is_rejected(likelihood):
+    with pytest.raises(ValueError):
+        fit.optimize(PARAMETERS, SETTINGS, likelihood, 1, "simplex")
+
+
+class PartialGradientAmplitude(GaussGradientAmplitude):
+    """Only has derivatives for the mean and width, not the scale"""
+
+    calls = 0
+
+    def gradient(self, params):
+        PartialGradientAmplitude.calls += 1
+        gradient = super(PartialGradientAmplitude, self).gradient(params)
+        del gradient["scale"]
+        return gradient
+
+
+@pytest.mark.parametrize("optimizer", ["minuit", "scipy"])
+def test_partial_gradients_fall_back_to_finite_differences(
+        likelihood, monte_carlo, optimizer
+):
+    expected = fit.optimize(PARAMETERS, SETTINGS, likelihood, 1, optimizer)
+    PartialGradientAmplitude.calls = 0
+    with fit.LogLikelihood(
+            PartialGradientAmplitude(), DATA, monte_carlo,
+            num_of_processes=0
+    ) as partial:
+        result = fit.optimize(PARAMETERS, SETTINGS, partial, 1, optimizer)
+
+    assert result.valid
+    npy.testing.assert_allclose(
+        result.values["scale"], expected.values["scale"], rtol=1e-3
+    )
+
+    # The scale has no derivative, so the gradient is only checked once,
+    # which runs the amplitude's gradient on the data and monte carlo
+    assert PartialGradientAmplitude.calls == 2
+
+
+def test_partial_gradients_are_used_when_the_rest_are_fixed(monte_carlo):
+    settings = dict(UNLIMITED, fix_scale=True)
+    with fit.LogLikelihood(
+            PartialGradientAmplitude(), DATA, monte_carlo,
+            num_of_processes=0
+    ) as partial:
+        result = fit.optimize(PARAMETERS, settings, partial, 1)
+
+    assert result.valid and result.result.ngrads_total > 0
+    assert result.values["scale"] == 1000.
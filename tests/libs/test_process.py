@@ -16,7 +16,14 @@
 #  You should have received a copy of the GNU General Public License
 #  along with this program.  If not, see <http://www.gnu.org/licenses/>.
 
+import multiprocessing
+import os
+import socket
+import time
+
+import numexpr as ne
 import numpy as npy
+import pandas as pd
 import pytest
 
 from PyPWA.libs import process
@@ -116,6 +123,431 @@ def test_duplex_reports_is_alive(duplex_interface):
     assert duplex_interface.is_alive
 
 
+def test_duplex_runs_batches(duplex_interface):
+    values = duplex_interface.run_batch(["go"] * 3)
+    npy.testing.assert_allclose(values, [npy.sum(TEST_DATA['data'])] * 3)
+
+
+"""
+Test Threads
+"""
+
+
+def test_threads_run_duplex_kernels():
+    interface = process.make_threads(
+        TEST_DATA, DuplexKernel(), DuplexInterface(), 3
+    )
+    try:
+        assert interface.is_alive
+        npy.testing.assert_approx_equal(
+            interface.run("go"), npy.sum(TEST_DATA['data'])
+        )
+    finally:
+        interface.close()
+    assert not interface.is_alive
+
+
+def test_threads_run_simplex_kernels():
+    interface = process.make_threads(
+        TEST_DATA, SimplexKernel(), SimplexInterface(), 3, False
+    )
+    try:
+        npy.testing.assert_approx_equal(
+            interface.run(), npy.sum(TEST_DATA['data'])
+        )
+    finally:
+        interface.close()
+
+
+"""
+Test Shared Memory
+"""
+
+
+class SharedKernel(process.Kernel):
+
+    def __init__(self):
+        self.data = None
+        self.frame = None
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return npy.sum(self.data) + self.frame["x"].sum()
+
+
+@pytest.fixture
+def shared_interface(request):
+    data = {
+        "data": TEST_DATA["data"],
+        "frame": pd.DataFrame({"x": npy.arange(100.), "y": npy.zeros(100)})
+    }
+    interface = process.make_processes(
+        data, SharedKernel(), DuplexInterface(), 3, use_shared_memory=True
+    )
+    yield interface
+    interface.close()
+
+
+def test_shared_memory_matches_expected(shared_interface):
+    expected = npy.sum(TEST_DATA["data"]) + npy.sum(npy.arange(100.))
+    npy.testing.assert_approx_equal(shared_interface.run("go"), expected)
+
+
+def test_shared_partitions_match_array_split():
+    data = {"data": TEST_DATA["data"], "other": npy.zeros(10)}
+    shared = process.SharedData(data)
+    try:
+        packets = shared.partition(3)
+        for key in data.keys():
+            lengths = [packet[key].length for packet in packets]
+            expected = [len(s) for s in npy.array_split(data[key], 3)]
+            assert lengths == expected
+    finally:
+        shared.close()
+
+
+def test_shared_frames_view_the_shared_memory():
+    frame = pd.DataFrame({"x": npy.arange(100.), "y": npy.arange(100)})
+    shared = process.SharedData({"frame": frame})
+    try:
+        partition, handles = shared.partition(2)[1]["frame"].attach()
+        whole, whole_handles = shared.partition(1)[0]["frame"].attach()
+        assert list(partition.columns) == ["x", "y"]
+
+        # Writes to the partition show up in every view of the block
+        partition["x"].to_numpy()[0] = -1.
+        partition["y"].to_numpy()[1] = -1
+        assert whole["x"][50] == -1. and whole["y"][51] == -1
+        assert whole["x"][49] == 49. and whole["y"][52] == 52
+        partition = whole = None
+        for handle in handles + whole_handles:
+            handle.close()
+    finally:
+        shared.close()
+
+
+"""
+Test Load Balancing
+"""
+
+
+@pytest.mark.parametrize("use_shared_memory", [True, False])
+def test_repartition_keeps_every_event(use_shared_memory):
+    interface = process.make_processes(
+        TEST_DATA, DuplexKernel(), DuplexInterface(), 3,
+        use_shared_memory=use_shared_memory, timed=True
+    )
+    try:
+        interface.repartition(npy.array([.6, .3, .1]))
+        npy.testing.assert_approx_equal(
+            interface.run("go"), npy.sum(TEST_DATA["data"])
+        )
+        assert interface.durations.shape == (3,)
+    finally:
+        interface.close()
+
+
+def test_processes_are_only_timed_when_asked():
+    interface = process.make_processes(
+        TEST_DATA, DuplexKernel(), DuplexInterface(), 2
+    )
+    try:
+        interface.run("go")
+        assert interface.durations is None
+    finally:
+        interface.close()
+
+
+@pytest.mark.parametrize("kind", [pd.Series, pd.DataFrame])
+def test_frames_with_an_index_are_split_by_position(kind):
+    values = npy.arange(10.)
+    frame = kind(values, index=values / 10 + 5)
+    packets = process._make_data_packets({"frame": frame}, 3)
+
+    assert [len(packet["frame"]) for packet in packets] == [4, 3, 3]
+    npy.testing.assert_array_equal(
+        npy.concatenate([packet["frame"].values for packet in packets]),
+        frame.values
+    )
+
+
+class FakeInterface:
+
+    def __init__(self, durations):
+        self.durations = npy.array(durations)
+        self.shares = None
+
+    def repartition(self, shares):
+        self.shares = shares
+
+
+def test_balancer_moves_events_away_from_slow_process():
+    balancer = process.LoadBalancer(warmup=2)
+    interface = FakeInterface([1, 1, 4])
+    for call in range(2):
+        balancer.update(interface)
+
+    npy.testing.assert_approx_equal(npy.sum(interface.shares), 1)
+    assert interface.shares[2] < interface.shares[0]
+    assert balancer.stats["history"] == [2]
+
+
+def test_balancer_only_records_without_rebalances():
+    balancer = process.LoadBalancer(warmup=1, rebalances=0)
+    interface = FakeInterface([1, 3])
+    balancer.update(interface)
+
+    assert interface.shares is None
+    npy.testing.assert_approx_equal(balancer.imbalance, 1.5)
+
+
+"""
+Test Shared Parameters
+"""
+
+
+class ParameterKernel(process.Kernel):
+
+    def __init__(self):
+        self.data = None
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        if data["fail"]:
+            raise RuntimeError("Testing Errors with shared parameters")
+        return npy.sum(self.data) * data["scale"]
+
+
+class ParameterInterface(process.Interface):
+
+    def run(self, connections, parameters):
+        for connection in connections:
+            connection.send(parameters)
+        return sum(connection.recv() for connection in connections)
+
+
+def test_shared_parameters_match_pipes():
+    interface = process.make_processes(
+        TEST_DATA, ParameterKernel(), ParameterInterface(), 3
+    )
+    try:
+        interface.share_parameters(["scale", "fail"])
+        shared = npy.sum(interface.run_shared([2., 0.]))
+        piped = interface.run({"scale": 2., "fail": 0})
+        npy.testing.assert_approx_equal(shared, piped)
+        npy.testing.assert_approx_equal(
+            npy.sum(interface.run_shared([3., 0.])), shared * 1.5
+        )
+    finally:
+        interface.close()
+
+
+def test_shared_parameters_raise_process_errors():
+    interface = process.make_processes(
+        TEST_DATA, ParameterKernel(), ParameterInterface(), 3
+    )
+    interface.share_parameters(["scale", "fail"])
+    with pytest.raises(RuntimeError):
+        interface.run_shared([1., 1.])
+
+
+"""
+Test Health Monitoring
+"""
+
+
+class DyingKernel(process.Kernel):
+    """Dies the first time it is called in the first process"""
+
+    def __init__(self, flag, action="exit"):
+        self.data: npy.ndarray = None
+        self.__flag = flag
+        self.__action = action
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        if self.PROCESS_ID == 0 and not os.path.exists(self.__flag):
+            open(self.__flag, "w").close()
+            if self.__action == "exit":
+                os._exit(1)
+            time.sleep(60)
+        return npy.sum(self.data)
+
+
+def test_dead_process_raises_named_error(tmp_path):
+    interface = process.make_processes(
+        TEST_DATA, DyingKernel(str(tmp_path / "flag")), DuplexInterface(), 3
+    )
+    with pytest.raises(RuntimeError, match="Process 0 .* exit code 1"):
+        interface.run("go")
+
+
+def test_hung_process_times_out(tmp_path):
+    interface = process.make_processes(
+        TEST_DATA, DyingKernel(str(tmp_path / "flag"), "hang"),
+        DuplexInterface(), 3, timeout=1
+    )
+    with pytest.raises(RuntimeError, match="stopped responding"):
+        interface.run("go")
+
+
+@pytest.mark.parametrize("action", ["exit", "hang"])
+def test_dead_process_is_respawned(tmp_path, action):
+    interface = process.make_processes(
+        TEST_DATA, DyingKernel(str(tmp_path / "flag"), action),
+        DuplexInterface(), 3, timeout=1, respawn=True
+    )
+    try:
+        npy.testing.assert_approx_equal(
+            interface.run("go"), npy.sum(TEST_DATA["data"])
+        )
+        assert interface.is_alive
+    finally:
+        interface.close()
+
+
+def test_dead_process_is_respawned_with_shared_parameters(tmp_path):
+    interface = process.make_processes(
+        TEST_DATA, DyingKernel(str(tmp_path / "flag")), DuplexInterface(),
+        3, respawn=True
+    )
+    try:
+        interface.share_parameters(["x"])
+        npy.testing.assert_approx_equal(
+            interface.run_shared([1.]).sum(), npy.sum(TEST_DATA["data"])
+        )
+    finally:
+        interface.close()
+
+
+"""
+Test Placement
+"""
+
+
+class PlacementKernel(process.Kernel):
+
+    def __init__(self):
+        self.data: npy.ndarray = None
+
+    def setup(self):
+        pass
+
+    def process(self, data=False):
+        return (
+            os.sched_getaffinity(0), ne.get_num_threads(),
+            self.data.flags.owndata
+        )
+
+
+class PlacementInterface(process.Interface):
+
+    def run(self, connections, *args):
+        for connection in connections:
+            connection.send("go")
+        return [connection.recv() for connection in connections]
+
+
+def test_cpu_lists_are_parsed():
+    assert process._parse_cpu_list("0-3,8,10-11\n") == [0, 1, 2, 3, 8, 10, 11]
+
+
+def test_placements_alternate_over_cores():
+    cores = process._cores_by_node()
+    placements = process._make_placements(
+        len(cores) + 1, ["data"], True, None
+    )
+    assert [p.cpus for p in placements[:-1]] == [[core] for core in cores]
+    assert placements[-1].cpus == [cores[0]]
+    assert all(p.threads == 1 for p in placements)
+
+
+def test_placements_must_match_processes():
+    with pytest.raises(ValueError):
+        process._make_placements(2, ["data"], [[0]], None)
+
+
+@pytest.mark.skipif(
+    not hasattr(os, "sched_setaffinity"), reason="Requires Linux"
+)
+@pytest.mark.parametrize("use_shared_memory", [True, False])
+def test_pinned_processes_localize_data(use_shared_memory):
+    core = min(os.sched_getaffinity(0))
+    interface = process.make_processes(
+        TEST_DATA, PlacementKernel(), PlacementInterface(), 2,
+        use_shared_memory=use_shared_memory, affinity=[[core], [core]]
+    )
+    try:
+        for cpus, threads, owns_data in interface.run():
+            assert cpus == {core}
+            assert threads == 1
+            assert owns_data
+    finally:
+        interface.close()
+
+
+"""
+Test Worker Pool
+"""
+
+
+@pytest.fixture(scope="module")
+def worker_pool():
+    with process.WorkerPool(3) as pool:
+        yield pool
+
+
+def test_pool_reuses_processes(worker_pool):
+    for offset in range(3):
+        data = {"data": TEST_DATA["data"] + offset}
+        interface = worker_pool.load(data, DuplexKernel(), DuplexInterface())
+        npy.testing.assert_approx_equal(
+            interface.run("go"), npy.sum(data["data"])
+        )
+        interface.close()
+        assert worker_pool.idle == 3
+
+
+def test_pool_runs_simplex(worker_pool):
+    interface = worker_pool.load(
+        TEST_DATA, SimplexKernel(), SimplexInterface(), 2, False
+    )
+    npy.testing.assert_approx_equal(
+        interface.run(), npy.sum(TEST_DATA["data"])
+    )
+    interface.close()
+
+
+def test_pool_survives_kernel_errors(worker_pool):
+    interface = worker_pool.load(
+        TEST_DATA, KernelError(), InterfaceError(True)
+    )
+    assert process.ProcessCodes.ERROR in interface.run()
+    interface.close()
+    test_pool_reuses_processes(worker_pool)
+
+
+def test_pool_names_dead_process_and_replaces_it(worker_pool, tmp_path):
+    interface = worker_pool.load(
+        TEST_DATA, DyingKernel(str(tmp_path / "flag")), DuplexInterface()
+    )
+    with pytest.raises(RuntimeError, match="Process 0 .* exit code 1"):
+        interface.run("go")
+    assert worker_pool.idle == 3
+    test_pool_reuses_processes(worker_pool)
+
+
+def test_pool_rejects_too_many_processes(worker_pool):
+    with pytest.raises(RuntimeError):
+        worker_pool.load(TEST_DATA, DuplexKernel(), DuplexInterface(), 4)
+
+
 """
 Test Errors
 """
@@ -163,3 +595,164 @@ def test_process_error_handling(get_duplex_state):
     values = interface.run()
     assert process.ProcessCodes.ERROR in values
     interface.close()
+
+
+def test_thread_error_handling(get_duplex_state):
+    interface = process.make_threads(
+        TEST_DATA, KernelError(), get_duplex_state[0], 3, get_duplex_state[1]
+    )
+    values = interface.run()
+    assert process.ProcessCodes.ERROR in values
+    interface.close()
+
+
+"""
+Test Cluster
+"""
+
+
+AUTHKEY = b"testing"
+
+
+def free_address():
+    with socket.socket() as probe:
+        probe.bind(("localhost", 0))
+        return "localhost", probe.getsockname()[1]
+
+
+def start_worker(address, connections=1):
+    worker = multiprocessing.Process(
+        target=process.run_worker, args=(address, AUTHKEY, connections),
+        daemon=True
+    )
+    worker.start()
+    return worker
+
+
+def stop_worker(worker):
+    worker.join(5)
+    if worker.is_alive():
+        worker.terminate()
+
+
+@pytest.fixture
+def cluster():
+    addresses = [free_address() for index in range(2)]
+    workers = [start_worker(address) for address in addresses]
+
+    yield process.Cluster(addresses, AUTHKEY, wait=5)
+
+    for worker in workers:
+        stop_worker(worker)
+
+
+def test_cluster_reads_shards_from_files(cluster, tmp_path):
+    npy.save(tmp_path / "data.npy", TEST_DATA["data"])
+    interface = cluster.load(
+        {"data": str(tmp_path / "data.npy")}, DuplexKernel(),
+        DuplexInterface()
+    )
+    try:
+        npy.testing.assert_approx_equal(
+            interface.run("go"), npy.sum(TEST_DATA["data"])
+        )
+    finally:
+        interface.close()
+
+
+def test_file_shard_reads_only_its_rows(tmp_path, monkeypatch):
+    npy.save(tmp_path / "data.npy", TEST_DATA["data"])
+
+    def read_everything(*args, **kwargs):
+        raise AssertionError("The whole file was read!")
+
+    monkeypatch.setattr(process.file, "read", read_everything)
+    shard = process._FileShard(tmp_path / "data.npy", 1, 2).load()
+    assert not isinstance(shard, npy.memmap)
+    npy.testing.assert_array_equal(shard, TEST_DATA["data"][50:])
+
+
+def test_file_shard_rejects_files_that_cant_be_split(tmp_path):
+    with pytest.raises(ValueError, match="only numpy files"):
+        process._FileShard(tmp_path / "data.csv", 0, 2)
+
+
+def test_cluster_reads_a_file_per_worker(cluster, tmp_path):
+    paths = []
+    for index, shard in enumerate(npy.array_split(TEST_DATA["data"], 2)):
+        paths.append(tmp_path / f"data_{index}.npy")
+        npy.save(paths[-1], shard)
+
+    interface = cluster.load(
+        {"data": paths}, DuplexKernel(), DuplexInterface()
+    )
+    try:
+        npy.testing.assert_approx_equal(
+            interface.run("go"), npy.sum(TEST_DATA["data"])
+        )
+    finally:
+        interface.close()
+
+
+def test_cluster_names_unreachable_workers(cluster):
+    interface = cluster.load(TEST_DATA, KernelError(), InterfaceError(True))
+    assert process.ProcessCodes.ERROR in interface.run()
+    interface.close()
+
+    with pytest.raises(RuntimeError, match="localhost"):
+        cluster.load(TEST_DATA, DuplexKernel(), DuplexInterface())
+
+
+def test_cluster_gives_up_on_busy_workers():
+    address = free_address()
+    worker = start_worker(address, 2)
+    try:
+        first = process.Cluster([address], AUTHKEY, wait=5).load(
+            TEST_DATA, DuplexKernel(), DuplexInterface()
+        )
+        with pytest.raises(RuntimeError, match="another Cluster"):
+            process.Cluster([address], AUTHKEY, wait=.5).load(
+                TEST_DATA, DuplexKernel(), DuplexInterface()
+            )
+        first.close()
+
+        # The worker moves past the abandoned connection to the next one
+        second = process.Cluster([address], AUTHKEY, wait=5).load(
+            TEST_DATA, DuplexKernel(), DuplexInterface()
+        )
+        npy.testing.assert_approx_equal(
+            second.run("go"), npy.sum(TEST_DATA["data"])
+        )
+        second.close()
+    finally:
+        stop_worker(worker)
+    assert worker.exitcode == 0
+
+
+def test_cluster_disconnects_when_a_worker_cant_be_reached(monkeypatch):
+    opened = []
+
+    class RecordedConnection(process._RemoteConnection):
+
+        def __init__(self, *args):
+            super(RecordedConnection, self).__init__(*args)
+            opened.append(self)
+
+    monkeypatch.setattr(process, "_RemoteConnection", RecordedConnection)
+    address = free_address()
+    worker = start_worker(address)
+    try:
+        cluster = process.Cluster([address, free_address()], AUTHKEY, .5)
+        with pytest.raises(RuntimeError, match="not accepting"):
+            cluster.load(TEST_DATA, DuplexKernel(), DuplexInterface())
+
+        assert len(opened) == 1 and not opened[0].readable
+        worker.join(5)
+        assert worker.exitcode == 0
+    finally:
+        stop_worker(worker)
+
+
+def test_shards_need_a_file_per_worker():
+    with pytest.raises(ValueError):
+        process._make_shard_packets({"data": ["a.npy"]}, 2)